@@ -0,0 +1,194 @@
+#!/usr/bin/env python
+"""
+Batch runner for parameter sweeps.
+
+A batch is a list of jobs, each a world size, a seed pattern and a number of generations.
+The jobs are run headless in a pool of processes: every worker imports the simulator once
+and then runs its jobs one after the other, with no printing, pausing or per-generation logging.
+Each job gets its own random seed, derived from the seed of the batch and the number of the job,
+so a batch gives the same results on every run and a single job can be run again on its own.
+
+The results of all jobs are collected in one table: the counts of each state at the end of
+the job and, with cycle detection, the generation the world started to repeat and the period.
+
+The jobs are read from a file with one job per line, "<width>x<height> <pattern> <generations>",
+where the pattern is one of the code_base patterns or 'random', or built from the sweep options:
+    python -m Project.batch --sizes 80x40,200x100 --patterns random,gliders --repeat 10 -g 500
+    python -m Project.batch jobs.txt --output results.csv
+"""
+
+import argparse
+import csv
+import sys
+from collections import namedtuple
+from multiprocessing import Pool
+from random import Random
+from time import perf_counter
+import code_base as cb
+import cycles
+import gol
+
+Job = namedtuple("Job", ["number", "world_size", "pattern", "generations", "rng_seed"])
+
+RANDOM_PATTERN = "random"
+SEED_STRIDE = 1000003  # jobs of batches with consecutive seeds never share a random seed
+COLUMNS = ("job", "world_size", "pattern", "rng_seed", "generations", "generation", "alive", "elders",
+           "prime_elders", "dead", "first_repeat", "period", "seconds")
+
+
+def make_jobs(_specs: list, _batch_seed: int = 0) -> list:
+    """ Number the (world size, pattern, generations) specs and give every job its random seed. """
+    return [Job(number, tuple(world_size), pattern, generations, _batch_seed * SEED_STRIDE + number)
+            for number, (world_size, pattern, generations) in enumerate(_specs)]
+
+
+def sweep(_sizes: list, _patterns: list, _generations: int, _repeat: int = 1) -> list:
+    """ Return the specs of every combination of world size and pattern, _repeat times each.
+    Raises ValueError for an unknown pattern. """
+    return [(size, parse_pattern(pattern, size), _generations)
+            for size in _sizes for pattern in _patterns for _ in range(_repeat)]
+
+
+def parse_size(_size: str) -> tuple:
+    """ Parse a world size '<width>x<height>', raises ValueError if it is invalid. """
+    width, height = (int(value) for value in _size.split("x"))
+    if width < 1 or height < 1:
+        raise ValueError("Both width and height needs to have positive values above zero.")
+    return width, height
+
+
+def parse_pattern(_pattern: str, _world_size: tuple) -> str:
+    """ Check that a pattern is one of the code_base patterns or 'random', raises ValueError if it is not.
+    gol.populate_world makes a random world for an unknown pattern, which would hide a misspelled name. """
+    if _pattern != RANDOM_PATTERN and cb.get_pattern(_pattern, _world_size) is None:
+        raise ValueError("Unknown pattern '{}', expecting a code_base pattern or '{}'".format(_pattern,
+                                                                                          RANDOM_PATTERN))
+    return _pattern
+
+
+def read_jobs(_path) -> list:
+    """ Read job specs from a file with one "<width>x<height> <pattern> <generations>" per line.
+    Empty lines and lines starting with '#' are skipped. Raises ValueError for an invalid line
+    or an unknown pattern. """
+    specs = []
+    with open(_path, "r") as file:
+        for number, line in enumerate(file, 1):
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+            try:
+                size, pattern, generations = line.split()
+                size, generations = parse_size(size), int(generations)
+            except ValueError:
+                raise ValueError("line {}: expecting '<width>x<height> <pattern> <generations>'".format(number))
+            try:
+                specs.append((size, parse_pattern(pattern, size), generations))
+            except ValueError as e:
+                raise ValueError("line {}: {}".format(number, e))
+    return specs
+
+
+def run_job(_job: Job, _engine: str = gol.DictEngine.name, _cycles: bool = False) -> dict:
+    """ Run one job headless and return its row of the results table.
+    With _cycles the job stops at the first repeat of the world, see cycles.py. """
+    start = perf_counter()
+    pattern = None if _job.pattern == RANDOM_PATTERN else _job.pattern
+    population = gol.populate_world(_job.world_size, pattern, Random(_job.rng_seed))
+    engine = gol.ENGINES[_engine](population, _job.world_size)
+    first = None
+    try:
+        detector = None
+        if _cycles:
+            detector = cycles.CycleDetector()
+            engine.track_hash()
+            detector.check(engine.generation, engine.live_hash)
+        while engine.generation < _job.generations:
+            engine.advance(_job.generations - engine.generation)
+            if detector is not None:
+                first = detector.check(engine.generation, engine.live_hash)
+                if first is not None:
+                    break
+        counts = engine.counts()
+    finally:
+        engine.close()
+    return {"job": _job.number, "world_size": "{}x{}".format(*_job.world_size), "pattern": _job.pattern,
+            "rng_seed": _job.rng_seed, "generations": _job.generations, "generation": engine.generation,
+            "alive": counts[cb.STATE_ALIVE] + counts[cb.STATE_ELDER] + counts[cb.STATE_PRIME_ELDER],
+            "elders": counts[cb.STATE_ELDER], "prime_elders": counts[cb.STATE_PRIME_ELDER],
+            "dead": counts[cb.STATE_DEAD], "first_repeat": "" if first is None else engine.generation,
+            "period": "" if first is None else engine.generation - first,
+            "seconds": "{:.3f}".format(perf_counter() - start)}
+
+
+def _run_job(_task: tuple) -> dict:
+    """ Pool entry point: run_job with the arguments packed in a tuple. """
+    return run_job(*_task)
+
+
+def run_batch(_jobs: list, _workers: int = None, _engine: str = gol.DictEngine.name, _cycles: bool = False) -> list:
+    """ Run the jobs in a pool of _workers processes, all CPUs by default.
+    Returns the rows of the results table in the order of the jobs. """
+    tasks = [(job, _engine, _cycles) for job in _jobs]
+    with Pool(_workers) as pool:
+        return pool.map(_run_job, tasks, chunksize=1)
+
+
+def format_table(_rows: list, _columns: tuple = COLUMNS) -> str:
+    """ Format the results as a text table with aligned columns. """
+    cells = [[str(row[column]) for column in _columns] for row in _rows]
+    widths = [max([len(column)] + [len(line[index]) for line in cells]) for index, column in enumerate(_columns)]
+    lines = ["  ".join(column.rjust(width) for column, width in zip(_columns, widths))]
+    lines += ["  ".join(cell.rjust(width) for cell, width in zip(line, widths)) for line in cells]
+    return "\n".join(lines)
+
+
+def write_table(_path, _rows: list):
+    """ Write the results as a CSV file. """
+    with open(_path, "w", newline="") as file:
+        writer = csv.DictWriter(file, fieldnames=COLUMNS)
+        writer.writeheader()
+        writer.writerows(_rows)
+
+
+def main():
+    """ Run the batch given on the command line and print the results table. """
+    parser = argparse.ArgumentParser(description="Run many headless simulations in a pool of processes.")
+    parser.add_argument('jobs', nargs='?', type=str,
+                        help="File with one job per line: '<width>x<height> <pattern> <generations>'.")
+    parser.add_argument('--sizes', dest='sizes', type=str, default='80x40',
+                        help="Comma separated world sizes of the sweep, used when no jobs file is given.")
+    parser.add_argument('--patterns', dest='patterns', type=str, default=RANDOM_PATTERN,
+                        help="Comma separated seed patterns of the sweep, 'random' for a random world.")
+    parser.add_argument('--repeat', dest='repeat', type=int, default=1,
+                        help="Number of jobs for every size and pattern of the sweep.")
+    parser.add_argument('-g', '--generations', dest='generations', type=int, default=50,
+                        help="Generations of every job of the sweep. Defaults to 50.")
+    parser.add_argument('--batch-seed', dest='batch_seed', type=int, default=0,
+                        help="Seed the random seeds of the jobs are derived from. Defaults to 0.")
+    parser.add_argument('-e', '--engine', dest='engine', type=str, default=gol.DictEngine.name,
+                        choices=[name for name in gol.ENGINES if name != "parallel"],
+                        help="Engine used for every job. Defaults to dict.")
+    parser.add_argument('-w', '--workers', dest='workers', type=int,
+                        help="Number of worker processes. Defaults to the number of CPUs.")
+    parser.add_argument('--cycles', dest='cycles', action='store_true',
+                        help="Stop a job when its world becomes static or periodic.")
+    parser.add_argument('-o', '--output', dest='output', type=str,
+                        help="Write the results table to this CSV file.")
+    args = parser.parse_args()
+
+    try:
+        if args.jobs:
+            specs = read_jobs(args.jobs)
+        else:
+            sizes = [parse_size(size) for size in args.sizes.split(",")]
+            specs = sweep(sizes, args.patterns.split(","), args.generations, args.repeat)
+    except (OSError, ValueError) as e:
+        sys.exit(str(e))
+    rows = run_batch(make_jobs(specs, args.batch_seed), args.workers, args.engine, args.cycles)
+    print(format_table(rows))
+    if args.output:
+        write_table(args.output, rows)
+
+
+if __name__ == "__main__":
+    main()
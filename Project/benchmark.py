@@ -0,0 +1,185 @@
+#!/usr/bin/env python
+"""
+Benchmark suite of the simulation engines.
+
+A benchmark case is an engine, a world size and a seed pattern. Every case runs in a process of
+its own, so the peak memory of a case is not hidden by the cases before it. The world is created
+and advanced WARMUP generations, then every one of the following generations is timed on its own,
+without printing, pausing or logging. The results of a case are:
+
+    * the seconds it took to create the engine,
+    * the median and 95th percentile time per generation,
+    * cells per second, the cells of the world over the median time per generation,
+    * the peak resident memory of the process.
+
+A case that is not done after --timeout seconds is stopped and reported as timed out, which keeps
+the slow engines from holding up the suite on the large worlds. The results are printed as a
+table and written as JSON together with the versions of the simulator and of Python, so the runs
+of two versions can be compared:
+    python -m Project.benchmark -g 20 -o benchmark.json
+    python -m Project.benchmark --engines bitpack,numpy --sizes 1024x1024 --seeds random,pulsar
+"""
+
+import argparse
+import json
+import math
+import multiprocessing
+import platform
+import queue
+import statistics
+import sys
+from random import Random
+from time import perf_counter
+import batch
+import gol
+
+SIZES = "80x40,256x256,1024x1024,4096x4096"
+SEEDS = "gliders,pulsar,penta,random"
+POLL_SECONDS = 0.1  # interval of the checks if a case process is done or has failed
+WARMUP = 1  # untimed generations before the timed ones, e.g. for caches filled by the first step
+COLUMNS = ("engine", "world_size", "seed", "generations", "setup_seconds", "median_ms", "p95_ms",
+           "cells_per_sec", "peak_rss_mib", "status")
+
+
+def percentile(_values: list, _percent: float) -> float:
+    """ Nearest-rank percentile of the values. """
+    ordered = sorted(_values)
+    return ordered[max(math.ceil(len(ordered) * _percent / 100) - 1, 0)]
+
+
+def run_case(_engine: str, _world_size: tuple, _seed: str, _generations: int, _rng_seed: int = 0) -> dict:
+    """ Run one benchmark case in the current process and return its row of the results. """
+    width, height = _world_size
+    row = {"engine": _engine, "world_size": "{}x{}".format(width, height), "seed": _seed,
+           "generations": _generations, "setup_seconds": "", "median_ms": "", "p95_ms": "",
+           "cells_per_sec": "", "peak_rss_mib": "", "status": "ok"}
+    pattern = None if _seed == batch.RANDOM_PATTERN else _seed
+    start = perf_counter()
+    population = gol.populate_world(_world_size, pattern, Random(_rng_seed))
+    try:
+        engine = gol.ENGINES[_engine](population, _world_size)
+    except ImportError as e:
+        row["status"] = str(e)
+        return row
+    del population
+    row["setup_seconds"] = round(perf_counter() - start, 4)
+    times = []
+    try:
+        for _ in range(WARMUP):
+            engine.step()
+        for _ in range(_generations):
+            start = perf_counter()
+            engine.step()
+            times.append(perf_counter() - start)
+    finally:
+        engine.close()
+    median = statistics.median(times)
+    peak_memory = gol.get_peak_memory()
+    row["median_ms"] = round(median * 1000, 4)
+    row["p95_ms"] = round(percentile(times, 95) * 1000, 4)
+    row["cells_per_sec"] = round(width * height / median) if median else ""
+    row["peak_rss_mib"] = "" if peak_memory is None else round(peak_memory / 2 ** 20, 1)
+    return row
+
+
+def _run_case(_results: multiprocessing.Queue, _case: tuple):
+    """ Process entry point: put the row of the case, or of its error, on the queue. """
+    try:
+        _results.put(run_case(*_case))
+    except Exception as e:
+        _results.put({"status": "error: {}".format(e)})
+
+
+def run_isolated(_case: tuple, _timeout: float) -> dict:
+    """ Run a case, (engine, world size, seed, generations, random seed), in a new process
+    and return its row, a row with the timed out status if it takes longer than _timeout seconds.
+    The process is not a pool worker, so engines can start worker processes of their own. """
+    engine, (width, height), seed, generations, rng_seed = _case
+    row = {column: "" for column in COLUMNS}
+    row.update(engine=engine, world_size="{}x{}".format(width, height), seed=seed, generations=generations)
+    results = multiprocessing.Queue()
+    process = multiprocessing.Process(target=_run_case, args=(results, _case))
+    process.start()
+    deadline = perf_counter() + _timeout
+    while True:
+        try:
+            row.update(results.get(timeout=POLL_SECONDS))
+            break
+        except queue.Empty:
+            if not process.is_alive():
+                """the row may still be on its way from a process that just ended"""
+                try:
+                    row.update(results.get(timeout=1))
+                except queue.Empty:
+                    row["status"] = "failed with exit code {}".format(process.exitcode)
+                break
+            if perf_counter() > deadline:
+                process.terminate()
+                row["status"] = "timed out after {}s".format(_timeout)
+                break
+    process.join()
+    return row
+
+
+def run_suite(_engines: list, _sizes: list, _seeds: list, _generations: int, _rng_seed: int = 0,
+              _timeout: float = 60, _progress=None) -> list:
+    """ Run every combination of engine, world size and seed, each in its own process.
+    _progress, if given, is called with the row of every case when it is done. """
+    rows = []
+    for size in _sizes:
+        for seed in _seeds:
+            for engine in _engines:
+                row = run_isolated((engine, size, seed, _generations, _rng_seed), _timeout)
+                rows.append(row)
+                if _progress is not None:
+                    _progress(row)
+    return rows
+
+
+def write_json(_path, _rows: list, _generations: int, _rng_seed: int):
+    """ Write the results with the versions they were measured with. """
+    with open(_path, "w") as file:
+        json.dump({"version": gol.__version__, "python": platform.python_version(),
+                   "platform": platform.platform(), "generations": _generations, "warmup": WARMUP,
+                   "rng_seed": _rng_seed, "results": _rows}, file, indent=2)
+
+
+def main():
+    """ Run the benchmark suite given on the command line and print the results table. """
+    parser = argparse.ArgumentParser(description="Time the simulation engines across world sizes and seeds.")
+    parser.add_argument('--engines', dest='engines', type=str, default=",".join(gol.ENGINES),
+                        help="Comma separated engines to benchmark. Defaults to all engines.")
+    parser.add_argument('--sizes', dest='sizes', type=str, default=SIZES,
+                        help="Comma separated world sizes. Defaults to {}.".format(SIZES))
+    parser.add_argument('--seeds', dest='seeds', type=str, default=SEEDS,
+                        help="Comma separated seed patterns, 'random' for a random world. "
+                             "Defaults to {}.".format(SEEDS))
+    parser.add_argument('-g', '--generations', dest='generations', type=int, default=20,
+                        help="Timed generations of every case. Defaults to 20.")
+    parser.add_argument('--rng-seed', dest='rng_seed', type=int, default=0,
+                        help="Seed of the random worlds. Defaults to 0.")
+    parser.add_argument('--timeout', dest='timeout', type=float, default=60,
+                        help="Seconds after which a case is stopped. Defaults to 60.")
+    parser.add_argument('-o', '--output', dest='output', type=str,
+                        help="Write the results to this JSON file.")
+    args = parser.parse_args()
+
+    engines = args.engines.split(",")
+    unknown = [engine for engine in engines if engine not in gol.ENGINES]
+    if unknown:
+        sys.exit("Unknown engine '{}', choose from: {}".format(unknown[0], ", ".join(gol.ENGINES)))
+    if args.generations < 1:
+        sys.exit("The number of generations needs to be at least 1.")
+    try:
+        sizes = [batch.parse_size(size) for size in args.sizes.split(",")]
+    except ValueError as e:
+        sys.exit(str(e))
+    rows = run_suite(engines, sizes, args.seeds.split(","), args.generations, args.rng_seed, args.timeout,
+                     lambda row: print("{engine} {world_size} {seed}: {status}".format(**row), file=sys.stderr))
+    print(batch.format_table(rows, COLUMNS))
+    if args.output:
+        write_json(args.output, rows, args.generations, args.rng_seed)
+
+
+if __name__ == "__main__":
+    main()
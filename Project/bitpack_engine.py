@@ -0,0 +1,290 @@
+#!/usr/bin/env python
+"""
+Bit-packed simulation engine.
+
+Every row of the world is packed into a single Python int with one bit per cell, bit x holding
+the cell in column x. The live neighbour counts of a whole row are computed at once with
+bitwise adder logic on the row above, the row itself and the row below, shifted one column
+to the left and to the right. A Python int holds the full width of the row, so each bitwise
+operation works on all the cells of a row instead of on one cell at a time.
+
+The ages of the cells are not stored per cell. Instead the generation in which each live cell
+was born is kept in a side dictionary, which only has to be updated for the cells that are born
+or die. The age of a live cell is the number of generations since its birth and, because live
+cells only ever age by one per generation, its state follows from its age:
+up to the elder age of the rule the cell is alive, up to the prime elder age it is an elder,
+after that it is a prime elder.
+
+Besides the bounded world with its dead rim the engine simulates two other topologies, see world.TOPOLOGIES:
+a torus, where the rows are padded with the row and the column of the opposite edge, and an infinite
+plane, where the storage grows in chunks when the live cells reach its edge. A Python int has no
+fixed width, so the columns added to the right of the rows cost nothing until cells are born in them.
+"""
+
+from array import array
+from collections import Counter
+import code_base as cb
+import world
+import rules
+
+GROW_CHUNK = 32  # fewest rows or columns added to a side of an infinite world at once
+
+
+def set_bits(_bits: int):
+    """ Yield the positions of the bits set in _bits, lowest first. """
+    while _bits:
+        lowest = _bits & -_bits
+        yield lowest.bit_length() - 1
+        _bits ^= lowest
+
+
+def next_row(_up: int, _mid: int, _down: int) -> int:
+    """ Compute the next generation of the row _mid from the rows above and below it.
+    The eight neighbours of every bit are added with half and full adders giving the three
+    lowest bits of the neighbour count (a count of 8 wraps to 0, which is neither 2 nor 3).
+    A cell is live in the next generation when the count is 3, or when it is 2 and the cell
+    is live. The result still has to be masked with the interior of the world. """
+    """sum of the three cells above and the three cells below: one bit and a carry each"""
+    a, b, c = _up << 1, _up, _up >> 1
+    up_xor = a ^ b
+    up_ones = up_xor ^ c
+    up_twos = (a & b) | (c & up_xor)
+    a, b, c = _down << 1, _down, _down >> 1
+    down_xor = a ^ b
+    down_ones = down_xor ^ c
+    down_twos = (a & b) | (c & down_xor)
+    """sum of the left and right cells"""
+    a, c = _mid << 1, _mid >> 1
+    mid_ones = a ^ c
+    mid_twos = a & c
+    """add the ones, then the twos together with the carry from the ones"""
+    ones_xor = up_ones ^ down_ones
+    ones = ones_xor ^ mid_ones
+    ones_carry = (up_ones & down_ones) | (mid_ones & ones_xor)
+    first = up_twos ^ down_twos
+    second = mid_twos ^ ones_carry
+    twos = first ^ second
+    fours = (up_twos & down_twos) ^ (mid_twos & ones_carry) ^ (first & second)
+    return twos & ~fours & (ones | _mid)
+
+
+def count_planes(_up: int, _mid: int, _down: int) -> tuple:
+    """ Return the four bits of the live neighbour count of every bit of the row _mid
+    as (ones, twos, fours, eights) ints, added with the same adders as next_row. """
+    a, b, c = _up << 1, _up, _up >> 1
+    up_xor = a ^ b
+    up_ones = up_xor ^ c
+    up_twos = (a & b) | (c & up_xor)
+    a, b, c = _down << 1, _down, _down >> 1
+    down_xor = a ^ b
+    down_ones = down_xor ^ c
+    down_twos = (a & b) | (c & down_xor)
+    a, c = _mid << 1, _mid >> 1
+    mid_ones = a ^ c
+    mid_twos = a & c
+    ones_xor = up_ones ^ down_ones
+    ones = ones_xor ^ mid_ones
+    ones_carry = (up_ones & down_ones) | (mid_ones & ones_xor)
+    """four bits of weight two: the twos of the three sums and the carry of the ones"""
+    twos_xor = up_twos ^ down_twos
+    twos_sum = twos_xor ^ mid_twos
+    twos_carry = (up_twos & down_twos) | (mid_twos & twos_xor)
+    twos = twos_sum ^ ones_carry
+    fours_carry = twos_sum & ones_carry
+    return ones, twos, twos_carry ^ fours_carry, twos_carry & fours_carry
+
+
+def row_function(_rule: rules.Rule):
+    """ Return the function computing the next generation of a row under _rule:
+    next_row for Conway's rules, otherwise a function matching the count planes against the
+    neighbour counts of the birth and survival tables of the rule. """
+    if _rule.birth == rules.CONWAY.birth and _rule.survival == rules.CONWAY.survival:
+        return next_row
+    birth = [count for count in range(rules.NEIGHBOUR_COUNTS) if _rule.birth_table[count]]
+    survival = [count for count in range(rules.NEIGHBOUR_COUNTS) if _rule.survival_table[count]]
+
+    def matching(_planes: tuple, _counts: list) -> int:
+        """ Bits of the cells whose neighbour count is one of _counts. """
+        result = 0
+        for count in _counts:
+            match = -1
+            for bit, plane in enumerate(_planes):
+                match &= plane if (count >> bit) & 1 else ~plane
+            result |= match
+        return result
+
+    def rule_row(_up: int, _mid: int, _down: int) -> int:
+        planes = count_planes(_up, _mid, _down)
+        return (matching(planes, birth) & ~_mid) | (matching(planes, survival) & _mid)
+    return rule_row
+
+
+class BitPackEngine(world.Engine):
+    """ Engine storing each row of the world as the bits of a Python int. """
+
+    name = "bitpack"
+    topologies = world.TOPOLOGIES
+
+    def __init__(self, _population: dict, _world_size: tuple, _topology: str = world.TOPOLOGY_BOUNDED,
+                 _rule: rules.Rule = rules.CONWAY):
+        super().__init__(_world_size, _rule)
+        self.next_row = row_function(self.rule)
+        if _topology not in self.topologies:
+            raise ValueError("Unknown topology '{}', choose one of: {}".format(_topology,
+                                                                               ", ".join(self.topologies)))
+        self.topology = _topology
+        width, height = self.world_size
+        """in a bounded world the first and last column are rim, in the other topologies every column is used"""
+        if self.topology == world.TOPOLOGY_BOUNDED:
+            self.mask = ((1 << (width - 2)) - 1) << 1 if width > 2 else 0
+        else:
+            self.mask = (1 << width) - 1
+        """position of the top left cell of the storage on the infinite plane, and how often the storage grew"""
+        self.origin = (0, 0)
+        self.growths = 0
+        self.bits = [0] * height
+        """generation in which each live cell was born and the number of live cells per birth generation"""
+        self.born = {}
+        self.birth_counts = Counter()
+        """positions that are not on the rim but were read with the rim state,
+        they are neither alive nor dead and can not be born in the first generation"""
+        self.blocked = [0] * height
+        rows = self.interior_rows()
+        cells = _population.items()
+        if isinstance(_population, world.PlanePopulation) and self.topology != world.TOPOLOGY_BOUNDED:
+            """the border of a snapshot of a torus or an infinite world holds ordinary cells"""
+            cells = _population.stored_cells()
+        for (y, x), cell in cells:
+            if cell is None or not (self.mask >> x) & 1 or y not in rows:
+                continue
+            cell = world.to_cell(cell)
+            code = world.STATE_CODES[cell.state]
+            if code in world.LIVE_CODES:
+                self.bits[y] |= 1 << x
+                self.born[y * width + x] = -cell.age
+                self.birth_counts[-cell.age] += 1
+            elif code == world.CODE_RIM and 0 < y < height - 1 and 0 < x < width - 1:
+                self.blocked[y] |= 1 << x
+
+    def interior_rows(self) -> range:
+        """ Rows that are simulated, all but the first and the last in a bounded world. """
+        height = self.world_size[1]
+        if self.topology == world.TOPOLOGY_BOUNDED:
+            return range(1, height - 1)
+        return range(height)
+
+    def set_generation(self, _generation: int):
+        """ Continue counting from _generation, the birth generations are moved along so the ages stay the same. """
+        shift = _generation - self.generation
+        self.born = {index: birth + shift for index, birth in self.born.items()}
+        self.birth_counts = Counter({birth + shift: number for birth, number in self.birth_counts.items()})
+        self.generation = _generation
+
+    def step(self):
+        """ Advance the world by one generation.
+        Compute every interior row with next_row, then record the births and deaths of the row.
+        The rows are padded once per step instead of checking the edges for every cell: with an empty row
+        above and below in a bounded or infinite world, with the last and the first row in a torus.
+        The rows of a torus also get a ghost column on each side holding the cell of the opposite edge. """
+        if self.topology == world.TOPOLOGY_INFINITE:
+            self.grow()
+        width, height = self.world_size
+        bits = self.bits
+        if self.topology == world.TOPOLOGY_TORUS:
+            ghosted = [(row << 1) | (row >> (width - 1)) | ((row & 1) << (width + 1)) for row in bits]
+            padded = [ghosted[-1]] + ghosted + [ghosted[0]]
+            shift = 1
+        else:
+            padded = [0] + bits + [0]
+            shift = 0
+        next_bits = [0] * height
+        for y in self.interior_rows():
+            row = (self.next_row(padded[y], padded[y + 1], padded[y + 2]) >> shift) & self.mask & ~self.blocked[y]
+            next_bits[y] = row
+            for x in set_bits(row & ~bits[y]):
+                self.born[y * width + x] = self.generation
+                self.birth_counts[self.generation] += 1
+            for x in set_bits(bits[y] & ~row):
+                birth = self.born.pop(y * width + x)
+                self.birth_counts[birth] -= 1
+                if not self.birth_counts[birth]:
+                    del self.birth_counts[birth]
+            if self.live_hash is not None:
+                for x in set_bits(row ^ bits[y]):
+                    self.live_hash ^= world.cell_key(y * width + x)
+        self.bits = next_bits
+        self.blocked = [0] * height
+        self.generation += 1
+
+    def grow(self):
+        """ Make room around the live cells of an infinite world before a step.
+        A side of the storage is extended when a live cell is on its edge, by half the size of the storage
+        and at least GROW_CHUNK cells. The storage grows geometrically, so the rows and the birth
+        generations are copied a few times in a run instead of every time the pattern moves a cell. """
+        width, height = self.world_size
+        used = 0
+        for row in self.bits:
+            used |= row
+        if not used:
+            return
+        top = max(GROW_CHUNK, height // 2) if self.bits[0] else 0
+        bottom = max(GROW_CHUNK, height // 2) if self.bits[-1] else 0
+        left = max(GROW_CHUNK, width // 2) if used & 1 else 0
+        right = max(GROW_CHUNK, width // 2) if used >> (width - 1) else 0
+        if not (top or bottom or left or right):
+            return
+        new_width = width + left + right
+        self.bits = [0] * top + [row << left for row in self.bits] + [0] * bottom
+        self.blocked = [0] * top + [row << left for row in self.blocked] + [0] * bottom
+        self.born = {(index // width + top) * new_width + index % width + left: birth
+                     for index, birth in self.born.items()}
+        self.world_size = (new_width, height + top + bottom)
+        self.mask = (1 << new_width) - 1
+        self.origin = (self.origin[0] - top, self.origin[1] - left)
+        self.growths += 1
+        """the hash is keyed by the position in the storage, which has moved"""
+        if self.live_hash is not None:
+            self.track_hash()
+
+    def get_code(self, _age: int) -> int:
+        """ State code of a live cell with the given age. """
+        return self.rule.state_code(_age)
+
+    def to_planes(self) -> tuple:
+        """ Return the world as flat (states, ages) planes. """
+        width, height = self.world_size
+        states = bytearray(width * height)
+        ages = array(world.AGE_TYPECODE, [0]) * (width * height)
+        full = (1 << width) - 1
+        rows = self.interior_rows()
+        for y in range(height):
+            rim = (full & ~self.mask) | self.blocked[y] if y in rows else full
+            for x in set_bits(rim):
+                states[y * width + x] = world.CODE_RIM
+        for index, birth in self.born.items():
+            ages[index] = self.generation - birth
+            states[index] = self.get_code(ages[index])
+        return states, ages
+
+    def counts(self) -> dict:
+        """ Count the cells of each state from the number of live cells per birth generation. """
+        counts = {cb.STATE_ALIVE: 0, cb.STATE_ELDER: 0, cb.STATE_PRIME_ELDER: 0}
+        for birth, number in self.birth_counts.items():
+            counts[world.CODE_STATES[self.get_code(self.generation - birth)]] += number
+        blocked = sum(bin(row).count("1") for row in self.blocked)
+        counts[cb.STATE_DEAD] = self.ordinary_cells() - len(self.born) - blocked
+        return counts
+
+    def ordinary_cells(self) -> int:
+        """ Only a bounded world has a rim. """
+        if self.topology == world.TOPOLOGY_BOUNDED:
+            return super().ordinary_cells()
+        return self.world_size[0] * self.world_size[1]
+
+    def summary(self) -> dict:
+        """ The size the storage of an infinite world grew to. """
+        if self.topology != world.TOPOLOGY_INFINITE:
+            return {}
+        return {"storage": "{}x{}".format(*self.world_size),
+                "origin": "{}x{}".format(self.origin[1], self.origin[0]),
+                "storage growths": self.growths}
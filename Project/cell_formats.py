@@ -0,0 +1,85 @@
+#!/usr/bin/env python
+"""
+Memory and latency comparison of the cell formats of the dictionary world.
+
+    * neighbours dict: {state: [8 neighbour tuples], "age": n}, the format of the first version,
+    * state dict: {state: None, "age": n}, the same without the neighbour list,
+    * Cell: world.Cell, a __slots__ object with the fields state and age.
+
+For each format a world is built for the given size, the memory allocated for it is measured
+with tracemalloc and the time needed to read the state and age of every cell is measured
+with the lookup each format needs: a scan of the keys for the dictionaries, attribute access for Cell.
+
+You run this script as a module:
+    python -m Project.cell_formats 200x100
+"""
+
+import sys
+import tracemalloc
+from timeit import repeat
+import code_base as cb
+import world
+
+
+def dict_state(_cell) -> str:
+    """ State lookup of the dictionary formats: the key that is not 'age'. """
+    for key in _cell.keys():
+        if key != "age":
+            return key
+
+
+def build_world(_world_size: tuple, _make_cell) -> dict:
+    """ Build a world of the given size with every other interior cell alive. """
+    width, height = _world_size
+    population = {}
+    for x in range(width):
+        for y in range(height):
+            if x == 0 or y == 0 or x == width - 1 or y == height - 1:
+                population[(y, x)] = None
+            else:
+                state = cb.STATE_ALIVE if (x + y) % 2 else cb.STATE_DEAD
+                population[(y, x)] = _make_cell((y, x), state)
+    return population
+
+
+FORMATS = {
+    "neighbours dict": (lambda position, state: {state: [(position[0] + dy, position[1] + dx)
+                                                         for (dy, dx) in world.NEIGHBOUR_OFFSETS], "age": 0},
+                        lambda cell: (dict_state(cell), cell["age"])),
+    "state dict": (lambda position, state: {state: None, "age": 0},
+                   lambda cell: (dict_state(cell), cell["age"])),
+    "Cell": (lambda position, state: world.Cell(state, 0),
+             lambda cell: (cell.state, cell.age))
+}
+
+
+def compare_cell_formats(_world_size: tuple, _repeat: int = 5) -> dict:
+    """ Return {format: (bytes per cell, nanoseconds per cell lookup)} for the given world size.
+    The lookup time is the best of _repeat passes over the whole world. """
+    cells = _world_size[0] * _world_size[1]
+    results = {}
+    for name, (make_cell, read_cell) in FORMATS.items():
+        tracemalloc.start()
+        population = build_world(_world_size, make_cell)
+        size = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+        values = [cell for cell in population.values() if cell is not None]
+
+        def read_all():
+            for cell in values:
+                read_cell(cell)
+        seconds = min(repeat(read_all, number=1, repeat=_repeat))
+        results[name] = (size / cells, seconds * 1e9 / max(len(values), 1))
+    return results
+
+
+def main():
+    """ Print the comparison for the world size given as argument, 80x40 by default. """
+    width, height = (int(value) for value in (sys.argv[1] if len(sys.argv) > 1 else "80x40").split("x"))
+    print("{:<16}{:>16}{:>20}".format("format", "bytes/cell", "ns/state lookup"))
+    for name, (size, lookup) in compare_cell_formats((width, height)).items():
+        print("{:<16}{:>16.1f}{:>20.1f}".format(name, size, lookup))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+#!/usr/bin/env python
+"""
+Periodic checkpoints of a running simulation.
+
+A checkpoint is a snapshot file (see snapshot.py) of the current generation, with the engine name,
+the topology of the world, the rule and the --rng-seed the world was populated with stored as
+metadata after the planes, so a resumed run can be traced back to the run that made it.
+Checkpoints are taken every given number of generations and/or seconds. The planes are copied
+from the engine on the simulation thread, which keeps the checkpoint consistent, and written by a
+background thread, so the simulation does not wait for the disk. Every checkpoint is written to a
+temporary file that is renamed over the previous checkpoint, so the file on disk is always a
+complete checkpoint.
+"""
+
+import os
+import queue
+import threading
+from time import monotonic
+import world
+import snapshot
+
+
+class Checkpointer:
+    """ Writes a checkpoint of the engine every _generations generations and/or every _seconds seconds,
+    the generations are counted in multiples of _generations from the generation the run starts at.
+    _rng_seed is the seed of the random generator that populated the world, None if it was not seeded. """
+
+    def __init__(self, _path, _generations: int = None, _seconds: float = None, _start_generation: int = 0,
+                 _rng_seed: int = None):
+        self.path = _path
+        self.rng_seed = _rng_seed
+        self.generations = _generations
+        self.seconds = _seconds
+        self.next_generation = (_start_generation // _generations + 1) * _generations if _generations else None
+        self.next_time = monotonic() + _seconds if _seconds else None
+        self.written = 0
+        self.error = None
+        """holds at most one checkpoint waiting to be written, a checkpoint that falls due while
+        the previous one is still waiting is postponed to the next generation"""
+        self.pending = queue.Queue(maxsize=1)
+        self.thread = threading.Thread(target=self.run, name="checkpoint", daemon=True)
+        self.thread.start()
+
+    def due(self, _engine: world.Engine) -> bool:
+        """ Check if a checkpoint of the current generation of the engine should be taken. """
+        if self.next_generation is not None and _engine.generation >= self.next_generation:
+            return True
+        return self.next_time is not None and monotonic() >= self.next_time
+
+    def update(self, _engine: world.Engine):
+        """ Called after every generation, queue a checkpoint of the engine if one is due. """
+        if not self.due(_engine) or self.pending.full():
+            return
+        states, ages = _engine.to_planes()
+        metadata = {"engine": _engine.name, "topology": _engine.topology, "rule": _engine.rule.notation,
+                    "elder_ages": [_engine.rule.elder_age, _engine.rule.prime_elder_age]}
+        if self.rng_seed is not None:
+            metadata["rng_seed"] = self.rng_seed
+        self.pending.put((states, ages, _engine.world_size, _engine.generation, metadata))
+        if self.generations:
+            self.next_generation = (_engine.generation // self.generations + 1) * self.generations
+        if self.seconds:
+            self.next_time = monotonic() + self.seconds
+
+    def run(self):
+        """ Background thread: write the queued checkpoints until None is queued. """
+        while True:
+            item = self.pending.get()
+            if item is None:
+                return
+            temporary = "{}.tmp".format(self.path)
+            try:
+                snapshot.write_planes(temporary, *item)
+                os.replace(temporary, self.path)
+                self.written += 1
+            except OSError as e:
+                self.error = e
+
+    def close(self):
+        """ Wait for the queued checkpoint to be written and stop the background thread. """
+        if self.thread.is_alive():
+            self.pending.put(None)
+            self.thread.join()
+
+
+def load_checkpoint(_path) -> tuple:
+    """ Load a checkpoint.
+    Returns the population (world.PlanePopulation, with the generation of the checkpoint) and the metadata. """
+    return snapshot.load_snapshot(_path), snapshot.load_metadata(_path)
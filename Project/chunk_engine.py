@@ -0,0 +1,136 @@
+#!/usr/bin/env python
+"""
+Chunked simulation engine that skips the regions of the world where nothing happens.
+
+The world is split into square chunks of CHUNK_SIZE x CHUNK_SIZE cells. Every chunk holds its
+rows as bit-packed ints, as in bitpack_engine.py, and the chunks without live cells are not
+stored at all. The next generation of a chunk only depends on the chunk itself and the eight
+chunks around it, so when none of these nine chunks changed in the last generation the chunk
+can not change in this one either. Only the active chunks, the chunks that changed in the last
+generation and their neighbours, are computed:
+
+    * the rows of an active chunk are padded with the edge rows and columns of its neighbours,
+    * the row function of bitpack_engine.py computes every row of the chunk at once,
+    * the chunks that changed mark themselves and their neighbours active for the next generation.
+
+A still life or an oscillator far from any other activity only keeps its own chunks busy,
+and dead space costs nothing. The ages are kept as birth generations like in the bitpack
+engine, which this engine shares its conversions and counts with.
+"""
+
+import world
+import rules
+from bitpack_engine import BitPackEngine, set_bits
+
+CHUNK_SIZE = 32  # width and height of a chunk in cells
+
+
+class ChunkEngine(BitPackEngine):
+    """ Engine storing the world in chunks and only computing the chunks that may change. """
+
+    name = "chunked"
+    topologies = (world.TOPOLOGY_BOUNDED,)
+
+    def __init__(self, _population: dict, _world_size: tuple, _rule: rules.Rule = rules.CONWAY):
+        super().__init__(_population, _world_size, _rule=_rule)
+        width, height = self.world_size
+        size = CHUNK_SIZE
+        full = (1 << size) - 1
+        self.chunk_grid = (-(-width // size), -(-height // size))
+        """the interior columns of every column of chunks and the interior rows of every row of chunks"""
+        self.column_masks = [(self.mask >> cx * size) & full for cx in range(self.chunk_grid[0])]
+        self.chunk_rows = [range(max(1 - cy * size, 0), min(height - 1 - cy * size, size))
+                           for cy in range(self.chunk_grid[1])]
+        self.empty = (0,) * size
+        self.chunks = {}
+        for y, row in enumerate(self.bits):
+            for cx in range(self.chunk_grid[0]):
+                bits = (row >> cx * size) & full
+                if bits:
+                    self.chunks.setdefault((y // size, cx), [0] * size)[y % size] = bits
+        del self.bits
+        """the chunks holding cells that can not be born in the first generation are computed again
+        in the second, when they can"""
+        self.blocked_chunks = {(y // size, cx) for y, row in enumerate(self.blocked)
+                               for cx in range(self.chunk_grid[0]) if (row >> cx * size) & full}
+        self.active = set()
+        for key in self.chunks.keys() | self.blocked_chunks:
+            self.activate(key)
+        """generations made and chunks computed by this engine"""
+        self.steps = 0
+        self.chunk_steps = 0
+
+    def activate(self, _key: tuple):
+        """ Mark the chunk and its neighbours inside the world to be computed in the next generation. """
+        cy, cx = _key
+        columns, rows = self.chunk_grid
+        for y in range(max(cy - 1, 0), min(cy + 2, rows)):
+            for x in range(max(cx - 1, 0), min(cx + 2, columns)):
+                self.active.add((y, x))
+
+    def padded_rows(self, _key: tuple) -> list:
+        """ Return the rows of the chunk with the last row of the chunk above and the first row of the chunk
+        below added, each row shifted left by one column with the edge columns of the chunks on the sides. """
+        cy, cx = _key
+        size = CHUNK_SIZE
+        get = self.chunks.get
+        padded = []
+        for y, rows in ((cy - 1, range(size - 1, size)), (cy, range(size)), (cy + 1, range(1))):
+            west, mid, east = get((y, cx - 1), self.empty), get((y, cx), self.empty), get((y, cx + 1), self.empty)
+            padded.extend((west[r] >> (size - 1)) | (mid[r] << 1) | ((east[r] & 1) << (size + 1)) for r in rows)
+        return padded
+
+    def step(self):
+        """ Advance the world by one generation, computing only the active chunks.
+        The births and deaths of every row of a chunk are recorded as in BitPackEngine.step. """
+        width = self.world_size[0]
+        size = CHUNK_SIZE
+        updates = []
+        for key in self.active:
+            cy, cx = key
+            padded = self.padded_rows(key)
+            old = self.chunks.get(key, self.empty)
+            mask = self.column_masks[cx]
+            rows = [0] * size
+            for y in self.chunk_rows[cy]:
+                rows[y] = (self.next_row(padded[y], padded[y + 1], padded[y + 2]) >> 1) & mask \
+                          & ~(self.blocked[cy * size + y] >> cx * size)
+            if rows != list(old):
+                updates.append((key, rows, old))
+        self.chunk_steps += len(self.active)
+        self.active = set()
+        for key, rows, old in updates:
+            cy, cx = key
+            for y in range(size):
+                if rows[y] == old[y]:
+                    continue
+                index = (cy * size + y) * width + cx * size
+                for x in set_bits(rows[y] & ~old[y]):
+                    self.born[index + x] = self.generation
+                    self.birth_counts[self.generation] += 1
+                for x in set_bits(old[y] & ~rows[y]):
+                    birth = self.born.pop(index + x)
+                    self.birth_counts[birth] -= 1
+                    if not self.birth_counts[birth]:
+                        del self.birth_counts[birth]
+                if self.live_hash is not None:
+                    for x in set_bits(rows[y] ^ old[y]):
+                        self.live_hash ^= world.cell_key(index + x)
+            if any(rows):
+                self.chunks[key] = rows
+            else:
+                self.chunks.pop(key, None)
+            self.activate(key)
+        for key in self.blocked_chunks:
+            self.activate(key)
+        self.blocked_chunks = set()
+        self.blocked = [0] * self.world_size[1]
+        self.generation += 1
+        self.steps += 1
+
+    def summary(self) -> dict:
+        """ How many chunks were computed and how many were skipped. """
+        columns, rows = self.chunk_grid
+        return {"chunks": "{}x{} of {}x{} cells".format(columns, rows, CHUNK_SIZE, CHUNK_SIZE),
+                "active chunks/generation": "{:.1f}".format(self.chunk_steps / max(self.steps, 1)),
+                "skipped chunk steps": columns * rows * self.steps - self.chunk_steps}
@@ -0,0 +1,42 @@
+#!/usr/bin/env python
+"""
+Detection of still lifes and periodic worlds.
+
+The engines keep a hash of the live cells of the world up to date from the cells that are born
+or die in each generation (see world.cell_key), so checking a generation costs one lookup in a
+table of the hashes of the previous generations. When the hash of a generation is in the table
+the live cells repeat, and as every next generation only follows from the live cells, the world
+repeats from there on with the period between the two generations.
+
+The ages keep changing for cells that stay alive, but they only change the state of a cell until
+it becomes a prime elder. So the prime elder age of the rule generations after the first repeat the counts
+of every state repeat as well, which is what lets the simulation skip the remaining generations.
+"""
+
+import rules
+
+TABLE_SIZE = 1 << 16  # hashes kept, periods longer than this are not detected
+
+
+class CycleDetector:
+    """ Bounded table of the hashes of the generations seen, the oldest hash is dropped when it is full. """
+
+    def __init__(self, _size: int = TABLE_SIZE):
+        self.size = _size
+        self.seen = {}
+
+    def check(self, _generation: int, _hash) -> int:
+        """ Record the hash of a generation. Returns the earlier generation with the same hash, or None. """
+        first = self.seen.get(_hash)
+        if first is not None:
+            return first
+        if len(self.seen) >= self.size:
+            del self.seen[next(iter(self.seen))]
+        self.seen[_hash] = _generation
+        return None
+
+
+def settled_generation(_repeat: int, _rule: rules.Rule = rules.CONWAY) -> int:
+    """ First generation from which the counts of every state repeat, for a world whose live cells
+    repeat from generation _repeat: by then every cell that stays alive is a prime elder. """
+    return _repeat + _rule.prime_elder_age
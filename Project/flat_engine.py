@@ -0,0 +1,120 @@
+#!/usr/bin/env python
+"""
+Flat simulation engine in pure Python.
+
+The world is stored as two flat row-major planes indexed by y * width + x: a bytearray with the
+state codes of world.py and an array('H') with the ages. The engine needs nothing outside the
+standard library, so it is the fast path on hosts without NumPy. A generation does not create
+any object per cell:
+
+    * the live cells are marked with one bytes.translate of the state plane,
+    * the live neighbours of a cell are added from the live plane at eight offsets from its index,
+      which are computed once for the width of the world,
+    * the next state is looked up in the table of the rule (see rules.py),
+    * the next generation is written into a second pair of planes, which starts as a copy of an
+      empty world and is swapped with the current one after the step,
+    * the live cells of each state are counted as they are written, so counts() does not go
+      through the planes again.
+
+The ages are stored in 16 bits and stop at AGE_LIMIT, which is far above the prime elder age,
+so a cell that old is a prime elder either way.
+"""
+
+from array import array
+import world
+import rules
+from bitpack_engine import set_bits
+
+AGES_TYPECODE = 'H'
+AGE_LIMIT = 0xFFFF
+LIVE_TABLE = bytes(code in world.LIVE_CODES for code in range(256))
+
+
+class FlatEngine(world.Engine):
+    """ Engine storing the world in a flat state bytearray and a flat age array. """
+
+    name = "flat"
+
+    def __init__(self, _population: dict, _world_size: tuple, _rule: rules.Rule = rules.CONWAY):
+        super().__init__(_world_size, _rule)
+        width, height = self.world_size
+        states, ages = world.population_to_planes(_population, self.world_size)
+        self.states = bytearray(states)
+        self.ages = array(AGES_TYPECODE, (min(age, AGE_LIMIT) for age in ages))
+        """an empty world, the next generation starts as a copy of it"""
+        self.blank_states = bytearray(width * height)
+        world.set_rim(self.blank_states, self.world_size)
+        self.blank_ages = array(AGES_TYPECODE, [0]) * (width * height)
+        self.next_states = bytearray(self.blank_states)
+        self.next_ages = array(AGES_TYPECODE, self.blank_ages)
+        self.offsets = tuple(dy * width + dx for (dy, dx) in world.NEIGHBOUR_OFFSETS)
+        """cells of each state code, rim cells excluded"""
+        self.code_counts = [self.states.count(code) for code in range(world.CODE_RIM + 1)]
+
+    def step(self):
+        """ Advance the world by one generation.
+        Only the cells that are live in the next generation are written, all others stay as in the empty world.
+        The written cells are counted per state code, the remaining cells are dead. """
+        width, height = self.world_size
+        states, ages = self.states, self.ages
+        next_states, next_ages = self.next_states, self.next_ages
+        next_states[:] = self.blank_states
+        next_ages[:] = self.blank_ages
+        live = states.translate(LIVE_TABLE)
+        table = self.rule.table
+        birth = self.rule.birth_table
+        elder_age, prime_elder_age = self.rule.elder_age, self.rule.prime_elder_age
+        nw, n, ne, w, e, sw, s, se = self.offsets
+        dead = world.CODE_DEAD
+        born = world.CODE_ALIVE
+        state_size = rules.AGE_BUCKETS * rules.NEIGHBOUR_COUNTS
+        counts = rules.NEIGHBOUR_COUNTS
+        code_counts = [0] * (world.CODE_RIM + 1)
+        births = 0
+        for y in range(1, height - 1):
+            row = y * width
+            for index in range(row + 1, row + width - 1):
+                live_neighbours = live[index + nw] + live[index + n] + live[index + ne] + live[index + w] + \
+                    live[index + e] + live[index + sw] + live[index + s] + live[index + se]
+                code = states[index]
+                if code == dead:
+                    if birth[live_neighbours]:
+                        next_states[index] = born
+                        next_ages[index] = ages[index] + 1
+                        births += 1
+                    continue
+                age = ages[index] + 1
+                if age > AGE_LIMIT:
+                    age = AGE_LIMIT
+                bucket = (age > elder_age) + (age > prime_elder_age)
+                code = table[code * state_size + bucket * counts + live_neighbours]
+                if code != dead:
+                    next_states[index] = code
+                    next_ages[index] = age
+                    code_counts[code] += 1
+        if self.live_hash is not None:
+            """the live planes hold one byte per cell, so cell i is bit 8 * i of their xor"""
+            changed = int.from_bytes(live, "little") ^ int.from_bytes(next_states.translate(LIVE_TABLE), "little")
+            for bit in set_bits(changed):
+                self.live_hash ^= world.cell_key(bit >> 3)
+        code_counts[born] += births
+        code_counts[dead] = self.ordinary_cells() - sum(code_counts)
+        self.code_counts = code_counts
+        self.states, self.next_states = next_states, states
+        self.ages, self.next_ages = next_ages, ages
+        self.generation += 1
+
+    def to_planes(self) -> tuple:
+        """ Return copies of the state and age planes. """
+        return bytearray(self.states), array(world.AGE_TYPECODE, self.ages)
+
+    def rows(self):
+        """ Yield each row of the world as a string of state characters, mapped from the codes only here. """
+        width, height = self.world_size
+        states = bytes(self.states).translate(world.PRINT_TABLE)
+        for y in range(height):
+            yield states[y * width:(y + 1) * width].decode()
+
+    def counts(self) -> dict:
+        """ The cells of each state counted by the last step, rim cells excluded. """
+        return world.code_counts_to_states(self.code_counts)
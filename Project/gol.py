@@ -27,256 +27,368 @@ You run this script as a module:
 import argparse
 import pathlib
 import random
-import json
 import logging
 import sys
+from functools import lru_cache
 from pathlib import Path
-from ast import literal_eval
-from time import sleep
+from types import MappingProxyType
+from time import sleep, perf_counter
 import code_base as cb
+import world
+import numpy_engine
+import sparse_engine
+import rules
+import bitpack_engine
+import chunk_engine
+import flat_engine
+import hashlife
+import parallel_engine
+import render
+import seed_stream
+import snapshot
+import patterns
+import checkpoint
+import cycles
+import log_queue
+import profiling
 
 __version__ = '1.0'
 __desc__ = "A simplified implementation of Conway's Game of Life."
 
 RESOURCES = Path(__file__).parent / "../_Resources/"
+DENSITY = 4 / 21  # share of live cells in a random world, the chance of randint(0, 20) > 16
+DEAD_STATES = (cb.STATE_DEAD, cb.STATE_RIM)  # states of the cells that are not alive
 
 
 # -----------------------------------------
 # IMPLEMENTATIONS FOR HIGHER GRADES, C - B
 # -----------------------------------------
 
-def parse_world_size_form_file(world_size_data):
-    """Receives world size read from file as a List,
-     check if list contains exactly two integers each greater than zero
-     extract width and height and return them as a tuple which is the
-     expected format to be used in world population
-     or raise exception if and exit if validation fails"""
-    try:
-        """TypeError generated if data["world_size"] is not a list of size 2 """
-        [width, height] = world_size_data["world_size"]
-        """TypeError generated if width or height is not an integers"""
-        if width < 1 or height < 1:
-            raise ValueError("Both width and height needs to have "
-                             "positive values above zero.")
-        return width, height
-    except TypeError:
-        print("World size should be a list containing two "
-              "integers corresponding to width and height")
-        sys.exit()
-    except ValueError as e:
-        print(e)
-        sys.exit()
-    except Exception as e:
-        print(e)
-        sys.exit()
+def load_seed_from_file(_file_name: str, _validate_neighbours: bool = False) -> tuple:
+    """ Read population seed from file.
+    check if data is of correct type, if not throw exception,
+    print error message end program.
+    The neighbour lists of the cells are only checked when _validate_neighbours is set.
+    Else parse data and store in a dictionary in the expected format for world.
+    Returns tuple: population (dict) and world_size (tuple). """
+
+    if _file_name.endswith(snapshot.SUFFIX):
+        return load_snapshot_from_file(_file_name)
 
+    length = len(_file_name)
+    if length < 5:
+        _file_name = _file_name + ".json"
+    else:
+        last_five = _file_name[-5:]
+        print("Printing last five characters", last_five)
+        if last_five == ".json":
+            _file_name = _file_name
+        else:
+            _file_name = _file_name + ".json"
 
-def parse_coordinates_from_file(coordinate_str, world_size):
-    """Receives coordinates read from file as a string and convert it to a tuple,
-     then check if coordinates are two  integers and
-    if values falls within the expected range for the given world size"""
+    path = pathlib.Path.home() / RESOURCES / _file_name
+    print(f"The file to read is  {_file_name} with path {path}")
+    """the file is parsed in chunks by seed_stream, a large world is never held as a whole JSON document"""
     try:
-        [width, height] = world_size
-        coordinate = literal_eval(coordinate_str)
-        (y, x) = coordinate
-        if y < 0 or x < 0 or x > width - 1 or y > height - 1:
-            raise ValueError("Coordinate values out of bounds")
-        return y, x
-    except TypeError:
-        print("Coordinates should be in format (y, x) where x and y are integers")
+        with open(path, 'r') as file:
+            population, size = seed_stream.load_seed(file, _validate_neighbours)
+    except seed_stream.SeedFileError as e:
+        print("Invalid seed file {}, {}".format(path, e))
         sys.exit()
-    except ValueError as e:
-        sys.exit(str(e))
-    except Exception as e:
-        sys.exit(str(e))
+    print("size: {}".format(size))
+    print(f"World has {len(population)} cells and has size {size}")
+    return population, size
 
 
-def parse_neighbours_from_file(neighbours, world_size):
-    """Receives neighbours data read from file as a list,
-     Check if the read data is a list of 8 elements ,
-     and if each element is a list of 2 integers greater than zero
-     and lies within the expected range for the given world size
-      store each neighbour as a tuple return a list of all neighbours"""
+def load_snapshot_from_file(_file_name: str) -> tuple:
+    """ Read a binary snapshot file, print error message and end program if it is invalid.
+    Returns tuple: population (world.PlanePopulation) and world_size (tuple). """
+    path = pathlib.Path.home() / RESOURCES / _file_name
+    print(f"The file to read is  {_file_name} with path {path}")
     try:
-        (width, height) = world_size
-        new_list = []
-        if not isinstance(neighbours, list) or len(neighbours) != 8:
-            raise TypeError("Neighbours should be a list of coordinates with format (x, Y) "
-                            "where x and y are integers")
-        for coordinate in neighbours:
-            if len(coordinate) != 2:
-                raise TypeError("Neighbours coordinates should be two integers")
-            y = coordinate[0]
-            x = coordinate[1]
-            if y < 0 or x < 0 or x > width - 1 or y > height:
-                raise ValueError("Coordinate values out of bounds")
-            new_list.append((y, x))
-        return new_list
-    except TypeError as e:
-        sys.exit(str(e))
-    except ValueError as e:
-        print(e)
-        sys.exit(str(e))
-    except Exception as e:
-        print(e)
-        sys.exit(str(e))
+        population = snapshot.load_snapshot(path)
+    except snapshot.SnapshotError as e:
+        print(str(e))
+        sys.exit()
+    print(f"Snapshot of generation {population.generation} has size {population.world_size}")
+    return population, population.world_size
 
 
-def parse_cell_object_from_file(cell_object, world_size):
-    """receives data read from file corresponding to cell details,
-    check that the read data is a dictionary,
-    extract data for cell state and compare to expected values,
-    extract data for neighbours and call function to parse neighbours
-    return state and neighbour as a key:value pair
-    raise exception and exit"""
+def load_pattern_from_file(_file_name: str, _world_size: tuple, _offset: tuple = None) -> tuple:
+    """ Read a .rle or .cells pattern file and place it in a world of the given size,
+    at _offset (y, x) or in the centre of the world if no offset is given.
+    Print error message and end program if the file is invalid or the pattern does not fit.
+    A rule in the file that is not in B/S notation is reported and ignored.
+    Returns tuple: population (world.PlanePopulation), world_size (tuple) and the rule of the file
+    in B/S notation, or None if the file has no rule. """
+    path = pathlib.Path.home() / RESOURCES / _file_name
+    print(f"The file to read is  {_file_name} with path {path}")
     try:
-        if not isinstance(cell_object, dict) and cell_object is not None:
-            raise TypeError("Cell coordinates should be map a dictionary containing state "
-                            "and neighbours or none.")
-        if cell_object is None:
-            return None
-        state = cell_object["state"]
-        neighbours = cell_object["neighbours"]
-        new_cell_object = {}
-        if not isinstance(state, str):
-            raise TypeError("State should be a string")
-        if state is not cb.STATE_ALIVE and state is not cb.STATE_DEAD and state is not cb.STATE_RIM:
-            raise ValueError("Invalid state value. The values should be'#' or '-' or 'x'.")
-        if not isinstance(neighbours, list):
-            raise TypeError("Neighbours should be a list of coordinates of neighbouring cells")
-        new_cell_object[state] = parse_neighbours_from_file(neighbours, world_size)
-        new_cell_object["age"] = 0
-        return new_cell_object
-    except KeyError:
-        print("Key 'state' should cell state and 'neighbour should map cell neighbours")
-        sys.exit()
-    except TypeError as e:
-        print(str(e))
-        sys.exit()
+        width, height, live, rule = patterns.load_pattern(path)
+        offset = _offset or patterns.centre_offset((width, height), _world_size)
+        population = patterns.place_pattern(live, _world_size, offset)
     except ValueError as e:
         print(str(e))
         sys.exit()
-    except Exception as e:
-        print(str(e))
-        sys.exit()
+    print(f"Pattern of size {(width, height)} with {len(live)} live cells placed at {offset}")
+    if rule is not None:
+        try:
+            rule = rules.parse_rule(rule).notation
+        except ValueError:
+            print("Ignoring the rule {} of the pattern, it is not in B/S notation".format(rule))
+            rule = None
+    return population, _world_size, rule
+
+
+def parse_offset_arg(_arg: str) -> tuple:
+    """ Parse the position of a pattern from command argument 'XxY'. Returns (y, x) or None if it is invalid. """
+    try:
+        x, y = (int(value) for value in _arg.split("x"))
+        return y, x
+    except ValueError:
+        print("Offset should contain x and y, seperated by 'x', Ex: '10x5'.\nPlacing the pattern in the centre")
+        return None
 
 
-def parse_population_from_file(file_data: dict, world_size: tuple) -> dict:
-    """Receives data read form file.
-    Get data for cell population using key 'population'
-    which throws keyError exception if key not found,
-    check that population is a dictionary,
-    for every key:value pair, key is coordinate data which is parsed
-    by calling function parse_coordinates_from_file,
-    and value contain cell details which is parsed by calling method
-    parse_cell_object_from_file
-    all parsed coordinate:cell details pairs are stored in a dictionary and returned """
+def parse_rule_arg(_rule: str, _elder_age: int, _prime_elder_age: int) -> rules.Rule:
+    """ Parse the rule from command arguments, see rules.parse_rule.
+    Print error message and end program if the rule is invalid. """
     try:
-        population = file_data["population"]
-        parsed_population = {}
-        if not isinstance(population, dict):
-            raise TypeError("World population should a dictionary")
-        for key, value in population.items():
-            coordinate = parse_coordinates_from_file(key, world_size)
-            parsed_population[coordinate] = parse_cell_object_from_file(value, world_size)
-        return parsed_population
-    except KeyError as e:
-        print("Key 'population' should be used to map population")
-        print(str(e))
-        sys.exit()
-    except TypeError as e:
-        print(str(e))
-        sys.exit()
-    except Exception as e:
-        print(str(e))
+        return rules.parse_rule(_rule, _elder_age, _prime_elder_age)
+    except ValueError as e:
+        print(e)
         sys.exit()
 
 
-def load_seed_from_file(_file_name: str) -> tuple:
-    """ Read population seed from file.
-    check if data is of correct type, if not throw exception,
-    print error message end program.
-    Else parse data and store in a dictionary in the expected format for world.
-    Returns tuple: population (dict) and world_size (tuple). """
-
-    length = len(_file_name)
-    if length < 5:
-        _file_name = _file_name + ".json"
+def save_world(_path: Path, _engine: world.Engine):
+    """ Save the current generation of the engine, in the format given by the suffix of the file:
+    a .rle or .cells pattern or a binary snapshot. """
+    if str(_path).endswith((patterns.RLE_SUFFIX, patterns.CELLS_SUFFIX)):
+        patterns.save_pattern(_path, _engine)
     else:
-        last_five = _file_name[-5:]
-        print("Printing last five characters", last_five)
-        if last_five == ".json":
-            _file_name = _file_name
-        else:
-            _file_name = _file_name + ".json"
+        snapshot.save_snapshot(_path, _engine)
 
+
+def load_checkpoint_from_file(_file_name: str) -> tuple:
+    """ Read the checkpoint to resume from.
+    Print error message and end program if there is no valid checkpoint.
+    Returns tuple: population (world.PlanePopulation), world_size (tuple) and the metadata saved with it,
+    the name of the engine, the topology of the world, the rule and the --rng-seed of the run. """
     path = pathlib.Path.home() / RESOURCES / _file_name
-    print(f"The file to read is  {_file_name} with path {path}")
-    with open(path, 'r') as file:
-        data = json.load(file)
-        size = parse_world_size_form_file(data)
-        print("size: {}".format(size))
-        world = parse_population_from_file(data, size)
-        print(f"Value of world={world} and has size {size}")
-        return world, size
+    try:
+        population, metadata = checkpoint.load_checkpoint(path)
+    except (OSError, ValueError) as e:
+        print("Can not resume from {}: {}".format(path, e))
+        sys.exit()
+    print(f"Resuming from generation {population.generation} with size {population.world_size}")
+    return population, population.world_size, metadata
 
 
 def create_logger() -> logging.Logger:
-    """ Creates a logging object to be used for reports. """
+    """ Creates a logging object to be used for reports.
+    The records are queued and written to the file in batches by a listener thread, see log_queue.py,
+    the pipeline is kept on the logger to flush it at the end of a run. The file is only opened when the
+    first record is written, until then file_handler.mode can still be changed, e.g. to append on resume. """
     logger = logging.getLogger("gol_logger")
     logger.setLevel(logging.INFO)
 
     log_path = pathlib.Path.home() / RESOURCES / "gol.log"
-    file_handler = logging.FileHandler(log_path, mode="w")
+    file_handler = log_queue.BatchFileHandler(log_path, "w", _delay=True)
     file_handler.setLevel(logging.INFO)
-    logger.addHandler(file_handler)
+    logger.file_handler = file_handler
+    logger.pipeline = log_queue.LogPipeline(file_handler)
+    logger.addHandler(logger.pipeline.handler)
     return logger
 
 
+def get_peak_memory() -> int:
+    """ Return the peak resident set size of the process in bytes,
+    or None if it can not be read on this platform (the resource module is POSIX only). """
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    """ru_maxrss is in kilobytes on Linux and in bytes on macOS"""
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
 def simulation_decorator(func):
     """ Function decorator, used to run full extent of simulation. """
     logger = create_logger()
 
-    def wrapper(*args):
-        """number of rim cells is the same for all generations,
-        so count all rim cells by checking the state for each cell,
+    def wrapper(*args, headless: bool = False, renderer: render.TerminalRenderer = None, delay: float = 0.2,
+                save: Path = None, checkpointer: checkpoint.Checkpointer = None, cycles_mode: str = None,
+                stats: Path = None, profile: str = None, append_log: bool = False):
+        """number of rim cells is the same for all generations and follows from the world size,
         then loop for the number of generations given.
-        For each generation get new generation by calling func which will be
-        run_simulation function that prints current generation and returns next generation,
-        count live, elder, prime_elder and dead cells ,
-        log data and new generation becomes current generation for the next generation
+        The population is either a world in one of the formats of world.py (a dictionary world, a
+        PlanePopulation from populate_world or a snapshot), which is run by the dict engine, or an engine
+        created by create_engine.
+        For each generation print the current generation, get new generation by calling func
+        which will be run_simulation function that advances the engine,
+        get the live, elder, prime_elder and dead cells counted by the engine while it made the generation,
+        log data and new generation becomes current generation for the next generation.
+        Engines that can skip generations (hashlife) may advance more than one generation per call,
+        only the generations that are reached are printed and logged.
+        When the run is over the engine summary, if any, is logged and printed.
+        In headless mode the console is not cleared, the generations are not printed and there
+        is no pause between generations, the summary then also reports the simulation speed.
+        If a renderer is given the generations are drawn by it instead of being printed cell by cell,
+        delay is the pause in seconds between generations.
+        If save is given the last generation is written to that file, see save_world.
+        If a checkpointer is given it is updated after every generation and writes the checkpoints that are due.
+        With cycles_mode 'stop' or 'skip' a repeating world is detected, see cycles.py, and logged:
+        'stop' ends the simulation at the first repeat, 'skip' logs the remaining generations from
+        the counts of one period without simulating them. The engine is left at the last generation simulated.
+        If stats is given the counts of every generation are also written to that .csv or .jsonl file.
+        With profile 'summary' the time of every phase of the loop is measured, see profiling.py, and
+        added to the summary, with 'generations' the times of every generation are logged as well.
+        With append_log the reports are added to the log of the earlier run, e.g. when resuming from a checkpoint.
 
         """
-        current_population = args[1]
-        ordinary_cells = 0
-        for coordinate in current_population.keys():
-            if not is_rim_cell(coordinate, args[2]):
-                ordinary_cells += 1
-        for val in range(args[0]):
-            cb.clear_console()
-            new_population = func(args[0], current_population, args[2])
-
-            live_count = 0
-            dead_count = 0
-            elder_count = 0
-            prime_elder_count = 0
-            for key, value in current_population.items():
-                if value is not None:
-                    state = get_state_from_cell_details(value)
-                    if state == cb.STATE_ALIVE:
-                        live_count += 1
-                    if state == cb.STATE_DEAD:
-                        dead_count += 1
-                    if state == cb.STATE_ELDER:
-                        elder_count += 1
-                    if state == cb.STATE_PRIME_ELDER:
-                        prime_elder_count += 1
-
-            logger.info("GENERATION {}\n  Population: {}\n  Alive: {}\n  Elders: {}\n  Prime Elders: {}\n  Dead: {}"
-                        .format(val, ordinary_cells, live_count + elder_count + prime_elder_count, elder_count,
-                                prime_elder_count, dead_count))
-            current_population = new_population
-            sleep(0.2)
+        if append_log:
+            logger.file_handler.mode = "a"
+        engine = args[1]
+        if not isinstance(engine, world.Engine):
+            engine = DictEngine(engine, args[2])
+        start_generation = engine.generation
+        start_time = perf_counter()
+        stats_logger, stats_pipeline = log_queue.stats_logger(stats) if stats else (None, None)
+        profiler = None
+        if profile:
+            profiler = profiling.Profiler(logger if profile == "generations" else None)
+            engine.profiler = profiler
+
+        def log_generation(generation: int, counts: dict):
+            live_count = counts[cb.STATE_ALIVE]
+            dead_count = counts[cb.STATE_DEAD]
+            elder_count = counts[cb.STATE_ELDER]
+            prime_elder_count = counts[cb.STATE_PRIME_ELDER]
+            """the message is formatted by the log listener thread, not by the simulation loop"""
+            logger.info("GENERATION %d\n  Population: %d\n  Alive: %d\n  Elders: %d\n"
+                        "  Prime Elders: %d\n  Dead: %d",
+                        generation, engine.ordinary_cells(), live_count + elder_count + prime_elder_count,
+                        elder_count, prime_elder_count, dead_count)
+            if stats_logger is not None:
+                stats_logger.info("", generation, live_count + elder_count + prime_elder_count, elder_count,
+                                  prime_elder_count, dead_count)
+
+        """with cycle detection the hash of every generation reached is checked against the earlier ones,
+        after a repeat the counts of one period of settled generations are kept to skip the remaining ones.
+        The generations between two checks of an engine that skips ahead are not checked, so a repeat found
+        after such a jump is only measured with a multiple of the period. The engine then makes single steps
+        from there and the period is measured again, as the world already repeats it is found within one period."""
+        detector = None
+        single_steps = False
+        jumped = False
+        if cycles_mode:
+            detector = cycles.CycleDetector()
+            engine.track_hash()
+            detector.check(engine.generation, engine.live_hash)
+        cycle = None
+        settled = {}
+        skipped = 0
+        try:
+            while engine.generation < args[0]:
+                val = engine.generation
+                if profiler is not None:
+                    profiler.begin(val)
+                if renderer is not None and not headless:
+                    renderer.draw(engine)
+                elif not headless:
+                    cb.clear_console()
+                    print_world(engine)
+                if profiler is not None:
+                    profiler.lap(profiling.RENDERING)
+                counts = engine.counts()
+                if profiler is not None:
+                    profiler.lap(profiling.STATISTICS)
+                engine = func(1 if single_steps else args[0] - val, engine, args[2])
+                jumped = jumped or engine.generation - val > 1
+                if profiler is not None:
+                    profiler.lap(profiling.STEP)
+                if checkpointer is not None:
+                    checkpointer.update(engine)
+                if profiler is not None:
+                    profiler.lap(profiling.OTHER)
+                log_generation(val, counts)
+                if profiler is not None:
+                    profiler.lap(profiling.LOGGING)
+
+                if cycle is None and detector is not None:
+                    first = detector.check(engine.generation, engine.live_hash)
+                    if first is not None and jumped and not single_steps:
+                        single_steps = True
+                        detector = cycles.CycleDetector()
+                        detector.check(engine.generation, engine.live_hash)
+                    elif first is not None:
+                        cycle = (first, engine.generation, engine.generation - first)
+                        logger.info("CYCLE\n  First repeat: %d\n  Repeats generation: %d\n  Period: %d",
+                                    cycle[1], cycle[0], cycle[2])
+                        if cycles_mode == "stop":
+                            break
+                elif cycle is not None:
+                    """skip mode: keep the counts of one settled period, then log the remaining generations"""
+                    first, repeat, period = cycle
+                    settled_from = cycles.settled_generation(repeat, engine.rule)
+                    if val >= settled_from:
+                        settled[val] = counts
+                    if val >= settled_from + period - 1:
+                        for generation in range(engine.generation, args[0]):
+                            counts = settled.get(settled_from + (generation - settled_from) % period)
+                            if counts is not None:
+                                log_generation(generation, counts)
+                        skipped = args[0] - engine.generation
+                        break
+                if profiler is not None:
+                    profiler.end()
+                if not headless and delay > 0:
+                    sleep(delay)
+            """a generation that ended the loop early is not ended above"""
+            if profiler is not None:
+                profiler.end()
+            if save:
+                save_world(save, engine)
+            summary = engine.summary()
+            if engine.rule != rules.CONWAY:
+                summary["rule"] = str(engine.rule)
+            if cycle is not None:
+                summary["cycle"] = "period {} from generation {}".format(cycle[2], cycle[0])
+                if skipped:
+                    summary["skipped generations"] = skipped
+            if checkpointer is not None:
+                checkpointer.close()
+                summary["checkpoints"] = checkpointer.written
+                if checkpointer.error is not None:
+                    summary["checkpoint error"] = str(checkpointer.error)
+            if headless:
+                elapsed = perf_counter() - start_time
+                generations = engine.generation - start_generation
+                cells = generations * args[2][0] * args[2][1]
+                peak_memory = get_peak_memory()
+                summary["generations"] = generations
+                summary["seconds"] = "{:.3f}".format(elapsed)
+                summary["generations/sec"] = "{:.1f}".format(generations / elapsed if elapsed else 0)
+                summary["cells/sec"] = "{:.0f}".format(cells / elapsed if elapsed else 0)
+                summary["peak RSS"] = "n/a" if peak_memory is None else "{:.1f} MiB".format(peak_memory / 2 ** 20)
+            if profiler is not None:
+                summary.update(profiler.summary())
+            if summary:
+                report = "SUMMARY ({} engine)\n".format(engine.name) + \
+                         "\n".join("  {}: {}".format(key[0].upper() + key[1:], value)
+                                   for key, value in summary.items())
+                logger.info(report)
+                print(report)
+        finally:
+            engine.close()
+            logger.pipeline.flush()
+            if stats_pipeline is not None:
+                stats_pipeline.stop()
+            if checkpointer is not None:
+                checkpointer.close()
+            if renderer is not None:
+                renderer.close()
     return wrapper
 
 
@@ -323,52 +435,36 @@ def is_rim_cell(_position: tuple, _world_size: tuple):
     return False
 
 
-def populate_world(_world_size: tuple, _seed_pattern: str = None) -> dict:
+def populate_world(_world_size: tuple, _seed_pattern: str = None, _rng: random.Random = None,
+                   _density: float = None) -> world.PlanePopulation:
     """ This function populate return the world with seed population.
-     two helper inner functions are used here for readability and to avoid nesting at multiple levels.
-     Here the format of the coordinate is (y,x) format to match the format used in provided patterns"""
+     The pattern is looked up once, returns a list of coordinates if _seed_pattern is one of the predefined patterns
+     or None if the given pattern is unknown or if no pattern was passed.
+     If the pattern is None the cells are alive with probability _density (DENSITY by default), the whole
+     random field is drawn from _rng in one call, so the world is reproducible when _rng is seeded.
+     Rim cells are set last, as a pattern cell on the rim is a rim cell.
+     The world is returned as state and age planes, see world.PlanePopulation"""
     width = _world_size[0]
     height = _world_size[1]
+    states, ages = world.empty_planes(_world_size)
+    pattern = cb.get_pattern(_seed_pattern, _world_size)
+    if pattern is None:
+        rng = _rng or random.Random()
+        density = DENSITY if _density is None else _density
+        states[:] = rng.randbytes(width * height).translate(get_density_table(density))
+    else:
+        for (y, x) in pattern:
+            if 0 <= y < height and 0 <= x < width:
+                states[y * width + x] = world.CODE_ALIVE
+    world.set_rim(states, _world_size)
+    return world.PlanePopulation(states, ages, _world_size)
 
-    def get_cell_state(position):
-        """Determine the state of a cell.
-         Check if cell is a rim cell by calling function is_rim_cell if so return STATE_RIM,
-         get pattern, returns a list of coordinates if _seed_pattern is one of the predefined patterns
-         or None if the given pattern is unknown or if no pattern was passed.
-         if pattern is None get a random integer and
-         if the integer is greater than 16 return STATE_ALIVE else return STATE_DEAD
-        else check if coordinate is found in the list returned by get_pattern, if yes return STATE_ALIVE
-        else return STATE_DEAD
-        cells state are determined from pattern if given or by randomisation if pattern is not given"""
-        if is_rim_cell(position, _world_size):
-            return cb.STATE_RIM
-        pattern = cb.get_pattern(_seed_pattern, _world_size)
-        if pattern is None:
-            random.seed()
-            if random.randint(0, 20) > 16:
-                return cb.STATE_ALIVE
-            return cb.STATE_DEAD
-        else:
-            if position in pattern:
-                return cb.STATE_ALIVE
-            return cb.STATE_DEAD
-
-    def get_cell_object(position):
-        """return a dictionary with the cell state mapped to a list of the
-        cell's neighbours or None if cell is rim cell"""
-        if is_rim_cell(position, _world_size):
-            return None
-        else:
-            neighbours = calc_neighbour_positions(position)
-            state = get_cell_state(position)
-            return {state: neighbours, "age": 0}
 
-    """Map world positions to corresponding cell objects and return world"""
-    world = {}
-    for x in range(width):
-        for y in range(height):
-            world[(y, x)] = get_cell_object((y, x))
-    return world
+def get_density_table(_density: float) -> bytes:
+    """ Translation table of random bytes to state codes: a byte below _density * 256 is a live cell.
+    The density is rounded to a multiple of 1/256. """
+    threshold = min(max(round(_density * 256), 0), 256)
+    return bytes([world.CODE_ALIVE] * threshold + [world.CODE_DEAD] * (256 - threshold))
 
 
 def calc_neighbour_positions(_cell_coord: tuple) -> list:
@@ -397,69 +493,233 @@ def calc_neighbour_positions(_cell_coord: tuple) -> list:
     return neighbours
 
 
+@lru_cache(maxsize=2)
+def get_neighbour_table(_world_size: tuple) -> MappingProxyType:
+    """ Map the position of every cell that is not a rim cell to the tuple of its neighbours.
+    The neighbours only depend on the world size, so the table is computed once per size
+    and shared, read only, by every generation and every run with that size.
+    Every position is created once and shared by the keys and the neighbour tuples,
+    and only the tables of the last two sizes are kept. """
+    width = _world_size[0]
+    height = _world_size[1]
+    positions = [[(y, x) for x in range(width)] for y in range(height)]
+    table = {}
+    for y in range(1, height - 1):
+        above, row, below = positions[y - 1], positions[y], positions[y + 1]
+        for x in range(1, width - 1):
+            """NW, N, NE, W, E, SW, S, SE as in calc_neighbour_positions"""
+            table[row[x]] = (above[x - 1], above[x], above[x + 1], row[x - 1], row[x + 1],
+                             below[x - 1], below[x], below[x + 1])
+    return MappingProxyType(table)
+
+
 def get_state_from_cell_details(_cell_details):
-    """get state key by get the key that is not 'age'"""
-    for key in _cell_details.keys():
-        if key is not "age":
-            return key
+    """get state of a Cell, cell details in the earlier dictionary formats
+    are converted by world.to_cell"""
+    if isinstance(_cell_details, world.Cell):
+        return _cell_details.state
+    return world.to_cell(_cell_details).state
+
+
+class DictEngine(world.Engine):
+    """ Engine running the dictionary world created by populate_world through update_world. """
+
+    name = "dict"
+
+    def __init__(self, _population: dict, _world_size: tuple, _rule: rules.Rule = rules.CONWAY):
+        super().__init__(_world_size, _rule)
+        self.population = world.to_cell_population(_population)
+        self.state_counts = self.count_states()
+
+    def step(self):
+        """ Replace the population with the next generation from update_world.
+        If the hash is tracked it is updated with the cells that were born or died. """
+        if self.live_hash is None:
+            self.population = update_world(self.population, self.world_size, False, self.state_counts,
+                                           _rule=self.rule, _profiler=self.profiler)
+        else:
+            changes = []
+            self.population = update_world(self.population, self.world_size, False, self.state_counts, changes,
+                                           self.rule, self.profiler)
+            width = self.world_size[0]
+            for (y, x) in changes:
+                self.live_hash ^= world.cell_key(y * width + x)
+        self.generation += 1
+
+    def rows(self):
+        """ Yield each row of the world as a string of state characters. """
+        width, height = self.world_size
+        for y in range(height):
+            row = []
+            for x in range(width):
+                cell_object = self.population[(y, x)]
+                if is_rim_cell((y, x), self.world_size) or cell_object is None:
+                    row.append(cb.STATE_RIM)
+                else:
+                    row.append(cell_object.state)
+            yield "".join(row)
+
+    def counts(self) -> dict:
+        """ Return the live, elder, prime_elder and dead cells kept up to date by update_world. """
+        return dict(self.state_counts)
+
+    def count_states(self) -> dict:
+        """ Count live, elder, prime_elder and dead cells, rim cells have None as value. """
+        counts = {cb.STATE_ALIVE: 0, cb.STATE_ELDER: 0, cb.STATE_PRIME_ELDER: 0, cb.STATE_DEAD: 0}
+        for key, value in self.population.items():
+            if value is not None:
+                if value.state in counts:
+                    counts[value.state] += 1
+        return counts
+
+    def to_planes(self) -> tuple:
+        """ Return the world as flat (states, ages) planes. """
+        return world.population_to_planes(self.population, self.world_size)
+
+    def to_population(self) -> dict:
+        """ Return the dictionary world. """
+        return self.population
+
+
+def copy_population(_population: dict) -> dict:
+    """ Return a dictionary world with a new Cell for every cell of _population. """
+    return {position: None if cell is None else world.Cell(cell.state, cell.age)
+            for position, cell in _population.items()}
+
+
+class BufferedDictEngine(DictEngine):
+    """ Dictionary engine writing every generation into one of two worlds that are allocated once.
+    The next generation is written in place into the cells of the previous one and the two worlds
+    are swapped, so a running simulation creates no dictionaries or cells and, as the states and ages
+    are strings and ints, no objects the garbage collector has to track. """
+
+    name = "buffered"
+
+    def __init__(self, _population: dict, _world_size: tuple, _rule: rules.Rule = rules.CONWAY):
+        super().__init__(_population, _world_size, _rule)
+        self.population = copy_population(self.population)
+        self.buffer = copy_population(self.population)
+        """(position, neighbours) of every cell that is not a rim cell"""
+        self.interior = tuple(get_neighbour_table(tuple(self.world_size)).items())
+
+    def step(self):
+        """ Write the next generation into the buffer and swap it with the population.
+        The next state is looked up with the next_state function of the rule, as in update_world,
+        the counts and the hash are updated for every cell that changes. """
+        current, following = self.population, self.buffer
+        next_state = self.rule.next_state
+        counts = self.state_counts
+        width = self.world_size[0]
+        for position, neighbours in self.interior:
+            cell = current[position]
+            state, age = next_state(cell.state, cell.age, count_alive_neighbours(neighbours, current))
+            target = following[position]
+            target.state = state
+            target.age = age
+            if state != cell.state:
+                if cell.state in counts:
+                    counts[cell.state] -= 1
+                counts[state] += 1
+                if self.live_hash is not None and (state == cb.STATE_DEAD) != (cell.state in DEAD_STATES):
+                    self.live_hash ^= world.cell_key(position[0] * width + position[1])
+        self.population, self.buffer = following, current
+        self.generation += 1
+
+    def to_population(self) -> dict:
+        """ Return a copy of the dictionary world, the engine writes into its own worlds. """
+        return copy_population(self.population)
+
+
+ENGINES = {
+    DictEngine.name: DictEngine,
+    BufferedDictEngine.name: BufferedDictEngine,
+    numpy_engine.NumpyEngine.name: numpy_engine.NumpyEngine,
+    sparse_engine.SparseEngine.name: sparse_engine.SparseEngine,
+    bitpack_engine.BitPackEngine.name: bitpack_engine.BitPackEngine,
+    chunk_engine.ChunkEngine.name: chunk_engine.ChunkEngine,
+    flat_engine.FlatEngine.name: flat_engine.FlatEngine,
+    hashlife.HashLifeEngine.name: hashlife.HashLifeEngine,
+    parallel_engine.ParallelEngine.name: parallel_engine.ParallelEngine
+}
+
+
+def create_engine(_name: str, _population: dict, _world_size: tuple, **_options) -> world.Engine:
+    """ Create the simulation engine with the given name from a population in the dictionary format,
+    or from a snapshot.
+    _options are passed on to engines that take extra arguments, e.g. _workers for the parallel engine.
+    Print error message and exit if the engine can not be used, e.g. an optional dependency is missing
+    or it can not simulate the topology given as _topology. """
+    topology = _options.get("_topology", world.TOPOLOGY_BOUNDED)
+    if _name in ENGINES and topology not in ENGINES[_name].topologies:
+        sys.exit("The {} engine can not simulate a {} world, use one of: {}".format(
+            _name, topology, ", ".join(name for name, engine in ENGINES.items() if topology in engine.topologies)))
+    try:
+        engine = ENGINES[_name](_population, _world_size, **_options)
+    except KeyError:
+        sys.exit("Unknown engine '{}', choose one of: {}".format(_name, ", ".join(ENGINES)))
+    except ImportError as e:
+        sys.exit(str(e))
+    """a snapshot continues from the generation it was saved at"""
+    if isinstance(_population, world.PlanePopulation):
+        engine.set_generation(_population.generation)
+    return engine
+
+
+def print_world(_engine: world.Engine):
+    """ Print every cell of the current generation, one row of the world per line. """
+    for row in _engine.rows():
+        for state in row:
+            cb.progress(cb.get_print_value(state))
+        print("")
 
 
 @simulation_decorator
-def run_simulation(_generations: int, _population: dict, _world_size: tuple):
-    """ Encapsulates the update_world function and Represents a tick in the simulation. """
-    return update_world(_population, _world_size)
+def run_simulation(_generations: int, _population, _world_size: tuple):
+    """ Encapsulates the update_world function and Represents a tick in the simulation.
+    _population is the engine holding the current generation, which is advanced by
+    at most _generations (the generations left to run) and returned. """
+    _population.advance(_generations)
+    return _population
 
 
-def update_world(_cur_gen: dict, _world_size: tuple) -> dict:
+def update_world(_cur_gen: dict, _world_size: tuple, _render: bool = True, _counts: dict = None,
+                 _changes: list = None, _rule: rules.Rule = rules.CONWAY,
+                 _profiler: profiling.Profiler = None) -> dict:
     """ Represents a tick in the simulation.
-    Prints current generation and generate and returns next generation """
+    Prints current generation if _render is True and generate and returns next generation.
+    If _counts, the number of cells per state of the current generation, is given it is updated
+    to the next generation for every cell that changes state.
+    If _changes is given the positions of the cells that are born or die are appended to it.
+    _rule decides the state of every cell in the next generation, Conway's rules by default.
+    If _profiler is given the live neighbours of all cells are counted before the transitions,
+    so the two are timed as separate phases. """
 
     def get_cell_next_state(position: tuple):
         """Determine cell state for next generation from current cell state and state of neighbours,
-        and update age by adding 1 to age value if cell is alive and assigning zero to age if dead
+        and update age by adding 1 to age value if cell is alive and assigning zero to age if dead.
+        The next state is looked up in the table of _rule, see rules.py. With the default rule:
         Any live cell with two or three live neighbours survives.
         Any dead cell with three live neighbours becomes a live cell.
         All other live cells die in the next generation.
         all other dead cells stay dead.
         For live if age >5 state is STATE_ELDER, if age >10 state is STATE_PRIME_ELDER"""
         _cell_object = _cur_gen[position]
-        _state = get_state_from_cell_details(_cell_object)
-        _neighbours = _cell_object[_state]
-        live_neighbour = count_alive_neighbours(_neighbours, _cur_gen)
-        if _state == cb.STATE_ALIVE and live_neighbour == 2:
-            age = _cell_object["age"] + 1
-            if age > 5:
-                return cb.STATE_ELDER, age
-            return cb.STATE_ALIVE, age
-        elif _state == cb.STATE_ALIVE and live_neighbour == 3:
-            age = _cell_object["age"] + 1
-            if age > 5:
-                return cb.STATE_ELDER, age
-            return cb.STATE_ALIVE, age
-        elif _state == cb.STATE_ELDER and live_neighbour == 2:
-            age = _cell_object["age"] + 1
-            if age > 10:
-                return cb.STATE_PRIME_ELDER, age
-            return cb.STATE_ELDER, age
-        elif _state == cb.STATE_ELDER and live_neighbour == 3:
-            age = _cell_object["age"] + 1
-            if age > 10:
-                return cb.STATE_PRIME_ELDER, age
-            return cb.STATE_ELDER, age
-        elif _state == cb.STATE_PRIME_ELDER and live_neighbour == 2:
-            age = _cell_object["age"] + 1
-            return cb.STATE_PRIME_ELDER, age
-        elif _state == cb.STATE_PRIME_ELDER and live_neighbour == 3:
-            age = _cell_object["age"] + 1
-            return cb.STATE_PRIME_ELDER, age
-        elif _state == cb.STATE_DEAD and live_neighbour == 3:
-            age = _cell_object["age"] + 1
-            return cb.STATE_ALIVE, age
+        if live_counts is None:
+            live_neighbour = count_alive_neighbours(neighbour_table[position], _cur_gen)
         else:
-            return cb.STATE_DEAD, 0
+            live_neighbour = live_counts[position]
+        return next_state(_cell_object.state, _cell_object.age, live_neighbour)
 
     width = _world_size[0]
     height = _world_size[1]
+    neighbour_table = get_neighbour_table(tuple(_world_size))
+    next_state = _rule.next_state
+    _cur_gen = world.to_cell_population(_cur_gen)
+    live_counts = None
+    if _profiler is not None:
+        live_counts = {position: count_alive_neighbours(neighbours, _cur_gen)
+                       for position, neighbours in neighbour_table.items()}
+        _profiler.lap(profiling.NEIGHBOURS)
     next_generation = {}
     """for cell in every position in world, print current cell state, 
     determine state for next generation,
@@ -469,16 +729,25 @@ def update_world(_cur_gen: dict, _world_size: tuple) -> dict:
         for x in range(width):
             coordinate = (y, x)
             if is_rim_cell(coordinate, _world_size):
-                cb.progress(cb.get_print_value(cb.STATE_RIM))
+                if _render:
+                    cb.progress(cb.get_print_value(cb.STATE_RIM))
                 next_generation[coordinate] = None
             else:
-                cell_object = _cur_gen[coordinate]
-                state = get_state_from_cell_details(cell_object)
-                cb.progress(cb.get_print_value(state))
-                neighbours = cell_object[state]
+                state = _cur_gen[coordinate].state
+                if _render:
+                    cb.progress(cb.get_print_value(state))
                 (new_state, new_age) = get_cell_next_state(coordinate)
-                next_generation[coordinate] = {new_state: neighbours, "age": new_age}
-        print("")
+                next_generation[coordinate] = world.Cell(new_state, new_age)
+                if _counts is not None and new_state != state:
+                    if state in _counts:
+                        _counts[state] -= 1
+                    _counts[new_state] += 1
+                if _changes is not None and (new_state == cb.STATE_DEAD) != (state in DEAD_STATES):
+                    _changes.append(coordinate)
+        if _render:
+            print("")
+    if _profiler is not None:
+        _profiler.lap(profiling.TRANSITIONS)
     return next_generation
 
 
@@ -486,7 +755,7 @@ def count_alive_neighbours(_neighbours: list, _cells: dict) -> int:
     """ Determine how many of the neighbouring cells are currently alive.
     Start counter live_cell at 0
     For each cell in _neighbours, check that the cell is not a rim cell because
-    rim cells cell has a None value for cell_object and .keys() operation on a
+    rim cells cell has a None value for cell_object and reading the state of a
     None value will generate an error.
     If cell is not a rim cell, check if cell state is STATE_ALIVE or STATE_ELDER, or STATE_PRIME_ELDER
     if yes, increase counter live_cell by 1"""
@@ -495,14 +764,21 @@ def count_alive_neighbours(_neighbours: list, _cells: dict) -> int:
         cell_object = _cells[val]
         """if cell is not a rim-cell"""
         if cell_object is not None:
-            state = get_state_from_cell_details(cell_object)
+            state = cell_object.state
             if state == cb.STATE_ALIVE or state == cb.STATE_ELDER or state == cb.STATE_PRIME_ELDER:
                 live_cell += 1
     return live_cell
 
 
 def main():
-    """ The main program execution. YOU MAY NOT MODIFY ANYTHING IN THIS FUNCTION!! """
+    """ The main program execution.
+    The world is loaded from a seed, snapshot or pattern file (-f), resumed from a checkpoint (--resume)
+    or populated from a code_base pattern or at random (-s, -ws, --rng-seed, --density).
+    The engine, topology and rule (-e, -t, --rule, --elder-age, --prime-elder-age) are taken from the
+    options, or from the checkpoint or pattern file when the options are not given. The workers of the parallel
+    engine (-w) and the age tracking of the hashlife engine (--no-ages) are only taken from the options.
+    The simulation is then run for -g generations, headless or rendered (--headless, -r, -d), with the optional
+    checkpoints, cycle detection, statistics file, profiling and save of the last generation. """
     epilog = "DT179G Project v" + __version__
     parser = argparse.ArgumentParser(description=__desc__, epilog=epilog, add_help=True)
     parser.add_argument('-g', '--generations', dest='generations', type=int, default=50,
@@ -511,20 +787,130 @@ def main():
                         help='Starting seed. If omitted, a randomized seed will be used.')
     parser.add_argument('-ws', '--worldsize', dest='worldsize', type=str, default='80x40',
                         help='Size of the world, in terms of width and height. Defaults to 80x40.')
+    parser.add_argument('--rng-seed', dest='rng_seed', type=int,
+                        help='Seed of the random generator, '
+                             'a random world is the same for every run with the same seed.')
+    parser.add_argument('--density', dest='density', type=float, default=DENSITY,
+                        help='Share of live cells in a random world, between 0 and 1. '
+                             'Defaults to {:.3f}.'.format(DENSITY))
     parser.add_argument('-f', '--file', dest='file', type=str,
-                        help='Load starting seed from file.')
+                        help='Load starting seed from file: a JSON seed, a binary snapshot (.snap) '
+                             'or a .rle or .cells pattern placed in a world of the size given by -ws.')
+    parser.add_argument('-e', '--engine', dest='engine', type=str,
+                        choices=ENGINES.keys(),
+                        help='Engine used to run the simulation. Defaults to the engine of the checkpoint '
+                             'with --resume, otherwise to dict.')
+    parser.add_argument('-t', '--topology', dest='topology', type=str, choices=world.TOPOLOGIES,
+                        help='Edges of the world: bounded by a dead rim, wrapped around as a torus, or an infinite '
+                             'plane that grows as the pattern expands. Torus and infinite need the bitpack engine. '
+                             'Defaults to the topology of the checkpoint with --resume, otherwise to bounded.')
+    parser.add_argument('--rule', dest='rule', type=str,
+                        help='Rule in B/S notation, e.g. B36/S23, or one of: {}. '
+                             'Defaults to the rule of the checkpoint with --resume or of a .rle file, '
+                             'otherwise to B3/S23.'
+                        .format(", ".join(rules.NAMED_RULES)))
+    parser.add_argument('--elder-age', dest='elder_age', type=int,
+                        help='Age after which a live cell becomes an elder. '
+                             'Defaults to {}.'.format(world.ELDER_AGE))
+    parser.add_argument('--prime-elder-age', dest='prime_elder_age', type=int,
+                        help='Age after which an elder becomes a prime elder. Defaults to {}.'
+                        .format(world.PRIME_ELDER_AGE))
+    parser.add_argument('--headless', dest='headless', action='store_true',
+                        help='Run without printing the world or pausing between generations and '
+                             'report the simulation speed at the end.')
+    parser.add_argument('-r', '--renderer', dest='renderer', type=str, default='console',
+                        choices=['console', 'buffered'],
+                        help='Output of the generations: console prints every cell, buffered draws one frame per '
+                             'generation and only redraws the cells that changed. Defaults to console.')
+    parser.add_argument('-d', '--delay', dest='delay', type=float, default=0.2,
+                        help='Pause in seconds between generations. Defaults to 0.2.')
+    parser.add_argument('-w', '--workers', dest='workers', type=int,
+                        help='Number of worker processes of the parallel engine. Defaults to the number of CPUs.')
+    parser.add_argument('--no-ages', dest='track_ages', action='store_false',
+                        help='Let the hashlife engine jump many generations at once instead of stepping every '
+                             'generation. Its live cells are then reported as alive, without ages.')
+    parser.add_argument('--save', dest='save', type=str,
+                        help='Save the last generation to a file in _Resources, which can be loaded with -f: '
+                             'a binary snapshot, or the live cells as a .rle or .cells pattern.')
+    parser.add_argument('-o', '--offset', dest='offset', type=str,
+                        help='Position XxY of the top left corner of a .rle or .cells pattern loaded with -f. '
+                             'Defaults to the centre of the world.')
+    parser.add_argument('--checkpoint-every', dest='checkpoint_every', type=int,
+                        help='Write a checkpoint every N generations.')
+    parser.add_argument('--checkpoint-seconds', dest='checkpoint_seconds', type=float,
+                        help='Write a checkpoint every T seconds.')
+    parser.add_argument('--checkpoint-file', dest='checkpoint_file', type=str, default='checkpoint.snap',
+                        help='Checkpoint file in _Resources, written by the checkpoint options '
+                             'and read by --resume. Defaults to checkpoint.snap.')
+    parser.add_argument('--resume', dest='resume', action='store_true',
+                        help='Restart from the latest checkpoint and run until generation -g.')
+    parser.add_argument('--cycles', dest='cycles', type=str, choices=['stop', 'skip'],
+                        help='Detect when the world becomes static or periodic and stop the simulation, '
+                             'or skip the remaining generations by repeating the counts of the period.')
+    parser.add_argument('--stats', dest='stats', type=str,
+                        help='Also write the counts of every generation to a file in _Resources, '
+                             'as CSV if the name ends with .csv, otherwise as JSON lines.')
+    parser.add_argument('--profile', dest='profile', type=str, nargs='?', const='summary',
+                        choices=['summary', 'generations'],
+                        help='Time the phases of every generation and add the totals to the summary, '
+                             'with generations the times of every generation are also logged.')
+    parser.add_argument('--validate-seed', dest='validate_seed', action='store_true',
+                        help='Also check the neighbour lists of the cells when loading a seed file.')
 
     args = parser.parse_args()
 
-    try:
-        if not args.file:
-            raise AssertionError
-        population, world_size = load_seed_from_file(args.file)
-    except (AssertionError, FileNotFoundError):
-        world_size = parse_world_size_arg(args.worldsize)
-        population = populate_world(world_size, args.seed)
-
-    run_simulation(args.generations, population, world_size)
+    engine_name = args.engine or DictEngine.name
+    topology = args.topology or world.TOPOLOGY_BOUNDED
+    rule, (elder_age, prime_elder_age) = rules.CONWAY.notation, (world.ELDER_AGE, world.PRIME_ELDER_AGE)
+    pattern_rule = None
+    if args.resume:
+        population, world_size, metadata = load_checkpoint_from_file(args.checkpoint_file)
+        engine_name = args.engine or metadata.get("engine") or DictEngine.name
+        topology = args.topology or metadata.get("topology", world.TOPOLOGY_BOUNDED)
+        rule = metadata.get("rule", rule)
+        elder_age, prime_elder_age = metadata.get("elder_ages", (elder_age, prime_elder_age))
+        if args.rng_seed is None:
+            args.rng_seed = metadata.get("rng_seed")
+    else:
+        try:
+            if not args.file:
+                raise AssertionError
+            if args.file.endswith((patterns.RLE_SUFFIX, patterns.CELLS_SUFFIX)):
+                population, world_size, pattern_rule = load_pattern_from_file(
+                    args.file, parse_world_size_arg(args.worldsize),
+                    parse_offset_arg(args.offset) if args.offset else None)
+                rule = pattern_rule or rule
+            else:
+                population, world_size = load_seed_from_file(args.file, args.validate_seed)
+        except (AssertionError, FileNotFoundError):
+            world_size = parse_world_size_arg(args.worldsize)
+            population = populate_world(world_size, args.seed,
+                                        random.Random(args.rng_seed) if args.rng_seed is not None else None,
+                                        args.density)
+
+    options = {"_rule": parse_rule_arg(args.rule or rule,
+                                       elder_age if args.elder_age is None else args.elder_age,
+                                       prime_elder_age if args.prime_elder_age is None else args.prime_elder_age)}
+    if pattern_rule is not None and options["_rule"].notation != pattern_rule:
+        print("The pattern is written for rule {}, running it with rule {}".format(pattern_rule,
+                                                                               options["_rule"].notation))
+    if engine_name == parallel_engine.ParallelEngine.name:
+        options["_workers"] = args.workers
+    if engine_name == hashlife.HashLifeEngine.name:
+        options["_track_ages"] = args.track_ages
+    if topology != world.TOPOLOGY_BOUNDED:
+        options["_topology"] = topology
+    engine = create_engine(engine_name, population, world_size, **options)
+    checkpointer = None
+    if args.checkpoint_every or args.checkpoint_seconds:
+        checkpointer = checkpoint.Checkpointer(RESOURCES / args.checkpoint_file, args.checkpoint_every,
+                                               args.checkpoint_seconds, engine.generation, args.rng_seed)
+    run_simulation(args.generations, engine, world_size,
+                   headless=args.headless, delay=args.delay, save=RESOURCES / args.save if args.save else None,
+                   renderer=render.TerminalRenderer() if args.renderer == 'buffered' else None,
+                   checkpointer=checkpointer, cycles_mode=args.cycles,
+                   stats=RESOURCES / args.stats if args.stats else None, profile=args.profile,
+                   append_log=args.resume)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,403 @@
+#!/usr/bin/env python
+"""
+HashLife simulation engine for very long runs.
+
+The world is stored as a quadtree: a node of level k is a square of 2^k x 2^k cells made of
+four nodes of level k - 1, and a node of level 0 is a single cell. Nodes are immutable and
+interned, so identical parts of the world share a single node. The successor of a node of
+level k, which is its centre square advanced 2^j generations (j <= k - 2), is computed
+recursively from the successors of its sub-nodes and memoized per (node, j). Repeated and
+periodic structures are therefore only computed once, which lets the engine jump many
+generations at once.
+
+HashLife computes the infinite plane, while gol.py has a dead rim. A live cell can influence
+cells at most one position away per generation, so as long as a jump is not longer than the
+distance between the live cells and the rim, no cell on or outside the rim can come alive
+before the jump ends. Jumps are limited to the largest power of two below that distance and
+cells that end up on or outside the rim are cleared after each jump, which gives the same
+live cells as gol.update_world.
+
+Near the rim that limit makes every jump a single generation, which the quadtree computes much
+slower than a bit-packed row. While the live cells are closer than STEP_DISTANCE to the rim the
+engine steps the world with a bitpack_engine.BitPackEngine instead, and it goes back to jumping
+once the live cells are at least JUMP_DISTANCE away from the rim again.
+
+The quadtree only holds live and dead cells. With age tracking turned off all live cells are
+reported with the alive state. With age tracking on, the default, jumping would skip the ages,
+so every generation is a single step of the bit-packed engine, which gives the states and ages
+of gol.update_world.
+"""
+
+import code_base as cb
+import world
+import rules
+import bitpack_engine
+
+STEP_DISTANCE = 2  # single steps while the live cells are closer than this to the rim
+JUMP_DISTANCE = 8  # jump again once the live cells are at least this far from the rim
+CHECK_STEPS = 16  # single steps between two checks of the distance to the rim
+
+
+class Node:
+    """ Interned quadtree node. Level 0 nodes are single cells with population 0 or 1. """
+
+    __slots__ = ("level", "nw", "ne", "sw", "se", "population")
+
+    def __init__(self, _level: int, _nw, _ne, _sw, _se, _population: int):
+        self.level = _level
+        self.nw, self.ne, self.sw, self.se = _nw, _ne, _sw, _se
+        self.population = _population
+
+
+class Universe:
+    """ Node table and successor cache shared by all nodes of a HashLife world, which follows _rule. """
+
+    def __init__(self, _rule: rules.Rule = rules.CONWAY):
+        """the next generation of a dead and of a live cell, indexed by its live neighbours"""
+        self.next_live = (_rule.birth_table, _rule.survival_table)
+        self.table = {}
+        self.cache = {}
+        self.bounds_cache = {}
+        self.hits = 0
+        self.misses = 0
+        self.dead = Node(0, None, None, None, None, 0)
+        self.alive = Node(0, None, None, None, None, 1)
+        self.empty_nodes = [self.dead]
+
+    def join(self, _nw: Node, _ne: Node, _sw: Node, _se: Node) -> Node:
+        """ Return the interned node made of the four given quadrants. """
+        key = (_nw, _ne, _sw, _se)
+        node = self.table.get(key)
+        if node is None:
+            population = _nw.population + _ne.population + _sw.population + _se.population
+            node = Node(_nw.level + 1, _nw, _ne, _sw, _se, population)
+            self.table[key] = node
+        return node
+
+    def empty(self, _level: int) -> Node:
+        """ Return the empty node of the given level. """
+        while len(self.empty_nodes) <= _level:
+            last = self.empty_nodes[-1]
+            self.empty_nodes.append(self.join(last, last, last, last))
+        return self.empty_nodes[_level]
+
+    def centre(self, _node: Node) -> Node:
+        """ Return a node one level higher with _node in its centre, surrounded by dead cells. """
+        e = self.empty(_node.level - 1)
+        return self.join(self.join(e, e, e, _node.nw), self.join(e, e, _node.ne, e),
+                         self.join(e, _node.sw, e, e), self.join(_node.se, e, e, e))
+
+    def inner(self, _node: Node) -> Node:
+        """ Return the centre square of a node, one level lower. """
+        return self.join(_node.nw.se, _node.ne.sw, _node.sw.ne, _node.se.nw)
+
+    def life_4x4(self, _node: Node) -> Node:
+        """ Advance the centre 2x2 cells of a level 2 node by one generation. """
+        grid = [[0] * 4 for _ in range(4)]
+        for qy, qx, quadrant in ((0, 0, _node.nw), (0, 2, _node.ne), (2, 0, _node.sw), (2, 2, _node.se)):
+            grid[qy][qx] = quadrant.nw.population
+            grid[qy][qx + 1] = quadrant.ne.population
+            grid[qy + 1][qx] = quadrant.sw.population
+            grid[qy + 1][qx + 1] = quadrant.se.population
+        cells = []
+        for y in (1, 2):
+            for x in (1, 2):
+                live_neighbours = sum(grid[y + dy][x + dx] for (dy, dx) in world.NEIGHBOUR_OFFSETS)
+                cells.append(self.alive if self.next_live[grid[y][x]][live_neighbours] else self.dead)
+        return self.join(*cells)
+
+    def successor(self, _node: Node, _j: int) -> Node:
+        """ Return the centre of a node of level k >= 2 advanced 2^j generations, j <= k - 2.
+        The node is split into nine overlapping sub-squares of level k - 1 which are advanced
+        and combined into four squares of level k - 1. Those are advanced once more when the full
+        2^(k - 2) generations are wanted, otherwise only their centres are kept. """
+        j = min(_j, _node.level - 2)
+        key = (_node, j)
+        result = self.cache.get(key)
+        if result is not None:
+            self.hits += 1
+            return result
+        self.misses += 1
+        if _node.population == 0:
+            result = _node.nw
+        elif _node.level == 2:
+            result = self.life_4x4(_node)
+        else:
+            nw, ne, sw, se = _node.nw, _node.ne, _node.sw, _node.se
+            join = self.join
+            c1 = self.successor(join(nw.nw, nw.ne, nw.sw, nw.se), j)
+            c2 = self.successor(join(nw.ne, ne.nw, nw.se, ne.sw), j)
+            c3 = self.successor(join(ne.nw, ne.ne, ne.sw, ne.se), j)
+            c4 = self.successor(join(nw.sw, nw.se, sw.nw, sw.ne), j)
+            c5 = self.successor(join(nw.se, ne.sw, sw.ne, se.nw), j)
+            c6 = self.successor(join(ne.sw, ne.se, se.nw, se.ne), j)
+            c7 = self.successor(join(sw.nw, sw.ne, sw.sw, sw.se), j)
+            c8 = self.successor(join(sw.ne, se.nw, sw.se, se.sw), j)
+            c9 = self.successor(join(se.nw, se.ne, se.sw, se.se), j)
+            if j < _node.level - 2:
+                result = join(join(c1.se, c2.sw, c4.ne, c5.nw), join(c2.se, c3.sw, c5.ne, c6.nw),
+                              join(c4.se, c5.sw, c7.ne, c8.nw), join(c5.se, c6.sw, c8.ne, c9.nw))
+            else:
+                result = join(self.successor(join(c1, c2, c4, c5), j), self.successor(join(c2, c3, c5, c6), j),
+                              self.successor(join(c4, c5, c7, c8), j), self.successor(join(c5, c6, c8, c9), j))
+        self.cache[key] = result
+        return result
+
+    def build(self, _cells, _level: int) -> Node:
+        """ Build a node of the given level from (y, x) positions of live cells, bottom up. """
+        nodes = {position: self.alive for position in _cells}
+        for level in range(_level):
+            empty = self.empty(level)
+            parents = {}
+            for (y, x) in nodes:
+                parents.setdefault((y >> 1, x >> 1), None)
+            for (y, x) in parents:
+                get = nodes.get
+                parents[(y, x)] = self.join(get((2 * y, 2 * x), empty), get((2 * y, 2 * x + 1), empty),
+                                            get((2 * y + 1, 2 * x), empty), get((2 * y + 1, 2 * x + 1), empty))
+            nodes = parents
+        return nodes.get((0, 0), self.empty(_level))
+
+    def cells(self, _node: Node, _y: int = 0, _x: int = 0):
+        """ Yield the (y, x) positions of the live cells of a node placed at (_y, _x). """
+        if _node.population == 0:
+            return
+        if _node.level == 0:
+            yield _y, _x
+            return
+        half = 1 << (_node.level - 1)
+        yield from self.cells(_node.nw, _y, _x)
+        yield from self.cells(_node.ne, _y, _x + half)
+        yield from self.cells(_node.sw, _y + half, _x)
+        yield from self.cells(_node.se, _y + half, _x + half)
+
+    def bounds(self, _node: Node):
+        """ Return (top, left, bottom, right) of the live cells of a node relative to its
+        top left corner, or None if the node is empty. """
+        if _node.population == 0:
+            return None
+        if _node.level == 0:
+            return 0, 0, 0, 0
+        box = self.bounds_cache.get(_node)
+        if box is None:
+            half = 1 << (_node.level - 1)
+            found = []
+            for dy, dx, quadrant in ((0, 0, _node.nw), (0, half, _node.ne), (half, 0, _node.sw),
+                                     (half, half, _node.se)):
+                quadrant_box = self.bounds(quadrant)
+                if quadrant_box is not None:
+                    top, left, bottom, right = quadrant_box
+                    found.append((top + dy, left + dx, bottom + dy, right + dx))
+            box = (min(b[0] for b in found), min(b[1] for b in found),
+                   max(b[2] for b in found), max(b[3] for b in found))
+            self.bounds_cache[_node] = box
+        return box
+
+    def clip(self, _node: Node, _area: tuple, _y: int = 0, _x: int = 0) -> Node:
+        """ Return the node placed at (_y, _x) with every cell outside the area
+        (top, left, bottom, right) set to dead. """
+        top, left, bottom, right = _area
+        size = 1 << _node.level
+        if _node.population == 0 or (top <= _y and left <= _x and _y + size - 1 <= bottom and
+                                     _x + size - 1 <= right):
+            return _node
+        if _y > bottom or _x > right or _y + size - 1 < top or _x + size - 1 < left:
+            return self.empty(_node.level)
+        half = size >> 1
+        return self.join(self.clip(_node.nw, _area, _y, _x),
+                         self.clip(_node.ne, _area, _y, _x + half),
+                         self.clip(_node.sw, _area, _y + half, _x),
+                         self.clip(_node.se, _area, _y + half, _x + half))
+
+    def collect(self, _root: Node):
+        """ Drop the successor cache and every node that is not part of _root. """
+        self.cache = {}
+        self.bounds_cache = {}
+        table = {}
+        stack = [_root] + self.empty_nodes[1:]
+        while stack:
+            node = stack.pop()
+            if node.level == 0:
+                continue
+            key = (node.nw, node.ne, node.sw, node.se)
+            if key not in table:
+                table[key] = node
+                stack.extend(key)
+        self.table = table
+
+
+class HashLifeEngine(world.Engine):
+    """ Engine running the world as a memoized quadtree, or with single steps of a bit-packed
+    engine near the rim and when the ages are tracked. """
+
+    name = "hashlife"
+    max_nodes = 2000000  # drop the cache when the node table grows above this
+
+    def __init__(self, _population: dict, _world_size: tuple, _rule: rules.Rule = rules.CONWAY,
+                 _track_ages: bool = True):
+        super().__init__(_world_size, _rule)
+        width, height = self.world_size
+        self.universe = Universe(self.rule)
+        self.level = max(2, (max(width, height) - 1).bit_length())
+        self.track_ages = _track_ages
+        """interior of the world as (top, left, bottom, right)"""
+        self.interior = (1, 1, height - 2, width - 2)
+        """the bit-packed engine making single steps, None while the quadtree is used"""
+        self.stepper = None
+        self.single_steps = 0
+        if self.track_ages:
+            self.stepper = bitpack_engine.BitPackEngine(_population, self.world_size, _rule=self.rule)
+            self.root = self.universe.empty(self.level)
+            self.blocked = []
+            return
+        live = []
+        self.blocked = []
+        for (y, x), cell in _population.items():
+            if cell is None or not (1 <= y <= height - 2 and 1 <= x <= width - 2):
+                continue
+            cell = world.to_cell(cell)
+            code = world.STATE_CODES[cell.state]
+            if code in world.LIVE_CODES:
+                live.append((y, x))
+            elif code == world.CODE_RIM:
+                self.blocked.append((y, x))
+        self.root = self.universe.build(live, self.level)
+
+    def jump(self, _j: int):
+        """ Advance the root 2^j generations on the infinite plane. The root is padded twice so
+        that its successor has the original root area in its centre. """
+        universe = self.universe
+        padded = universe.centre(universe.centre(self.root))
+        self.root = universe.inner(universe.successor(padded, _j))
+
+    def rim_distance(self):
+        """ Distance between the live cells and the rim, None if there are no live cells. """
+        width, height = self.world_size
+        if self.stepper is None:
+            bounds = self.universe.bounds(self.root)
+            if bounds is None:
+                return None
+            top, left, bottom, right = bounds
+        else:
+            rows = [y for y, row in enumerate(self.stepper.bits) if row]
+            if not rows:
+                return None
+            used = 0
+            for y in rows:
+                used |= self.stepper.bits[y]
+            top, bottom = rows[0], rows[-1]
+            left, right = (used & -used).bit_length() - 1, used.bit_length() - 1
+        return min(top, left, height - 1 - bottom, width - 1 - right)
+
+    def start_stepping(self):
+        """ Continue the world with single steps of a bit-packed engine. """
+        self.stepper = bitpack_engine.BitPackEngine(world.PlanePopulation(*self.to_planes(), self.world_size),
+                                                    self.world_size, _rule=self.rule)
+        self.stepper.set_generation(self.generation)
+        if self.live_hash is not None:
+            self.stepper.track_hash()
+        self.blocked = []
+
+    def stop_stepping(self):
+        """ Continue the world with jumps of the quadtree. """
+        width = self.world_size[0]
+        self.root = self.universe.build([divmod(index, width) for index in self.stepper.born], self.level)
+        self.stepper = None
+        if self.live_hash is not None:
+            self.track_hash()
+
+    def advance(self, _generations: int) -> int:
+        """ Advance the world by the largest power of two generations that is at most _generations
+        and at most the distance between the live cells and the rim. Returns the generations made. """
+        if self.stepper is not None:
+            self.stepper.step()
+            self.single_steps += 1
+            self.generation += 1
+            if self.live_hash is not None:
+                self.live_hash = self.stepper.live_hash
+            if not self.track_ages and self.single_steps % CHECK_STEPS == 0:
+                distance = self.rim_distance()
+                if distance is None or distance >= JUMP_DISTANCE:
+                    self.stop_stepping()
+            return 1
+        distance = self.rim_distance()
+        if distance is None:
+            self.generation += _generations
+            return _generations
+        if self.blocked or distance < STEP_DISTANCE:
+            self.start_stepping()
+            return self.advance(_generations)
+        j = 0
+        while (2 << j) <= min(distance, _generations) and j < self.level:
+            j += 1
+        self.jump(j)
+        self.root = self.universe.clip(self.root, self.interior)
+        if len(self.universe.table) > self.max_nodes:
+            self.universe.collect(self.root)
+        if self.live_hash is not None:
+            self.track_hash()
+        self.generation += 1 << j
+        return 1 << j
+
+    def set_generation(self, _generation: int):
+        """ The bit-packed engine stores the ages relative to the generation. """
+        if self.stepper is not None:
+            self.stepper.set_generation(_generation)
+        self.generation = _generation
+
+    def track_hash(self):
+        """ A jump changes cells all over the world, so after each jump the hash is computed from
+        the live cells of the root, with the keys of world.cell_key used by the other engines.
+        While stepping, the hash of the bit-packed engine is used. """
+        if self.stepper is not None:
+            self.stepper.track_hash()
+            self.live_hash = self.stepper.live_hash
+            return
+        width = self.world_size[0]
+        live_hash = 0
+        for (y, x) in self.universe.cells(self.root):
+            live_hash ^= world.cell_key(y * width + x)
+        self.live_hash = live_hash
+
+    def step(self):
+        """ Advance the world by one generation. """
+        self.advance(1)
+
+    def to_planes(self) -> tuple:
+        """ Return the world as flat (states, ages) planes. Without age tracking every live cell
+        has the alive state and age 0. """
+        width, height = self.world_size
+        if self.stepper is not None:
+            states, ages = self.stepper.to_planes()
+            if not self.track_ages:
+                for index in self.stepper.born:
+                    states[index] = world.CODE_ALIVE
+                    ages[index] = 0
+            return states, ages
+        states, ages = world.empty_planes(self.world_size)
+        for (y, x) in self.blocked:
+            states[y * width + x] = world.CODE_RIM
+        for (y, x) in self.universe.cells(self.root):
+            states[y * width + x] = world.CODE_ALIVE
+        return states, ages
+
+    def counts(self) -> dict:
+        """ Count the cells of each state, without age tracking all live cells are counted as alive. """
+        if self.stepper is not None:
+            counts = self.stepper.counts()
+            if not self.track_ages:
+                counts = {cb.STATE_ALIVE: len(self.stepper.born), cb.STATE_ELDER: 0, cb.STATE_PRIME_ELDER: 0,
+                          cb.STATE_DEAD: counts[cb.STATE_DEAD]}
+            return counts
+        live = self.root.population
+        return {cb.STATE_ALIVE: live, cb.STATE_ELDER: 0, cb.STATE_PRIME_ELDER: 0,
+                cb.STATE_DEAD: world.ordinary_cells(self.world_size) - live - len(self.blocked)}
+
+    def summary(self) -> dict:
+        """ Cache statistics of the run, used to size the memory needed for a seed, and the number
+        of generations made with single steps. """
+        lookups = self.universe.hits + self.universe.misses
+        return {"nodes": len(self.universe.table),
+                "cache entries": len(self.universe.cache),
+                "cache hit rate": "{:.1%}".format(self.universe.hits / lookups if lookups else 0),
+                "single steps": self.single_steps}
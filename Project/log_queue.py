@@ -0,0 +1,134 @@
+#!/usr/bin/env python
+"""
+Asynchronous, batched logging of the simulation reports.
+
+A FileHandler writes and flushes the file for every record, so at high generation rates the
+simulation loop waits for the disk once per generation. With the handlers in this module the
+simulation loop only puts the records on a queue:
+
+    * QueueHandler puts the record on the queue as it is, its message is formatted by the listener,
+    * a listener thread takes the records from the queue and hands them to the file handlers,
+    * BatchFileHandler collects the formatted records and writes them in batches, a batch is written
+      when it is full or when the queue is empty.
+
+stats_logger adds a compact machine readable report of every generation, one line of
+generation, alive, elders, prime elders and dead cells in CSV or JSON lines format.
+"""
+
+import atexit
+import json
+import logging
+import queue
+from logging.handlers import QueueHandler, QueueListener
+
+BATCH_SIZE = 256  # records written to the file at once
+STATS_FIELDS = ("generation", "alive", "elders", "prime_elders", "dead")
+CSV_SUFFIX = ".csv"
+
+
+class BatchFileHandler(logging.FileHandler):
+    """ File handler writing the formatted records in batches of BATCH_SIZE, or when it is flushed.
+    With _delay the file is only opened when the first batch is written. """
+
+    def __init__(self, _path, _mode: str = "a", _header: str = None, _delay: bool = False):
+        super().__init__(_path, mode=_mode, delay=_delay)
+        self.batch = [_header] if _header else []
+
+    def emit(self, _record: logging.LogRecord):
+        try:
+            self.batch.append(self.format(_record))
+        except Exception:
+            self.handleError(_record)
+        if len(self.batch) >= BATCH_SIZE:
+            self.flush()
+
+    def flush(self):
+        """ Write the records collected so far. """
+        self.acquire()
+        try:
+            if self.batch and self.stream is None and not self._closed:
+                self.stream = self._open()
+            if self.batch and self.stream is not None:
+                self.stream.write(self.terminator.join(self.batch) + self.terminator)
+                self.batch = []
+            super().flush()
+        finally:
+            self.release()
+
+
+class DeferredQueueHandler(QueueHandler):
+    """ Queue handler leaving the formatting of the message to the listener thread. """
+
+    def prepare(self, _record: logging.LogRecord) -> logging.LogRecord:
+        return _record
+
+
+class BatchQueueListener(QueueListener):
+    """ Queue listener flushing its handlers whenever the queue is empty, so a batch is never
+    held back longer than the simulation keeps the listener busy. """
+
+    def dequeue(self, _block: bool):
+        try:
+            return self.queue.get_nowait()
+        except queue.Empty:
+            for handler in self.handlers:
+                handler.flush()
+            return self.queue.get(_block)
+
+
+class LogPipeline:
+    """ Queue, queue handler and listener thread in front of the given handlers. """
+
+    def __init__(self, *_handlers: logging.Handler):
+        self.queue = queue.SimpleQueue()
+        self.handler = DeferredQueueHandler(self.queue)
+        self.listener = BatchQueueListener(self.queue, *_handlers, respect_handler_level=True)
+        self.listener.start()
+        self.running = True
+        atexit.register(self.stop)
+
+    def flush(self):
+        """ Wait until every record put on the queue so far is written. """
+        if self.running:
+            self.listener.stop()
+            for handler in self.listener.handlers:
+                handler.flush()
+            self.listener.start()
+
+    def stop(self):
+        """ Write the remaining records, stop the listener thread and close the handlers. """
+        if self.running:
+            self.running = False
+            self.listener.stop()
+            for handler in self.listener.handlers:
+                handler.close()
+
+
+class StatsFormatter(logging.Formatter):
+    """ Formats the arguments of a stats record, see STATS_FIELDS, as a CSV line or a JSON object. """
+
+    def __init__(self, _csv: bool):
+        super().__init__()
+        self.csv = _csv
+
+    def format(self, _record: logging.LogRecord) -> str:
+        if self.csv:
+            return ",".join(str(value) for value in _record.args)
+        return json.dumps(dict(zip(STATS_FIELDS, _record.args)))
+
+
+def stats_logger(_path) -> tuple:
+    """ Return a logger writing one stats line per record to _path, CSV if the file ends with .csv,
+    otherwise JSON lines, and the LogPipeline to stop when the run is over.
+    A stats record is logged with the values of STATS_FIELDS as arguments. """
+    csv = str(_path).endswith(CSV_SUFFIX)
+    handler = BatchFileHandler(_path, "w", ",".join(STATS_FIELDS) if csv else None)
+    handler.setFormatter(StatsFormatter(csv))
+    pipeline = LogPipeline(handler)
+    logger = logging.getLogger("gol_stats")
+    logger.setLevel(logging.INFO)
+    logger.propagate = False
+    for old in list(logger.handlers):
+        logger.removeHandler(old)
+    logger.addHandler(pipeline.handler)
+    return logger, pipeline
@@ -0,0 +1,121 @@
+#!/usr/bin/env python
+"""
+NumPy backed simulation engine.
+
+The world is stored in two 2D arrays, one with the state codes from world.py and one with
+the ages of the cells. The live neighbours of every cell are counted at once by adding
+the eight shifted views of the interior of the world, so a generation is a handful of
+array operations instead of a Python loop over every cell.
+
+The rim is the first and last row and column of the arrays. Rim cells are never written
+and are never alive, which gives the same rim behaviour as gol.is_rim_cell.
+"""
+
+from array import array
+import world
+import rules
+
+try:
+    import numpy as np
+except ImportError:  # NumPy is optional, the engine can only be selected when it is installed
+    np = None
+
+
+def count_live_neighbours(_live):
+    """ Receives a 2D array with 1 for live cells and 0 otherwise.
+    Returns the live neighbour count of every interior (non-rim) cell,
+    which is an array two rows and two columns smaller than _live. """
+    height, width = _live.shape
+    counts = np.zeros((height - 2, width - 2), dtype=np.uint8)
+    for dy, dx in world.NEIGHBOUR_OFFSETS:
+        counts += _live[1 + dy:height - 1 + dy, 1 + dx:width - 1 + dx]
+    return counts
+
+
+def cell_keys(_indices):
+    """ Vectorized world.cell_key of an array of flat indices. """
+    with np.errstate(over="ignore"):
+        keys = (_indices.astype(np.uint64) + np.uint64(1)) * np.uint64(0x9E3779B97F4A7C15)
+        keys = (keys ^ (keys >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)
+        keys = (keys ^ (keys >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)
+    return keys ^ (keys >> np.uint64(31))
+
+
+def changed_hash(_states, _new_states, _first_index: int = 0) -> int:
+    """ Return the xor of the keys of the cells that are live in only one of the two state arrays,
+    the update of world.Engine.live_hash from _states to _new_states.
+    _first_index is the flat index of the first cell of the arrays in the world. """
+    old = (_states >= world.CODE_ALIVE) & (_states <= world.CODE_PRIME_ELDER)
+    new = (_new_states >= world.CODE_ALIVE) & (_new_states <= world.CODE_PRIME_ELDER)
+    changed = np.flatnonzero(old != new)
+    return int(np.bitwise_xor.reduce(cell_keys(changed + _first_index), initial=np.uint64(0)))
+
+
+def count_states(_states) -> list:
+    """ Return the number of cells per state code, indexed by code. """
+    return np.bincount(_states.ravel(), minlength=world.CODE_RIM + 1).tolist()
+
+
+def next_generation(_states, _ages, _out_states, _out_ages, _rule: rules.Rule = rules.CONWAY) -> list:
+    """ Compute the interior of the next generation of _states/_ages into _out_states/_out_ages.
+    Returns the number of interior cells per state code of the next generation.
+    The next state of every cell is looked up at once in the table of _rule, see rules.py,
+    indexed by the state code, the age bucket of the cell after the step and its live neighbours.
+    Live and born cells age by one, all other cells are dead with age 0. """
+    if _states.shape[0] < 3 or _states.shape[1] < 3:
+        return [0] * (world.CODE_RIM + 1)
+    live = ((_states >= world.CODE_ALIVE) & (_states <= world.CODE_PRIME_ELDER)).view(np.uint8)
+    neighbours = count_live_neighbours(live)
+    states = _states[1:-1, 1:-1]
+    ages = _ages[1:-1, 1:-1] + 1
+
+    buckets = (ages > _rule.elder_age).view(np.uint8) + (ages > _rule.prime_elder_age).view(np.uint8)
+    index = (states.astype(np.intp) * rules.AGE_BUCKETS + buckets) * rules.NEIGHBOUR_COUNTS + neighbours
+    new_states = np.frombuffer(_rule.table, dtype=np.uint8)[index]
+    new_ages = np.where(new_states != world.CODE_DEAD, ages, 0).astype(_ages.dtype)
+
+    _out_states[1:-1, 1:-1] = new_states
+    _out_ages[1:-1, 1:-1] = new_ages
+    return count_states(new_states)
+
+
+class NumpyEngine(world.Engine):
+    """ Engine storing state and age in two 2D NumPy arrays. """
+
+    name = "numpy"
+
+    def __init__(self, _population: dict, _world_size: tuple, _rule: rules.Rule = rules.CONWAY):
+        if np is None:
+            raise ImportError("The numpy engine requires NumPy to be installed.")
+        super().__init__(_world_size, _rule)
+        states, ages = world.population_to_planes(_population, self.world_size)
+        self.states, self.ages = self.planes_to_arrays(states, ages, self.world_size)
+        self.state_counts = count_states(self.states)
+
+    @staticmethod
+    def planes_to_arrays(_states, _ages, _world_size: tuple) -> tuple:
+        """ Convert flat planes to (height, width) state and age arrays. """
+        width, height = _world_size
+        states = np.frombuffer(bytes(_states), dtype=np.uint8).reshape(height, width).copy()
+        ages = np.array(_ages, dtype=np.uint32).reshape(height, width)
+        return states, ages
+
+    def step(self):
+        """ Advance the world by one generation. """
+        states = self.states.copy()
+        ages = self.ages.copy()
+        self.state_counts = next_generation(self.states, self.ages, states, ages, self.rule)
+        if self.live_hash is not None:
+            self.live_hash ^= changed_hash(self.states, states)
+        self.states, self.ages = states, ages
+        self.generation += 1
+
+    def to_planes(self) -> tuple:
+        """ Return the world as flat (states, ages) planes. """
+        ages = array(world.AGE_TYPECODE)
+        ages.frombytes(self.ages.astype(np.uint32).tobytes())
+        return bytearray(self.states.tobytes()), ages
+
+    def counts(self) -> dict:
+        """ Return the cells of each state counted when the generation was made, rim cells excluded. """
+        return world.code_counts_to_states(self.state_counts)
@@ -0,0 +1,129 @@
+#!/usr/bin/env python
+"""
+Multi-core simulation engine.
+
+The interior rows of the world are split into horizontal strips which are computed by a pool
+of worker processes with the NumPy kernel of numpy_engine.next_generation. The state and age
+arrays of the current and the next generation live in one block of shared memory, so the
+world is never pickled between the processes: each tick only sends the row range and the
+index of the current buffer to the workers.
+
+Every strip reads one row above and one row below its own rows from the current generation,
+which is the halo of the strip. As the whole current generation is in shared memory and the
+next generation is written to the other buffer, the halo rows are always up to date and no
+extra copies are needed; the buffers are swapped after all strips are done.
+"""
+
+import os
+from array import array
+from multiprocessing import Pool, shared_memory
+import world
+import numpy_engine
+import rules
+from numpy_engine import np
+
+"""views of the shared buffers in a worker process, set by _attach"""
+_shared = {}
+
+
+def _buffers(_memory: shared_memory.SharedMemory, _shape: tuple) -> tuple:
+    """ Return the state and age arrays of both generation buffers in the shared memory block:
+    ((states 0, ages 0), (states 1, ages 1)). """
+    height, width = _shape
+    cells = height * width
+    buffers = []
+    for index in range(2):
+        states = np.ndarray(_shape, dtype=np.uint8, buffer=_memory.buf, offset=index * cells)
+        ages = np.ndarray(_shape, dtype=np.uint32, buffer=_memory.buf, offset=2 * cells + index * cells * 4)
+        buffers.append((states, ages))
+    return tuple(buffers)
+
+
+def _attach(_name: str, _shape: tuple, _rule: rules.Rule):
+    """ Pool initializer: attach the worker to the shared memory block and keep the rule of the simulation. """
+    memory = shared_memory.SharedMemory(name=_name)
+    _shared["memory"] = memory
+    _shared["buffers"] = _buffers(memory, _shape)
+    _shared["rule"] = _rule
+
+
+def _step_strip(_task: tuple):
+    """ Compute rows first to last - 1 of the next generation from buffer current into the other buffer.
+    Returns the number of cells per state code in the computed rows and, if track is set,
+    the hash update of the rows (see numpy_engine.changed_hash), otherwise 0. """
+    first, last, current, track = _task
+    states, ages = _shared["buffers"][current]
+    out_states, out_ages = _shared["buffers"][1 - current]
+    counts = numpy_engine.next_generation(states[first - 1:last + 1], ages[first - 1:last + 1],
+                                          out_states[first - 1:last + 1], out_ages[first - 1:last + 1],
+                                          _shared["rule"])
+    if not track:
+        return counts, 0
+    return counts, numpy_engine.changed_hash(states[first:last], out_states[first:last], first * states.shape[1])
+
+
+class ParallelEngine(world.Engine):
+    """ Engine computing horizontal strips of the world in a pool of processes. """
+
+    name = "parallel"
+
+    def __init__(self, _population: dict, _world_size: tuple, _workers: int = None,
+                 _rule: rules.Rule = rules.CONWAY):
+        if np is None:
+            raise ImportError("The parallel engine requires NumPy to be installed.")
+        super().__init__(_world_size, _rule)
+        width, height = self.world_size
+        self.workers = max(1, _workers or os.cpu_count() or 1)
+        self.shape = (height, width)
+        self.memory = shared_memory.SharedMemory(create=True, size=max(1, height * width * 10))
+        self.buffers = _buffers(self.memory, self.shape)
+        states, ages = numpy_engine.NumpyEngine.planes_to_arrays(
+            *world.population_to_planes(_population, self.world_size), self.world_size)
+        for buffer_states, buffer_ages in self.buffers:
+            buffer_states[:] = states
+            buffer_ages[:] = ages
+        self.current = 0
+        self.state_counts = numpy_engine.count_states(states)
+
+        """split the interior rows in one strip per worker"""
+        interior = max(height - 2, 0)
+        strips = min(self.workers, interior) or 1
+        bounds = [1 + interior * strip // strips for strip in range(strips + 1)]
+        self.strips = [(bounds[i], bounds[i + 1]) for i in range(strips) if bounds[i] < bounds[i + 1]]
+        self.pool = Pool(self.workers, initializer=_attach, initargs=(self.memory.name, self.shape, self.rule))
+
+    def step(self):
+        """ Advance the world by one generation, one strip per task. """
+        if self.shape[0] > 2 and self.shape[1] > 2:
+            track = self.live_hash is not None
+            results = self.pool.map(_step_strip, [(first, last, self.current, track)
+                                                  for (first, last) in self.strips])
+            self.state_counts = [sum(counts) for counts in zip(*(counts for counts, strip_hash in results))]
+            if track:
+                for counts, strip_hash in results:
+                    self.live_hash ^= strip_hash
+            self.current = 1 - self.current
+        self.generation += 1
+
+    def to_planes(self) -> tuple:
+        """ Return the world as flat (states, ages) planes. """
+        states, ages = self.buffers[self.current]
+        age_plane = array(world.AGE_TYPECODE)
+        age_plane.frombytes(ages.tobytes())
+        return bytearray(states.tobytes()), age_plane
+
+    def counts(self) -> dict:
+        """ Return the cells of each state counted by the workers, rim cells excluded. """
+        return world.code_counts_to_states(self.state_counts)
+
+    def summary(self) -> dict:
+        """ Number of workers and strips used. """
+        return {"workers": self.workers, "strips": len(self.strips)}
+
+    def close(self):
+        """ Stop the workers and release the shared memory. """
+        self.pool.close()
+        self.pool.join()
+        self.buffers = None
+        self.memory.close()
+        self.memory.unlink()
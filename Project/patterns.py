@@ -0,0 +1,179 @@
+#!/usr/bin/env python
+"""
+Import and export of the standard Life pattern formats.
+
+    * RLE: a header line "x = <width>, y = <height>, rule = B3/S23" followed by runs of cells,
+      "<count>b" for dead cells, "<count>o" for live cells, "<count>$" for the end of rows and "!" at the end,
+    * plaintext (.cells): one line per row, "O" for live and "." for dead cells, comment lines start with "!".
+
+A pattern is read as the list of the (y, x) positions of its live cells, relative to the top left
+corner of the pattern. place_pattern puts it at an offset in a world of a given size and returns
+the world as a world.PlanePopulation, so a pattern is never expanded into a dictionary of cells.
+The RLE body is tokenized with a single regular expression over the whole file, which keeps
+reading linear in the size of the file. The rule of the RLE header is read as it is written and
+checked by the caller, a pattern is written with the rule of the engine it was saved from.
+"""
+
+import re
+import world
+import rules
+
+RLE_SUFFIX = ".rle"
+CELLS_SUFFIX = ".cells"
+RLE_LINE_LENGTH = 70  # longest line written to a RLE file, as recommended by the format
+RLE_HEADER = re.compile(r"\s*x\s*=\s*(\d+)\s*,\s*y\s*=\s*(\d+)(?:\s*,\s*rule\s*=\s*([^\s,]+))?")
+RLE_TOKEN = re.compile(r"(\d*)([a-zA-Z$!])|(\s+)|(.)")
+
+
+class PatternError(ValueError):
+    """ Invalid pattern file, the message includes the line of the error. """
+
+    def __init__(self, _message: str, _line: int):
+        super().__init__("line {}: {}".format(_line, _message))
+        self.line = _line
+
+
+def parse_rle(_text: str) -> tuple:
+    """ Parse a RLE pattern. Returns (width, height, live cells, rule) where the live cells are (y, x) positions
+    and rule is the rule of the header as written, or None if the header has no rule.
+    Any state other than 'b' is read as live, so patterns with more states keep their shape. """
+    lines = _text.splitlines()
+    number = 0
+    while number < len(lines) and (not lines[number].strip() or lines[number].startswith("#")):
+        number += 1
+    if number == len(lines):
+        raise PatternError("Missing header line 'x = <width>, y = <height>'", number)
+    header = RLE_HEADER.match(lines[number])
+    if header is None:
+        raise PatternError("Invalid header line, expecting 'x = <width>, y = <height>'", number + 1)
+    width, height, rule = int(header.group(1)), int(header.group(2)), header.group(3)
+
+    body = "\n".join(lines[number + 1:])
+    live = []
+    y = x = 0
+    for match in RLE_TOKEN.finditer(body):
+        count, tag, space, other = match.groups()
+        if space:
+            continue
+        if other:
+            line = number + 2 + body.count("\n", 0, match.start())
+            raise PatternError("Invalid character {!r} in pattern".format(other), line)
+        run = int(count) if count else 1
+        if tag == "!":
+            break
+        if tag == "$":
+            y += run
+            x = 0
+        elif tag == "b":
+            x += run
+        else:
+            live.extend((y, x + i) for i in range(run))
+            x += run
+    return width, height, live, rule
+
+
+def parse_cells(_text: str) -> tuple:
+    """ Parse a plaintext pattern. Returns (width, height, live cells, None) where the live cells are (y, x)
+    positions, the plaintext format has no rule. """
+    live = []
+    width = height = 0
+    for line in _text.splitlines():
+        if line.startswith("!"):
+            continue
+        line = line.rstrip()
+        for x, char in enumerate(line):
+            if char in "O*":
+                live.append((height, x))
+            elif char != ".":
+                raise PatternError("Invalid character {!r} in pattern".format(char), height + 1)
+        width = max(width, len(line))
+        height += 1
+    return width, height, live, None
+
+
+def load_pattern(_path) -> tuple:
+    """ Read a .rle or .cells file, chosen by its suffix. Returns (width, height, live cells, rule). """
+    with open(_path, "r") as file:
+        text = file.read()
+    if str(_path).endswith(RLE_SUFFIX):
+        return parse_rle(text)
+    return parse_cells(text)
+
+
+def place_pattern(_live: list, _world_size: tuple, _offset: tuple) -> world.PlanePopulation:
+    """ Return a world of the given size with the live cells of a pattern placed at _offset, (y, x)
+    of the top left corner of the pattern. Raises ValueError if a live cell falls on or outside the rim. """
+    width, height = _world_size
+    dy, dx = _offset
+    states, ages = world.empty_planes(_world_size)
+    for y, x in _live:
+        y, x = y + dy, x + dx
+        if not (0 < y < height - 1 and 0 < x < width - 1):
+            raise ValueError("Pattern does not fit in the world at offset {}, cell ({}, {}) is outside the interior"
+                             .format(_offset, y, x))
+        states[y * width + x] = world.CODE_ALIVE
+    return world.PlanePopulation(states, ages, _world_size)
+
+
+def centre_offset(_pattern_size: tuple, _world_size: tuple) -> tuple:
+    """ Return the (y, x) offset placing a pattern of size (width, height) in the centre of the world. """
+    return max((_world_size[1] - _pattern_size[1]) // 2, 1), max((_world_size[0] - _pattern_size[0]) // 2, 1)
+
+
+def live_rows(_states, _world_size: tuple) -> list:
+    """ Return the rows of the bounding box of the live cells of a state plane
+    as strings with 'o' for live and 'b' for other cells. """
+    width, height = _world_size
+    codes = range(world.CODE_RIM + 1)
+    table = bytes.maketrans(bytes(codes), b"".join(b"o" if code in world.LIVE_CODES else b"b" for code in codes))
+    rows = [bytes(_states[y * width:(y + 1) * width]).translate(table).decode() for y in range(height)]
+    used = [y for y, row in enumerate(rows) if "o" in row]
+    if not used:
+        return []
+    left = min(row.index("o") for row in rows if "o" in row)
+    right = max(row.rindex("o") for row in rows if "o" in row) + 1
+    return [row[left:right] for row in rows[used[0]:used[-1] + 1]]
+
+
+def to_rle(_states, _world_size: tuple, _rule: str = rules.CONWAY.notation) -> str:
+    """ Return the live cells of a state plane as a RLE pattern cropped to their bounding box,
+    with _rule, in B/S notation, in the header. """
+    rows = live_rows(_states, _world_size)
+    tokens = []
+    empty = 0
+    for row in rows:
+        row = row.rstrip("b")
+        if not row:
+            empty += 1
+            continue
+        if tokens:
+            tokens.append("{}$".format(empty + 1) if empty else "$")
+        empty = 0
+        for run in re.finditer(r"o+|b+", row):
+            length = run.end() - run.start()
+            tokens.append("{}{}".format(length if length > 1 else "", run.group()[0]))
+    tokens.append("!")
+    lines = ["x = {}, y = {}, rule = {}".format(max((len(row) for row in rows), default=0), len(rows), _rule)]
+    line = ""
+    for token in tokens:
+        if len(line) + len(token) > RLE_LINE_LENGTH:
+            lines.append(line)
+            line = ""
+        line += token
+    lines.append(line)
+    return "\n".join(lines) + "\n"
+
+
+def to_cells(_states, _world_size: tuple) -> str:
+    """ Return the live cells of a state plane as a plaintext pattern cropped to their bounding box. """
+    rows = live_rows(_states, _world_size)
+    return "".join(row.replace("o", "O").replace("b", ".").rstrip(".") + "\n" for row in rows)
+
+
+def save_pattern(_path, _engine: world.Engine):
+    """ Write the live cells of the current generation of the engine to a .rle or .cells file. """
+    states = _engine.to_planes()[0]
+    text = to_rle(states, _engine.world_size, _engine.rule.notation) if str(_path).endswith(RLE_SUFFIX) \
+        else to_cells(states, _engine.world_size)
+    with open(_path, "w") as file:
+        file.write(text)
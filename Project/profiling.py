@@ -0,0 +1,78 @@
+#!/usr/bin/env python
+"""
+Timing of the phases of the simulation loop.
+
+A run that is slow does not tell where the time goes. With profiling switched on the simulation
+loop and the engines mark the end of every phase of a generation, and the time since the previous
+mark is added to that phase:
+
+    * neighbours: counting the live neighbours of the cells (dict engine only),
+    * transitions: the next state of the cells from the rule (dict engine only),
+    * step: the step of an engine that does not split it into the two phases above,
+    * rendering: printing or drawing the world,
+    * statistics: counting the cells of each state,
+    * logging: queueing the report of the generation,
+    * other: checkpoints and cycle detection.
+
+A mark is one perf_counter call, so the timings cost little even for fast engines. The pause
+between generations is not timed. When profiling is off the simulation loop and the engines
+have no profiler and make no calls at all.
+"""
+
+from time import perf_counter
+
+NEIGHBOURS = "neighbours"
+TRANSITIONS = "transitions"
+STEP = "step"
+RENDERING = "rendering"
+STATISTICS = "statistics"
+LOGGING = "logging"
+OTHER = "other"
+PHASES = (NEIGHBOURS, TRANSITIONS, STEP, RENDERING, STATISTICS, LOGGING, OTHER)
+
+
+class Profiler:
+    """ Cumulative and per generation times of the phases of the simulation loop.
+    If a logger is given the times of every generation are logged as a PROFILE record. """
+
+    def __init__(self, _logger=None):
+        self.logger = _logger
+        self.totals = dict.fromkeys(PHASES, 0.0)
+        self.generation = None
+        self.current = None
+        self.last = perf_counter()
+        self.generations = 0
+
+    def begin(self, _generation: int):
+        """ Start timing the generation, the time since the previous mark is not counted. """
+        self.generation = _generation
+        self.current = {}
+        self.last = perf_counter()
+
+    def lap(self, _phase: str):
+        """ Add the time since the previous mark to the phase of the current generation. """
+        now = perf_counter()
+        self.current[_phase] = self.current.get(_phase, 0.0) + now - self.last
+        self.last = now
+
+    def end(self):
+        """ Count the time since the last mark as other, add the generation to the totals and log it.
+        Does nothing if no generation is being timed. """
+        if self.current is None:
+            return
+        self.lap(OTHER)
+        for phase, seconds in self.current.items():
+            self.totals[phase] += seconds
+        self.generations += 1
+        if self.logger is not None:
+            phases = [phase for phase in PHASES if phase in self.current]
+            values = [value for phase in phases for value in (phase.capitalize(), self.current[phase] * 1000)]
+            self.logger.info("PROFILE %d" + "\n  %s: %.3f ms" * len(phases), self.generation, *values)
+        self.current = None
+
+    def summary(self) -> dict:
+        """ Total seconds, milliseconds per generation and share of the time of every phase that was timed. """
+        total = sum(self.totals.values())
+        return {"profile " + phase: "{:.3f} s, {:.3f} ms/generation, {:.1f}%".format(
+                    seconds, seconds * 1000 / max(self.generations, 1), seconds * 100 / total if total else 0)
+                for phase, seconds in self.totals.items() if seconds}
@@ -0,0 +1,93 @@
+#!/usr/bin/env python
+"""
+Frame-buffered terminal renderer.
+
+Printing the world through code_base.progress writes every cell separately, wraps every single
+character in a colour escape and clears the screen by running a shell command. The renderer in
+this module builds each frame in one string that is written at once:
+
+    * consecutive cells with the same state share one colour escape,
+    * the cursor is moved with ANSI escapes instead of clearing the console,
+    * after the first frame only the cells that changed since the previous frame are redrawn.
+
+The colours are the ones of code_base.get_print_value.
+"""
+
+import sys
+import code_base as cb
+
+CURSOR_HOME = '\033[H'
+CLEAR_SCREEN = '\033[2J'
+STATES = (cb.STATE_RIM, cb.STATE_DEAD, cb.STATE_ALIVE, cb.STATE_ELDER, cb.STATE_PRIME_ELDER)
+"""colour escape of each state, taken from the value code_base prints for the state"""
+COLOURS = {state: cb.get_print_value(state).partition(state)[0] for state in STATES}
+RESET = cb.get_print_value(cb.STATE_DEAD).partition(cb.STATE_DEAD)[2]
+MERGE_GAP = 8  # unchanged cells shorter than a cursor move are redrawn instead of skipped
+
+
+def move_cursor(_y: int, _x: int) -> str:
+    """ ANSI escape moving the cursor to row _y and column _x, counted from 0. """
+    return '\033[{};{}H'.format(_y + 1, _x + 1)
+
+
+def colour_runs(_cells: str) -> str:
+    """ Return the cells with one colour escape per run of equal states. """
+    parts = []
+    previous = None
+    for state in _cells:
+        if state != previous:
+            parts.append(COLOURS.get(state, RESET))
+            previous = state
+        parts.append(state)
+    return "".join(parts)
+
+
+def changed_spans(_old: str, _new: str) -> list:
+    """ Return (start, end) spans of the positions where the rows differ.
+    Spans closer than MERGE_GAP are merged, as redrawing the cells between them
+    is shorter than moving the cursor. """
+    spans = []
+    for x in range(len(_new)):
+        if x >= len(_old) or _old[x] != _new[x]:
+            if spans and x - spans[-1][1] < MERGE_GAP:
+                spans[-1][1] = x + 1
+            else:
+                spans.append([x, x + 1])
+    return spans
+
+
+class TerminalRenderer:
+    """ Renders the rows of an engine to a terminal, one write per frame. """
+
+    def __init__(self, _stream=None):
+        self.stream = _stream or sys.stdout
+        self.previous = None
+
+    def frame(self, _rows: list) -> str:
+        """ Build the escape sequence drawing _rows over the previous frame. """
+        if self.previous is None or len(self.previous) != len(_rows):
+            """first frame, or the world changed size: draw everything on a cleared screen"""
+            return CURSOR_HOME + CLEAR_SCREEN + "".join(colour_runs(row) + RESET + "\n" for row in _rows)
+        parts = []
+        for y, (old, new) in enumerate(zip(self.previous, _rows)):
+            if old == new:
+                continue
+            for start, end in changed_spans(old, new):
+                parts.append(move_cursor(y, start))
+                parts.append(colour_runs(new[start:end]))
+        if parts:
+            parts.append(RESET + move_cursor(len(_rows), 0))
+        return "".join(parts)
+
+    def draw(self, _engine):
+        """ Draw the current generation of the engine. """
+        rows = list(_engine.rows())
+        self.stream.write(self.frame(rows))
+        self.stream.flush()
+        self.previous = rows
+
+    def close(self):
+        """ Leave the cursor below the last frame. """
+        if self.previous is not None:
+            self.stream.write(RESET + move_cursor(len(self.previous), 0) + "\n")
+            self.stream.flush()
@@ -0,0 +1,155 @@
+#!/usr/bin/env python
+"""
+Rules of the simulation, written in B/S notation and compiled to lookup tables.
+
+A rule lists the live neighbour counts for which a dead cell is born and a live cell survives,
+e.g. B3/S23 for Conway's Life, B36/S23 for HighLife or B2/S for Seeds. The ages at which a
+surviving cell becomes an elder and an elder becomes a prime elder are part of the rule as well.
+A rule is compiled once into tables, so the engines do a single lookup per cell instead of
+comparing the state and the neighbour count branch by branch:
+
+    * table: the next state code indexed by (state code, age bucket, live neighbours), where the
+      age bucket tells if the age after the step is above the elder age and above the prime elder age,
+    * birth and survival: 1 for the neighbour counts of the B and S parts, for the engines that
+      only store which cells are live.
+
+Birth on 0 neighbours (B0) is not supported: it would bring the whole dead space to life,
+which the rim, the sparse and chunked storage and the HashLife engine all rely on not to happen.
+"""
+
+import re
+import world
+
+NEIGHBOUR_COUNTS = 9  # 0 to 8 live neighbours
+AGE_BUCKETS = 3       # age up to the elder age, up to the prime elder age, and older
+NOTATION = re.compile(r"\s*B([0-8]*)\s*/\s*S([0-8]*)\s*$", re.IGNORECASE)
+
+"""rules known by name, given in B/S notation"""
+NAMED_RULES = {
+    "life": "B3/S23",
+    "highlife": "B36/S23",
+    "seeds": "B2/S",
+    "daynight": "B3678/S34678",
+    "lifewithoutdeath": "B3/S012345678",
+    "maze": "B3/S12345",
+    "2x2": "B36/S125"
+}
+
+
+class Rule:
+    """ Birth and survival neighbour counts and the elder ages, compiled to lookup tables. """
+
+    def __init__(self, _birth, _survival, _elder_age: int = world.ELDER_AGE,
+                 _prime_elder_age: int = world.PRIME_ELDER_AGE):
+        self.birth = frozenset(_birth)
+        self.survival = frozenset(_survival)
+        if 0 in self.birth:
+            raise ValueError("Rules with birth on 0 neighbours (B0) are not supported.")
+        if not self.birth | self.survival <= set(range(NEIGHBOUR_COUNTS)):
+            raise ValueError("Neighbour counts of a rule are between 0 and 8.")
+        """engines that only store the age of a live cell derive its state from the age, which needs
+        every state to last at least one generation"""
+        if not 1 <= _elder_age < _prime_elder_age:
+            raise ValueError("The elder age needs to be at least 1 and below the prime elder age.")
+        self.elder_age = _elder_age
+        self.prime_elder_age = _prime_elder_age
+        self.notation = "B{}/S{}".format("".join(map(str, sorted(self.birth))),
+                                         "".join(map(str, sorted(self.survival))))
+        self.birth_table = bytes(count in self.birth for count in range(NEIGHBOUR_COUNTS))
+        self.survival_table = bytes(count in self.survival for count in range(NEIGHBOUR_COUNTS))
+        self.table = self.compile()
+        """next_state(state, age, live_neighbours) of a cell of the dictionary world, see next_state_function"""
+        self.next_state = next_state_function(self)
+
+    def compile(self) -> bytes:
+        """ Build the table of the next state code, see table_index. Cells that are neither live nor
+        dead, i.e. positions read with the rim state, are dead in the next generation. """
+        table = bytearray((world.CODE_RIM + 1) * AGE_BUCKETS * NEIGHBOUR_COUNTS)
+        promoted = {world.CODE_ALIVE: (world.CODE_ALIVE, world.CODE_ELDER, world.CODE_ELDER),
+                    world.CODE_ELDER: (world.CODE_ELDER, world.CODE_ELDER, world.CODE_PRIME_ELDER),
+                    world.CODE_PRIME_ELDER: (world.CODE_PRIME_ELDER,) * AGE_BUCKETS}
+        for bucket in range(AGE_BUCKETS):
+            for count in range(NEIGHBOUR_COUNTS):
+                if count in self.birth:
+                    table[table_index(world.CODE_DEAD, bucket, count)] = world.CODE_ALIVE
+                if count in self.survival:
+                    for code in world.LIVE_CODES:
+                        table[table_index(code, bucket, count)] = promoted[code][bucket]
+        return bytes(table)
+
+    def age_bucket(self, _age: int) -> int:
+        """ Bucket of the age a cell has after the step: 0 up to the elder age,
+        1 up to the prime elder age, 2 above it. """
+        return (_age > self.elder_age) + (_age > self.prime_elder_age)
+
+    def next_state_code(self, _code: int, _age: int, _live_neighbours: int) -> tuple:
+        """ Returns the state code and age of a cell in the next generation.
+        Live and born cells age by one, dead cells have age 0. """
+        age = _age + 1
+        code = self.table[table_index(_code, self.age_bucket(age), _live_neighbours)]
+        return code, (age if code != world.CODE_DEAD else 0)
+
+    def state_code(self, _age: int) -> int:
+        """ State code of a live cell with the given age, for engines that only store the age of a cell. """
+        return world.LIVE_CODES[self.age_bucket(_age)]
+
+    def __eq__(self, _other) -> bool:
+        return isinstance(_other, Rule) and (self.birth, self.survival, self.elder_age, self.prime_elder_age) == \
+            (_other.birth, _other.survival, _other.elder_age, _other.prime_elder_age)
+
+    def __reduce__(self) -> tuple:
+        """ A rule is pickled as its neighbour counts and ages, e.g. for the worker processes of the
+        parallel engine, and compiled again when it is unpickled. """
+        return Rule, (tuple(self.birth), tuple(self.survival), self.elder_age, self.prime_elder_age)
+
+    def __hash__(self) -> int:
+        return hash((self.birth, self.survival, self.elder_age, self.prime_elder_age))
+
+    def __str__(self) -> str:
+        if self.elder_age == world.ELDER_AGE and self.prime_elder_age == world.PRIME_ELDER_AGE:
+            return self.notation
+        return "{}, elders after {}, prime elders after {}".format(self.notation, self.elder_age,
+                                                                   self.prime_elder_age)
+
+
+def table_index(_code: int, _bucket: int, _live_neighbours: int) -> int:
+    """ Index of Rule.table for a state code, an age bucket and a live neighbour count. """
+    return (_code * AGE_BUCKETS + _bucket) * NEIGHBOUR_COUNTS + _live_neighbours
+
+
+def next_state_function(_rule: Rule):
+    """ Return a function giving the state and age of a cell of the dictionary world in the next generation,
+    from its state, its age and its live neighbours. Live and born cells age by one, dead cells have age 0.
+    The table, the offset of the part of every state and the elder ages are bound once,
+    so update_world and the dictionary engines make a single call per cell. """
+    table = _rule.table
+    state_offsets = {state: table_index(code, 0, 0) for state, code in world.STATE_CODES.items()}
+    elder_age, prime_elder_age = _rule.elder_age, _rule.prime_elder_age
+    code_states = world.CODE_STATES
+    dead = world.CODE_DEAD
+    counts = NEIGHBOUR_COUNTS
+
+    def next_state(_state: str, _age: int, _live_neighbours: int) -> tuple:
+        age = _age + 1
+        code = table[state_offsets[_state] + ((age > elder_age) + (age > prime_elder_age)) * counts +
+                     _live_neighbours]
+        if code == dead:
+            return code_states[dead], 0
+        return code_states[code], age
+
+    return next_state
+
+
+def parse_rule(_rule: str, _elder_age: int = world.ELDER_AGE,
+               _prime_elder_age: int = world.PRIME_ELDER_AGE) -> Rule:
+    """ Return the rule given in B/S notation, e.g. 'B36/S23', or by one of the NAMED_RULES.
+    Raises ValueError if the rule is invalid. """
+    match = NOTATION.match(NAMED_RULES.get(_rule.lower(), _rule))
+    if match is None:
+        raise ValueError("Invalid rule '{}', expecting B/S notation such as B3/S23 or one of: {}"
+                         .format(_rule, ", ".join(NAMED_RULES)))
+    return Rule((int(count) for count in match.group(1)), (int(count) for count in match.group(2)),
+                _elder_age, _prime_elder_age)
+
+
+CONWAY = Rule({3}, {2, 3})
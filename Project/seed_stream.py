@@ -0,0 +1,238 @@
+#!/usr/bin/env python
+"""
+Streaming loader for JSON seed files.
+
+json.load reads the whole seed file into one dictionary before the population can be parsed,
+and every coordinate key is then converted with literal_eval. For large worlds that costs
+minutes and several GB of memory. This module reads the file in chunks instead: the top level
+object is scanned key by key and the entries of the 'population' object are parsed one at a time,
+so only the cells of the world and one chunk of the file are held in memory.
+
+    * coordinate keys "(y, x)" are parsed with split and int instead of literal_eval,
+    * the neighbour lists are skipped, they follow from the coordinates, unless validation is asked for,
+    * errors are raised as SeedFileError with the line and column in the file.
+"""
+
+import json
+import re
+import code_base as cb
+import world
+
+CHUNK_SIZE = 1 << 16
+MAX_VALUE_SIZE = 1 << 20  # a single cell object larger than this is reported as invalid
+WHITESPACE = re.compile(r"[ \t\n\r]*")
+_decoder = json.JSONDecoder()
+
+
+class SeedFileError(ValueError):
+    """ Invalid seed file, the message includes the position of the error in the file. """
+
+    def __init__(self, _message: str, _line: int, _column: int):
+        super().__init__("line {} column {}: {}".format(_line, _column, _message))
+        self.line = _line
+        self.column = _column
+
+
+class SeedReader:
+    """ Reads JSON tokens from a text file, one chunk at a time. """
+
+    def __init__(self, _file, _chunk_size: int = CHUNK_SIZE):
+        self.file = _file
+        self.chunk_size = _chunk_size
+        self.buffer = ""
+        self.pos = 0
+        self.eof = False
+        """offset in the file, line number and column of the start of the buffer, used to report positions"""
+        self.offset = 0
+        self.line = 1
+        self.column_offset = 0
+
+    def fill(self) -> bool:
+        """ Drop the consumed part of the buffer and read the next chunk. Returns False at end of file. """
+        if self.eof:
+            return False
+        consumed = self.buffer[:self.pos]
+        newlines = consumed.count("\n")
+        if newlines:
+            self.line += newlines
+            self.column_offset = len(consumed) - consumed.rfind("\n") - 1
+        else:
+            self.column_offset += len(consumed)
+        self.offset += self.pos
+        chunk = self.file.read(self.chunk_size)
+        self.buffer = self.buffer[self.pos:] + chunk
+        self.pos = 0
+        if not chunk:
+            self.eof = True
+        return bool(chunk)
+
+    def tell(self) -> int:
+        """ Offset of the next token in the file. """
+        self.peek()
+        return self.offset + self.pos
+
+    def error(self, _message: str, _offset: int = None) -> SeedFileError:
+        """ Return a SeedFileError for the given offset in the file, the current position by default.
+        Offsets before the buffer are reported at the start of the buffer. """
+        pos = self.pos if _offset is None else max(_offset - self.offset, 0)
+        before = self.buffer[:pos]
+        newlines = before.count("\n")
+        if newlines:
+            column = pos - before.rfind("\n")
+        else:
+            column = self.column_offset + pos + 1
+        return SeedFileError(_message, self.line + newlines, column)
+
+    def peek(self) -> str:
+        """ Skip whitespace and return the next character without consuming it, '' at end of file. """
+        while True:
+            self.pos = WHITESPACE.match(self.buffer, self.pos).end()
+            if self.pos < len(self.buffer) or not self.fill():
+                return self.buffer[self.pos:self.pos + 1]
+
+    def expect(self, _char: str):
+        """ Consume the next character, which must be _char. """
+        if self.peek() != _char:
+            raise self.error("Expecting '{}'".format(_char))
+        self.pos += 1
+
+    def value(self):
+        """ Decode the next JSON value, reading more of the file until the value is complete.
+        A value is complete when it can be decoded and is followed by another character
+        (or the end of the file), so numbers are not cut at the end of a chunk. """
+        self.peek()
+        while True:
+            try:
+                value, end = _decoder.raw_decode(self.buffer, self.pos)
+                if end < len(self.buffer) or self.eof:
+                    self.pos = end
+                    return value
+            except json.JSONDecodeError as e:
+                if self.eof or len(self.buffer) - self.pos > MAX_VALUE_SIZE:
+                    raise self.error(e.msg, self.offset + e.pos)
+            self.fill()
+
+    def string(self) -> str:
+        """ Decode the next value, which must be a string. """
+        if self.peek() != '"':
+            raise self.error("Expecting a string")
+        return self.value()
+
+    def separator(self, _closing: str) -> bool:
+        """ Consume ',' and return True, or consume _closing and return False. """
+        char = self.peek()
+        if char == ",":
+            self.pos += 1
+            return True
+        if char == _closing:
+            self.pos += 1
+            return False
+        raise self.error("Expecting ',' or '{}'".format(_closing))
+
+
+def parse_coordinate(_key: str) -> tuple:
+    """ Parse a "(y, x)" key into a tuple of two integers, raises ValueError if it is malformed. """
+    key = _key.strip()
+    if not (key.startswith("(") and key.endswith(")")):
+        raise ValueError("Coordinates should be in format (y, x) where x and y are integers")
+    parts = key[1:-1].split(",")
+    if len(parts) != 2:
+        raise ValueError("Coordinates should be in format (y, x) where x and y are integers")
+    return int(parts[0]), int(parts[1])
+
+
+def in_world(_y: int, _x: int, _world_size: tuple) -> bool:
+    """ Check that the coordinate lies within the world. """
+    return 0 <= _y < _world_size[1] and 0 <= _x < _world_size[0]
+
+
+def parse_cell(_value, _world_size: tuple, _validate_neighbours: bool) -> world.Cell:
+    """ Parse a cell object of the population, raises ValueError if it is invalid.
+    Returns None for rim cells. """
+    if _value is None:
+        return None
+    if not isinstance(_value, dict):
+        raise ValueError("Cell coordinates should be map a dictionary containing state and neighbours or none.")
+    state = _value.get("state")
+    if state not in (cb.STATE_ALIVE, cb.STATE_DEAD, cb.STATE_RIM):
+        raise ValueError("Invalid state value. The values should be'#' or '-' or 'x'.")
+    if _validate_neighbours:
+        neighbours = _value.get("neighbours")
+        if not isinstance(neighbours, list) or len(neighbours) != 8:
+            raise ValueError("Neighbours should be a list of 8 coordinates with format (y, x)")
+        for coordinate in neighbours:
+            if not isinstance(coordinate, list) or len(coordinate) != 2 or \
+                    not all(isinstance(value, int) for value in coordinate):
+                raise ValueError("Neighbours coordinates should be two integers")
+            if _world_size is not None and not in_world(coordinate[0], coordinate[1], _world_size):
+                raise ValueError("Coordinate values out of bounds")
+    return world.Cell(state, 0)
+
+
+def parse_world_size(_value) -> tuple:
+    """ Parse the world size [width, height], raises ValueError if it is invalid. """
+    if not isinstance(_value, list) or len(_value) != 2 or not all(isinstance(value, int) for value in _value):
+        raise ValueError("World size should be a list containing two integers corresponding to width and height")
+    if _value[0] < 1 or _value[1] < 1:
+        raise ValueError("Both width and height needs to have positive values above zero.")
+    return _value[0], _value[1]
+
+
+def load_seed(_file, _validate_neighbours: bool = False, _chunk_size: int = CHUNK_SIZE) -> tuple:
+    """ Parse a seed file opened in text mode. Returns the population, mapping every
+    (y, x) position to a Cell or None, and the world size (width, height).
+    Raises SeedFileError for an invalid file. """
+    reader = SeedReader(_file, _chunk_size)
+    world_size = None
+    population = None
+    """positions of the cells read before the world size, checked when it is known"""
+    unchecked = []
+    reader.expect("{")
+    if reader.peek() == "}":
+        raise reader.error("Key 'world_size' should be used to map the world size")
+    more = True
+    while more:
+        key = reader.string()
+        reader.expect(":")
+        if key == "world_size":
+            start = reader.tell()
+            try:
+                world_size = parse_world_size(reader.value())
+                for y, x in unchecked:
+                    if not in_world(y, x, world_size):
+                        raise ValueError("Coordinate values out of bounds ({}, {})".format(y, x))
+                unchecked = []
+            except ValueError as e:
+                raise reader.error(str(e), start)
+        elif key == "population":
+            population = {}
+            reader.expect("{")
+            more_cells = reader.peek() != "}"
+            if not more_cells:
+                reader.pos += 1
+            while more_cells:
+                start = reader.tell()
+                try:
+                    y, x = parse_coordinate(reader.string())
+                    if world_size is None:
+                        unchecked.append((y, x))
+                    elif not in_world(y, x, world_size):
+                        raise ValueError("Coordinate values out of bounds")
+                    reader.expect(":")
+                    start = reader.tell()
+                    population[(y, x)] = parse_cell(reader.value(), world_size, _validate_neighbours)
+                except ValueError as e:
+                    if isinstance(e, SeedFileError):
+                        raise
+                    raise reader.error(str(e), start)
+                more_cells = reader.separator("}")
+        else:
+            reader.value()
+        more = reader.separator("}")
+    if reader.peek():
+        raise reader.error("Extra data after the seed object")
+    if world_size is None:
+        raise reader.error("Key 'world_size' should be used to map the world size")
+    if population is None:
+        raise reader.error("Key 'population' should be used to map population")
+    return population, world_size
@@ -0,0 +1,162 @@
+#!/usr/bin/env python
+"""
+Binary snapshot format of the world.
+
+A snapshot file holds one generation of the world as a 24 byte header followed by the flat
+state and age planes of world.py, so loading it is two bulk copies instead of parsing a JSON
+object per cell:
+
+    * header: magic b"GOLSNAP1", width and height (uint32), generation (uint64), little endian,
+    * state plane: one byte per cell with the state codes of world.py, row-major,
+    * age plane: one uint32 per cell, little endian, starting at the next multiple of 4 bytes,
+    * optionally a JSON object with metadata after the planes, e.g. the random state of a checkpoint.
+
+The file is read through mmap and returned as a world.PlanePopulation, which every engine accepts
+as population. The seed files are converted with:
+    python -m Project.snapshot seed.json seed.snap
+    python -m Project.snapshot seed.snap seed.json
+"""
+
+import json
+import mmap
+import os
+import struct
+import sys
+from array import array
+import world
+import seed_stream
+
+SUFFIX = ".snap"
+MAGIC = b"GOLSNAP1"
+HEADER = struct.Struct("<8sIIQ")
+VALID_CODES = bytes(range(world.CODE_RIM + 1))
+
+
+class SnapshotError(ValueError):
+    """ The file is not a valid snapshot. """
+
+
+def plane_offsets(_world_size: tuple) -> tuple:
+    """ Return (state offset, age offset, file size) of a snapshot of the given world size. """
+    cells = _world_size[0] * _world_size[1]
+    ages = HEADER.size + (cells + 3) // 4 * 4
+    return HEADER.size, ages, ages + cells * 4
+
+
+def little_endian_ages(_ages) -> bytes:
+    """ Return the ages as little endian uint32 bytes. """
+    ages = array("I", _ages)
+    if sys.byteorder == "big":
+        ages.byteswap()
+    return ages.tobytes()
+
+
+def write_planes(_path, _states, _ages, _world_size: tuple, _generation: int = 0, _metadata: dict = None):
+    """ Write a snapshot file with the given planes, followed by _metadata if given.
+    The file is synced to the disk before it is closed, so a file renamed after it was written
+    holds the data after a power loss too. """
+    width, height = _world_size
+    states_offset, ages_offset, size = plane_offsets(_world_size)
+    with open(_path, "wb") as file:
+        file.write(HEADER.pack(MAGIC, width, height, _generation))
+        file.write(bytes(_states))
+        file.write(bytes(ages_offset - states_offset - width * height))
+        file.write(little_endian_ages(_ages))
+        if _metadata:
+            file.write(json.dumps(_metadata).encode())
+        file.flush()
+        os.fsync(file.fileno())
+
+
+def save_snapshot(_path, _engine: world.Engine):
+    """ Write the current generation of the engine to a snapshot file. """
+    states, ages = _engine.to_planes()
+    write_planes(_path, states, ages, _engine.world_size, _engine.generation)
+
+
+def load_snapshot(_path) -> world.PlanePopulation:
+    """ Map a snapshot file into memory and return it as a population.
+    The planes are views of the mapped file, the file itself is never parsed cell by cell.
+    Raises SnapshotError if the file is not a valid snapshot. """
+    with open(_path, "rb") as file:
+        if os.fstat(file.fileno()).st_size < HEADER.size:
+            raise SnapshotError("{} is too small to be a snapshot".format(_path))
+        mapped = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+    magic, width, height, generation = HEADER.unpack_from(mapped)
+    if magic != MAGIC:
+        raise SnapshotError("{} is not a snapshot file".format(_path))
+    if width < 1 or height < 1:
+        raise SnapshotError("Both width and height needs to have positive values above zero.")
+    states_offset, ages_offset, size = plane_offsets((width, height))
+    if len(mapped) < size:
+        raise SnapshotError("{} has {} bytes, a {}x{} snapshot needs {}".format(_path, len(mapped), width, height,
+                                                                             size))
+    view = memoryview(mapped)
+    states = view[states_offset:states_offset + width * height]
+    if states.tobytes().translate(None, VALID_CODES):
+        raise SnapshotError("{} has invalid state codes".format(_path))
+    ages = view[ages_offset:size]
+    if sys.byteorder == "big":
+        """the ages are stored little endian, swap them into a copy"""
+        ages = array(world.AGE_TYPECODE, ages.tobytes())
+        ages.byteswap()
+    else:
+        ages = ages.cast(world.AGE_TYPECODE)
+    return world.PlanePopulation(states, ages, (width, height), generation)
+
+
+def load_metadata(_path) -> dict:
+    """ Return the metadata stored after the planes of a snapshot file, an empty dictionary if there is none. """
+    with open(_path, "rb") as file:
+        header = file.read(HEADER.size)
+        if len(header) < HEADER.size or header[:len(MAGIC)] != MAGIC:
+            raise SnapshotError("{} is not a snapshot file".format(_path))
+        magic, width, height, generation = HEADER.unpack(header)
+        file.seek(plane_offsets((width, height))[2])
+        data = file.read()
+    try:
+        return json.loads(data) if data else {}
+    except ValueError:
+        raise SnapshotError("{} has invalid metadata".format(_path))
+
+
+def cell_to_json(_position: tuple, _cell: world.Cell):
+    """ Return a cell in the format of the seed files: None for rim cells,
+    otherwise the state and the positions of the neighbours. """
+    if _cell is None:
+        return None
+    y, x = _position
+    return {"state": _cell.state, "neighbours": [[y + dy, x + dx] for (dy, dx) in world.NEIGHBOUR_OFFSETS]}
+
+
+def write_json(_path, _population: dict, _world_size: tuple):
+    """ Write the population as a seed file. Ages are not part of the seed format and are dropped. """
+    with open(_path, "w") as file:
+        json.dump({"world_size": list(_world_size),
+                   "population": {str(position): cell_to_json(position, world.to_cell(cell))
+                                  for position, cell in _population.items()}}, file)
+
+
+def convert(_source: str, _target: str):
+    """ Convert a seed file to a snapshot or a snapshot to a seed file, chosen by the suffix of _source. """
+    if _source.endswith(SUFFIX):
+        population = load_snapshot(_source)
+        write_json(_target, population, population.world_size)
+    else:
+        with open(_source, "r") as file:
+            population, world_size = seed_stream.load_seed(file)
+        write_planes(_target, *world.population_to_planes(population, world_size), world_size)
+
+
+def main():
+    """ Convert the file given as first argument into the file given as second argument. """
+    if len(sys.argv) != 3:
+        sys.exit("usage: python -m Project.snapshot SOURCE TARGET, one of them ending with {}".format(SUFFIX))
+    try:
+        convert(sys.argv[1], sys.argv[2])
+    except (OSError, ValueError) as e:
+        sys.exit(str(e))
+
+
+if __name__ == "__main__":
+    main()
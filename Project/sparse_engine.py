@@ -0,0 +1,103 @@
+#!/usr/bin/env python
+"""
+Sparse simulation engine that only stores the live cells.
+
+Most seeds leave the world almost empty, so instead of visiting every position of the world
+this engine keeps a dictionary of the live cells only, keyed by the flat index y * width + x
+and mapped to their state code and age. For each generation the live neighbours are counted
+by visiting the neighbourhood of every live cell, which gives the candidates for the next
+generation: live cells with neighbours that may survive and dead cells that may be born.
+The cost of a tick therefore grows with the population and not with the area of the world.
+
+A birth is only allowed on a position that is not a rim cell, which gives the same rim
+behaviour as gol.is_rim_cell.
+"""
+
+from collections import Counter
+import code_base as cb
+import world
+import rules
+
+
+class SparseEngine(world.Engine):
+    """ Engine storing only the live cells of the world. """
+
+    name = "sparse"
+
+    def __init__(self, _population: dict, _world_size: tuple, _rule: rules.Rule = rules.CONWAY):
+        super().__init__(_world_size, _rule)
+        width = self.world_size[0]
+        self.offsets = tuple(dy * width + dx for (dy, dx) in world.NEIGHBOUR_OFFSETS)
+        self.live = {}
+        """Positions that are not on the rim but were read with the rim state, they are
+        neither alive nor dead and can not be born in the first generation."""
+        self.blocked = set()
+        for (y, x), cell in _population.items():
+            if cell is None or self.is_rim(y * width + x):
+                continue
+            cell = world.to_cell(cell)
+            code = world.STATE_CODES[cell.state]
+            if code in world.LIVE_CODES:
+                self.live[y * width + x] = (code, cell.age)
+            elif code == world.CODE_RIM:
+                self.blocked.add(y * width + x)
+        self.state_counts = [0] * (world.CODE_RIM + 1)
+        for code, age in self.live.values():
+            self.state_counts[code] += 1
+
+    def is_rim(self, _index: int) -> bool:
+        """ Check if the cell at the flat index is a rim cell. """
+        width, height = self.world_size
+        y, x = divmod(_index, width)
+        return x == 0 or y == 0 or x == width - 1 or y == height - 1
+
+    def step(self):
+        """ Advance the world by one generation.
+        Count the live neighbours of every position next to a live cell, then look up the next state
+        of the live cells in the table of the rule and add the dead cells with a birth count.
+        The live cells of each state are counted while the next generation is made. """
+        live = self.live
+        offsets = self.offsets
+        rule = self.rule
+        neighbour_counts = Counter(index + offset for index in live for offset in offsets)
+        if rule.survival_table[0]:
+            """live cells without live neighbours survive, they are not next to any live cell"""
+            for index in live:
+                neighbour_counts[index] += 0
+        next_live = {}
+        state_counts = [0] * (world.CODE_RIM + 1)
+        for index, live_neighbours in neighbour_counts.items():
+            cell = live.get(index)
+            if cell is not None:
+                next_cell = rule.next_state_code(cell[0], cell[1], live_neighbours)
+                if next_cell[0] != world.CODE_DEAD:
+                    next_live[index] = next_cell
+                    state_counts[next_cell[0]] += 1
+            elif rule.birth_table[live_neighbours] and index not in self.blocked and not self.is_rim(index):
+                next_live[index] = (world.CODE_ALIVE, 1)
+                state_counts[world.CODE_ALIVE] += 1
+        if self.live_hash is not None:
+            """the cells that are born or die are the positions in only one of the generations"""
+            for index in live.keys() ^ next_live.keys():
+                self.live_hash ^= world.cell_key(index)
+        self.live = next_live
+        self.state_counts = state_counts
+        self.blocked = set()
+        self.generation += 1
+
+    def to_planes(self) -> tuple:
+        """ Return the world as flat (states, ages) planes. """
+        states, ages = world.empty_planes(self.world_size)
+        for index in self.blocked:
+            states[index] = world.CODE_RIM
+        for index, (code, age) in self.live.items():
+            states[index] = code
+            ages[index] = age
+        return states, ages
+
+    def counts(self) -> dict:
+        """ Return the live cells of each state counted when the generation was made,
+        the remaining cells that are not rim cells are dead. """
+        counts = world.code_counts_to_states(self.state_counts)
+        counts[cb.STATE_DEAD] = world.ordinary_cells(self.world_size) - len(self.live) - len(self.blocked)
+        return counts
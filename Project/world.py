@@ -0,0 +1,293 @@
+#!/usr/bin/env python
+"""
+Shared helpers for the alternative simulation engines.
+
+The original world used by gol.py is a dictionary mapping every (y, x) position
+to either None (rim cell) or a Cell holding the state and the age of the cell.
+The engines in this package store the world in more compact layouts, so this module
+holds the pieces they have in common:
+
+    * small integer codes for the cell states, mapped to the code_base characters
+      only when the world is printed or converted back to the dictionary format,
+    * conversion between the dictionary world and flat row-major state and age planes,
+    * the Engine base class that the simulation loop in gol.py talks to.
+"""
+
+from array import array
+from collections.abc import Mapping
+import code_base as cb
+
+CODE_DEAD, CODE_ALIVE, CODE_ELDER, CODE_PRIME_ELDER, CODE_RIM = 0, 1, 2, 3, 4
+
+STATE_CODES = {
+    cb.STATE_DEAD: CODE_DEAD,
+    cb.STATE_ALIVE: CODE_ALIVE,
+    cb.STATE_ELDER: CODE_ELDER,
+    cb.STATE_PRIME_ELDER: CODE_PRIME_ELDER,
+    cb.STATE_RIM: CODE_RIM
+}
+CODE_STATES = {code: state for state, code in STATE_CODES.items()}
+PRINT_TABLE = bytes.maketrans(bytes(CODE_STATES), "".join(CODE_STATES.values()).encode())
+LIVE_CODES = (CODE_ALIVE, CODE_ELDER, CODE_PRIME_ELDER)
+
+ELDER_AGE = 5         # a live cell older than this is an elder
+PRIME_ELDER_AGE = 10  # an elder older than this is a prime elder
+
+AGE_TYPECODE = 'I'
+
+HASH_MASK = (1 << 64) - 1
+
+"""bounded: the world is surrounded by a dead rim, torus: the edges wrap around to the opposite edge,
+infinite: the storage grows as the live cells get close to its edge"""
+TOPOLOGY_BOUNDED, TOPOLOGY_TORUS, TOPOLOGY_INFINITE = "bounded", "torus", "infinite"
+TOPOLOGIES = (TOPOLOGY_BOUNDED, TOPOLOGY_TORUS, TOPOLOGY_INFINITE)
+
+# (dy, dx) of the neighbours in the order used by gol.calc_neighbour_positions: NW, N, NE, W, E, SW, S, SE
+NEIGHBOUR_OFFSETS = ((-1, -1), (-1, 0), (-1, 1), (0, -1), (0, 1), (1, -1), (1, 0), (1, 1))
+
+
+def ordinary_cells(_world_size: tuple) -> int:
+    """ Number of cells that are not rim cells for the given world size. """
+    return max(_world_size[0] - 2, 0) * max(_world_size[1] - 2, 0)
+
+
+def cell_key(_index: int) -> int:
+    """ 64 bit Zobrist key of the cell at a flat index, the splitmix64 mix of the index.
+    The hash of a world is the xor of the keys of its live cells, so it can be updated from
+    the cells that are born or die without going through the whole world. """
+    key = (_index + 1) * 0x9E3779B97F4A7C15 & HASH_MASK
+    key = (key ^ (key >> 30)) * 0xBF58476D1CE4E5B9 & HASH_MASK
+    key = (key ^ (key >> 27)) * 0x94D049BB133111EB & HASH_MASK
+    return key ^ (key >> 31)
+
+
+def plane_hash(_states) -> int:
+    """ Hash of the live cells of a state plane, see cell_key. """
+    live_hash = 0
+    for index, code in enumerate(_states):
+        if CODE_ALIVE <= code <= CODE_PRIME_ELDER:
+            live_hash ^= cell_key(index)
+    return live_hash
+
+
+def code_counts_to_states(_counts) -> dict:
+    """ Convert cell counts indexed by state code to the counts per state logged by gol.py. """
+    return {cb.STATE_ALIVE: int(_counts[CODE_ALIVE]), cb.STATE_ELDER: int(_counts[CODE_ELDER]),
+            cb.STATE_PRIME_ELDER: int(_counts[CODE_PRIME_ELDER]), cb.STATE_DEAD: int(_counts[CODE_DEAD])}
+
+
+class Cell:
+    """ Cell object of the dictionary world: the state character and the age of the cell.
+    Slots keep the object small and give direct access to both fields. """
+
+    __slots__ = ("state", "age")
+
+    def __init__(self, _state: str, _age: int = 0):
+        self.state = _state
+        self.age = _age
+
+    def __eq__(self, other):
+        return isinstance(other, Cell) and self.state == other.state and self.age == other.age
+
+    def __repr__(self):
+        return "Cell({!r}, {})".format(self.state, self.age)
+
+
+def to_cell(_cell_details) -> Cell:
+    """ Compatibility adapter returning a Cell for the cell formats used by earlier versions:
+    a dictionary with the state as key (mapped to the neighbours or None) and the key 'age',
+    or a dictionary with the keys 'state' and optionally 'age' as in seed files.
+    Returns None for rim cells (None) and Cell objects unchanged. """
+    if _cell_details is None or isinstance(_cell_details, Cell):
+        return _cell_details
+    age = _cell_details.get("age", 0)
+    if "state" in _cell_details:
+        return Cell(_cell_details["state"], age)
+    for key in _cell_details.keys():
+        if key != "age":
+            return Cell(key, age)
+    raise ValueError("Cell details without a state: {}".format(_cell_details))
+
+
+def to_cell_population(_population: dict) -> dict:
+    """ Return the population with every cell converted by to_cell.
+    A population that already holds Cell objects is returned as it is,
+    a PlanePopulation is copied into a dictionary. """
+    if isinstance(_population, PlanePopulation):
+        return dict(_population.items())
+    for cell in _population.values():
+        if cell is not None:
+            if isinstance(cell, Cell):
+                return _population
+            break
+    return {position: to_cell(cell) for position, cell in _population.items()}
+
+
+class PlanePopulation(Mapping):
+    """ Read only dictionary world backed by flat state and age planes, e.g. the planes of a snapshot file.
+    The cells are only created when they are looked up, and population_to_planes copies the planes
+    as a whole, so engines built on planes never go through the cells one by one.
+    generation is the generation the planes were saved at. """
+
+    def __init__(self, _states, _ages, _world_size: tuple, _generation: int = 0):
+        self.states = _states
+        self.ages = _ages
+        self.world_size = tuple(_world_size)
+        self.generation = _generation
+
+    def __getitem__(self, _position: tuple) -> Cell:
+        y, x = _position
+        width, height = self.world_size
+        if not (0 <= y < height and 0 <= x < width):
+            raise KeyError(_position)
+        if x == 0 or y == 0 or x == width - 1 or y == height - 1:
+            return None
+        index = y * width + x
+        return Cell(CODE_STATES[self.states[index]], self.ages[index])
+
+    def __iter__(self):
+        width, height = self.world_size
+        for x in range(width):
+            for y in range(height):
+                yield y, x
+
+    def __len__(self) -> int:
+        return self.world_size[0] * self.world_size[1]
+
+    def stored_cells(self):
+        """ Yield the position and the Cell of every cell that is not dead as stored in the planes.
+        Unlike items(), the cells on the border are not replaced by rim cells, e.g. for a torus. """
+        width = self.world_size[0]
+        for index, code in enumerate(self.states):
+            if code != CODE_DEAD:
+                yield divmod(index, width), Cell(CODE_STATES[code], self.ages[index])
+
+
+def set_rim(_states: bytearray, _world_size: tuple):
+    """ Set the first and last row and column of a state plane to CODE_RIM. """
+    width, height = _world_size
+    _states[:width] = _states[-width:] = bytes([CODE_RIM]) * width
+    _states[::width] = _states[width - 1::width] = bytes([CODE_RIM]) * height
+
+
+def empty_planes(_world_size: tuple) -> tuple:
+    """ Return (states, ages) planes of a world with only dead cells inside the rim. """
+    width, height = _world_size
+    states = bytearray(width * height)
+    set_rim(states, _world_size)
+    return states, array(AGE_TYPECODE, [0]) * (width * height)
+
+
+def population_to_planes(_population: dict, _world_size: tuple) -> tuple:
+    """ Convert the dictionary world into two flat row-major planes indexed by y * width + x:
+    a bytearray with the state codes and an array with the ages.
+    Rim cells (None) are stored with CODE_RIM. The border of the planes of a snapshot of a torus
+    or an infinite world holds ordinary cells, the copy gets the rim of a bounded world instead. """
+    width, height = _world_size
+    if isinstance(_population, PlanePopulation) and _population.world_size == tuple(_world_size):
+        states = bytearray(_population.states)
+        ages = array(AGE_TYPECODE)
+        ages.frombytes(bytes(_population.ages))
+        set_rim(states, _world_size)
+        for index in (*range(width), *range(width * (height - 1), width * height),
+                      *range(0, width * height, width), *range(width - 1, width * height, width)):
+            ages[index] = 0
+        return states, ages
+    states = bytearray(width * height)
+    ages = array(AGE_TYPECODE, [0]) * (width * height)
+    for (y, x), cell in _population.items():
+        index = y * width + x
+        if cell is None:
+            states[index] = CODE_RIM
+        else:
+            cell = to_cell(cell)
+            states[index] = STATE_CODES[cell.state]
+            ages[index] = cell.age
+    return states, ages
+
+
+def planes_to_population(_states, _ages, _world_size: tuple) -> dict:
+    """ Convert flat state and age planes back into the dictionary world used by gol.py. """
+    width, height = _world_size
+    population = {}
+    for x in range(width):
+        for y in range(height):
+            if x == 0 or y == 0 or x == width - 1 or y == height - 1:
+                population[(y, x)] = None
+            else:
+                index = y * width + x
+                population[(y, x)] = Cell(CODE_STATES[_states[index]], _ages[index])
+    return population
+
+
+class Engine:
+    """ Base class of a simulation engine.
+    An engine owns the world between generations. The simulation loop renders it through rows(),
+    logs counts() and advances it with step(). Subclasses must implement step() and to_planes(),
+    the remaining methods have generic implementations based on the planes. """
+
+    name = None
+    topologies = (TOPOLOGY_BOUNDED,)  # topologies the engine can simulate, see TOPOLOGIES
+
+    def __init__(self, _world_size: tuple, _rule=None):
+        self.world_size = tuple(_world_size)
+        self.generation = 0
+        self.topology = TOPOLOGY_BOUNDED
+        """the rules.Rule of the simulation"""
+        self.rule = _rule
+        """hash of the live cells, only kept up to date by step() after track_hash() was called"""
+        self.live_hash = None
+        """profiling.Profiler timing the phases of step(), if the run is profiled"""
+        self.profiler = None
+
+    def track_hash(self):
+        """ Start keeping live_hash up to date. The hash is computed once from the planes,
+        after that the engines update it from the cells that are born or die in each step. """
+        self.live_hash = plane_hash(self.to_planes()[0])
+
+    def step(self):
+        """ Advance the world by one generation. """
+        raise NotImplementedError
+
+    def set_generation(self, _generation: int):
+        """ Continue counting from _generation, e.g. for a world loaded from a snapshot.
+        Engines that store the world relative to the generation override this. """
+        self.generation = _generation
+
+    def advance(self, _generations: int) -> int:
+        """ Advance the world by at most _generations and return how many were made.
+        Engines that can skip ahead override this, the default makes a single step. """
+        self.step()
+        return 1
+
+    def ordinary_cells(self) -> int:
+        """ Number of cells of the world that are not rim cells. """
+        return ordinary_cells(self.world_size)
+
+    def summary(self) -> dict:
+        """ Statistics reported when the simulation ends, none by default. """
+        return {}
+
+    def close(self):
+        """ Release resources held by the engine, such as worker processes. """
+
+    def to_planes(self) -> tuple:
+        """ Return the world as (states, ages) planes, see population_to_planes. """
+        raise NotImplementedError
+
+    def rows(self):
+        """ Yield each row of the world as a string of state characters. """
+        width, height = self.world_size
+        states = bytes(self.to_planes()[0]).translate(PRINT_TABLE)
+        for y in range(height):
+            yield states[y * width:(y + 1) * width].decode()
+
+    def counts(self) -> dict:
+        """ Count the cells of each state, rim cells excluded. """
+        states = bytes(self.to_planes()[0])
+        return code_counts_to_states([states.count(code) for code in range(CODE_RIM + 1)])
+
+    def to_population(self) -> dict:
+        """ Return the world in the dictionary format used by gol.py. """
+        states, ages = self.to_planes()
+        return planes_to_population(states, ages, self.world_size)
@@ -0,0 +1,40 @@
+"""
+The modules of the project import each other by name, as when they are run from Project/,
+so the directory is put on the path before the tests import them.
+
+The simulation runs log to _Resources/gol.log of the project, tests running them take the
+gol_log fixture to log to a temporary file instead. The logger is created when gol is imported.
+"""
+
+import logging
+import sys
+from pathlib import Path
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "Project"))
+
+
+@pytest.fixture
+def gol_log(tmp_path):
+    """ Point the log file of the simulation runs to a temporary file, returns its path.
+    The file handler opens the file on the first write, so the open stream is closed before and after. """
+    logger = logging.getLogger("gol_logger")
+    handler = logger.file_handler
+    path = tmp_path / "gol.log"
+
+    def reopen(_path):
+        handler.acquire()
+        try:
+            if handler.stream is not None:
+                handler.stream.close()
+                handler.stream = None
+            handler.baseFilename = str(_path)
+            handler.mode = "w"
+        finally:
+            handler.release()
+
+    original = handler.baseFilename
+    reopen(path)
+    yield path
+    logger.pipeline.flush()
+    reopen(original)
@@ -0,0 +1,69 @@
+"""
+Helpers running an engine side by side with update_world, the dictionary implementation of the rules.
+
+The engine and update_world are compared after every generation: the state and age planes,
+the counts of every state and the live hash kept up to date by step(). update_world itself is
+checked against generations taken from the original implementation in test_gol.py.
+"""
+
+import random
+import pytest
+import world
+import rules
+import gol
+
+GENERATIONS = 30
+WORLD_SIZE = (40, 30)
+SEEDS = ("gliders", "pulsar", "penta", None)  # None for a random world
+
+
+def seed_world(_seed: str, _world_size: tuple = WORLD_SIZE) -> world.PlanePopulation:
+    """ World of one of the code_base patterns, or a random world with a fixed seed. """
+    return gol.populate_world(_world_size, _seed, random.Random(7))
+
+
+def create(_name: str, _population, _world_size: tuple = WORLD_SIZE, _rule: rules.Rule = rules.CONWAY,
+           **_options) -> world.Engine:
+    """ Create an engine, skipping the test if an optional dependency of the engine is missing. """
+    try:
+        return gol.ENGINES[_name](_population, _world_size, _rule=_rule, **_options)
+    except ImportError as e:
+        pytest.skip(str(e))
+
+
+def reference_planes(_population, _world_size: tuple, _rule: rules.Rule, _generations: int) -> list:
+    """ The state and age planes of every generation made by update_world. """
+    cells = world.to_cell_population(_population)
+    planes = []
+    for _ in range(_generations + 1):
+        planes.append(world.population_to_planes(cells, _world_size))
+        cells = gol.update_world(cells, _world_size, False, _rule=_rule)
+    return planes
+
+
+def plane_counts(_states) -> dict:
+    """ Counts of every state of a state plane, rim cells excluded. """
+    return world.code_counts_to_states([_states.count(code) for code in range(world.CODE_RIM + 1)])
+
+
+def live_cells(_states) -> bytes:
+    """ 1 for every live cell of a state plane, 0 for every other cell. """
+    return bytes(code in world.LIVE_CODES for code in _states)
+
+
+def run_against_reference(_name: str, _population, _world_size: tuple = WORLD_SIZE,
+                          _rule: rules.Rule = rules.CONWAY, **_options):
+    """ Compare the engine with update_world for GENERATIONS generations. """
+    expected = reference_planes(_population, _world_size, _rule, GENERATIONS)
+    engine = create(_name, _population, _world_size, _rule, **_options)
+    engine.track_hash()
+    try:
+        for generation, (states, ages) in enumerate(expected):
+            actual_states, actual_ages = engine.to_planes()
+            assert bytes(actual_states) == bytes(states), generation
+            assert list(actual_ages) == list(ages), generation
+            assert engine.counts() == plane_counts(states), generation
+            assert engine.live_hash == world.plane_hash(states), generation
+            engine.step()
+    finally:
+        engine.close()
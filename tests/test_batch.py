@@ -0,0 +1,43 @@
+"""
+The batch runner: reproducible jobs and the validation of the job specs.
+"""
+
+import pytest
+import batch
+
+
+def without_time(_row: dict) -> dict:
+    """ A row of the results table without the seconds the job took. """
+    return {column: value for column, value in _row.items() if column != "seconds"}
+
+
+def test_jobs_are_reproducible():
+    jobs = batch.make_jobs(batch.sweep([(30, 20)], ["random", "pulsar"], 20, 2), 3)
+    assert [job.rng_seed for job in jobs] == [3 * batch.SEED_STRIDE + number for number in range(4)]
+    first = [without_time(batch.run_job(job)) for job in jobs]
+    assert first == [without_time(batch.run_job(job)) for job in jobs]
+    assert first[0]["alive"] != first[1]["alive"] or first[0]["dead"] != first[1]["dead"]
+    assert first[2] == dict(first[3], job=2, rng_seed=jobs[2].rng_seed)
+
+
+def test_jobs_give_the_same_rows_with_every_engine_and_in_the_pool():
+    jobs = batch.make_jobs(batch.sweep([(30, 20)], ["random"], 20, 2))
+    rows = [without_time(row) for row in batch.run_batch(jobs, 2)]
+    assert rows == [without_time(batch.run_job(job, "bitpack")) for job in jobs]
+
+
+def test_cycles_stop_the_job():
+    row = batch.run_job(batch.make_jobs([((30, 30), "pulsar", 100)])[0], _cycles=True)
+    assert (row["generation"], row["first_repeat"], row["period"]) == (3, 3, 3)
+
+
+def test_unknown_pattern_is_rejected(tmp_path):
+    with pytest.raises(ValueError, match="pulsr"):
+        batch.sweep([(30, 20)], ["random", "pulsr"], 20)
+    path = tmp_path / "jobs.txt"
+    path.write_text("# size pattern generations\n30x20 pulsar 20\n30x20 glider 20\n")
+    with pytest.raises(ValueError, match="line 3: Unknown pattern 'glider'"):
+        batch.read_jobs(path)
+    path.write_text("30x20 pulsar\n")
+    with pytest.raises(ValueError, match="line 1: expecting"):
+        batch.read_jobs(path)
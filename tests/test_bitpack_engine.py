@@ -0,0 +1,59 @@
+"""
+The bit-packed engine against update_world, and its torus and infinite topologies.
+"""
+
+import pytest
+import world
+import bitpack_engine
+import reference
+
+
+@pytest.mark.parametrize("seed", reference.SEEDS)
+def test_matches_update_world(seed):
+    reference.run_against_reference("bitpack", reference.seed_world(seed))
+
+
+def torus_step(_live: list, _world_size: tuple) -> list:
+    """ Next generation of Conway's Life on a torus, the rows of the world as lists of 0 and 1. """
+    width, height = _world_size
+    return [[int(sum(_live[(y + dy) % height][(x + dx) % width] for dy, dx in world.NEIGHBOUR_OFFSETS)
+                 in ((2, 3) if _live[y][x] else (3,))) for x in range(width)] for y in range(height)]
+
+
+def test_torus_wraps_around():
+    population = reference.seed_world(None, (23, 17))
+    width, height = population.world_size
+    engine = bitpack_engine.BitPackEngine(population, population.world_size, world.TOPOLOGY_TORUS)
+    engine.track_hash()
+    live = [[int(population.states[y * width + x] in world.LIVE_CODES) for x in range(width)]
+            for y in range(height)]
+    for generation in range(reference.GENERATIONS):
+        states = engine.to_planes()[0]
+        assert reference.live_cells(states) == bytes(cell for row in live for cell in row), generation
+        assert engine.live_hash == world.plane_hash(states), generation
+        live = torus_step(live, population.world_size)
+        engine.step()
+
+
+def test_infinite_world_matches_a_larger_bounded_world():
+    """ A world that is far larger than the pattern behaves as the infinite plane
+    until the pattern reaches its rim. """
+    small = reference.seed_world(None, (12, 12))
+    margin = 60
+    large_size = (12 + 2 * margin, 12 + 2 * margin)
+    states, ages = world.empty_planes(large_size)
+    for index, code in enumerate(small.states):
+        y, x = divmod(index, 12)
+        if code in world.LIVE_CODES:
+            states[(y + margin) * large_size[0] + x + margin] = code
+    infinite = bitpack_engine.BitPackEngine(small, small.world_size, world.TOPOLOGY_INFINITE)
+    infinite.track_hash()
+    bounded = bitpack_engine.BitPackEngine(world.PlanePopulation(states, ages, large_size), large_size)
+    for generation in range(2 * reference.GENERATIONS):
+        infinite_states = infinite.to_planes()[0]
+        assert sum(reference.live_cells(infinite_states)) == sum(reference.live_cells(bounded.to_planes()[0])), \
+            generation
+        assert infinite.live_hash == world.plane_hash(infinite_states), generation
+        infinite.step()
+        bounded.step()
+    assert infinite.growths
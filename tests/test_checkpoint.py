@@ -0,0 +1,44 @@
+"""
+Periodic checkpoints and resuming a run from the last one.
+"""
+
+import random
+import time
+import checkpoint
+import gol
+import reference
+
+
+def test_checkpoints_are_written_every_n_generations(tmp_path):
+    path = tmp_path / "checkpoint.snap"
+    engine = reference.create("bitpack", reference.seed_world(None))
+    checkpointer = checkpoint.Checkpointer(path, 8, _rng_seed=7)
+    for _ in range(20):
+        engine.step()
+        checkpointer.update(engine)
+        while not checkpointer.pending.empty():
+            """a checkpoint falling due while the previous one waits would be postponed"""
+            time.sleep(0.001)
+    checkpointer.close()
+    state = random.getstate()
+    population, metadata = checkpoint.load_checkpoint(path)
+    assert random.getstate() == state
+    assert checkpointer.written == 2
+    assert population.generation == 16
+    assert metadata == {"engine": "bitpack", "topology": "bounded", "rule": "B3/S23",
+                        "elder_ages": [engine.rule.elder_age, engine.rule.prime_elder_age], "rng_seed": 7}
+
+
+def test_resumed_run_ends_with_the_world_of_an_uninterrupted_run(tmp_path, gol_log):
+    path = tmp_path / "checkpoint.snap"
+    population = reference.seed_world(None)
+    interrupted = gol.create_engine("dict", population, reference.WORLD_SIZE)
+    gol.run_simulation(20, interrupted, reference.WORLD_SIZE, headless=True,
+                       checkpointer=checkpoint.Checkpointer(path, 8))
+    resumed = gol.create_engine("dict", checkpoint.load_checkpoint(path)[0], reference.WORLD_SIZE)
+    assert resumed.generation == 16
+    gol.run_simulation(30, resumed, reference.WORLD_SIZE, headless=True, append_log=True)
+    uninterrupted = gol.create_engine("dict", population, reference.WORLD_SIZE)
+    gol.run_simulation(30, uninterrupted, reference.WORLD_SIZE, headless=True)
+    assert resumed.generation == uninterrupted.generation == 30
+    assert resumed.to_planes() == uninterrupted.to_planes()
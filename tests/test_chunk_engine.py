@@ -0,0 +1,23 @@
+"""
+The chunked engine against update_world.
+"""
+
+import pytest
+import reference
+
+
+@pytest.mark.parametrize("seed", reference.SEEDS)
+@pytest.mark.parametrize("world_size", (reference.WORLD_SIZE, (100, 70)))
+def test_matches_update_world(seed, world_size):
+    reference.run_against_reference("chunked", reference.seed_world(seed, world_size), world_size)
+
+
+def test_skips_the_chunks_where_nothing_happens():
+    world_size = (200, 200)
+    engine = reference.create("chunked", reference.seed_world("pulsar", world_size), world_size)
+    for _ in range(reference.GENERATIONS):
+        engine.step()
+    """the pulsar lies on the corner of four chunks, which are computed with their neighbours"""
+    columns, rows = engine.chunk_grid
+    assert engine.chunk_steps <= 16 * engine.steps
+    assert engine.summary()["skipped chunk steps"] >= (columns * rows - 16) * engine.steps
@@ -0,0 +1,59 @@
+"""
+Cycle detection: the table of generation hashes and the stop and skip modes of the simulation loop.
+"""
+
+import pytest
+import world
+import gol
+import cycles
+import reference
+
+SIZE = (32, 32)
+
+
+def test_detector_returns_the_first_generation_with_the_hash():
+    detector = cycles.CycleDetector()
+    assert detector.check(0, 11) is None
+    assert detector.check(1, 12) is None
+    assert detector.check(2, 11) == 0
+
+
+def test_detector_drops_the_oldest_hash_when_full():
+    detector = cycles.CycleDetector(2)
+    for generation, live_hash in enumerate((11, 12, 13)):
+        detector.check(generation, live_hash)
+    assert detector.check(3, 11) is None
+    assert detector.check(4, 13) == 2
+
+
+@pytest.mark.parametrize("name, options", (("dict", {}), ("bitpack", {}), ("hashlife", {"_track_ages": False})))
+def test_stop_mode_finds_the_period(gol_log, name, options):
+    engine = reference.create(name, reference.seed_world("pulsar", SIZE), SIZE, **options)
+    gol.run_simulation(100, engine, SIZE, headless=True, cycles_mode="stop")
+    log = gol_log.read_text()
+    assert "CYCLE" in log and "Period: 3" in log
+    assert engine.generation < 100
+
+
+def test_hashlife_hash_survives_collecting_the_node_table():
+    engine = reference.create("hashlife", reference.seed_world("pulsar", SIZE), SIZE, _track_ages=False)
+    engine.max_nodes = 0
+    engine.track_hash()
+    detector = cycles.CycleDetector()
+    first = detector.check(engine.generation, engine.live_hash)
+    while first is None and engine.generation < 12:
+        engine.advance(1)
+        assert engine.stepper is None and len(engine.universe.table) < 1000
+        assert engine.live_hash == world.plane_hash(engine.to_planes()[0])
+        first = detector.check(engine.generation, engine.live_hash)
+    assert (first, engine.generation) == (0, 3)
+
+
+def test_skip_mode_logs_the_counts_of_every_generation(tmp_path, gol_log):
+    stats = {}
+    for mode in (None, "skip"):
+        stats[mode] = tmp_path / "{}.csv".format(mode)
+        engine = reference.create("bitpack", reference.seed_world("pulsar", SIZE), SIZE)
+        gol.run_simulation(60, engine, SIZE, headless=True, cycles_mode=mode, stats=stats[mode])
+    assert "Skipped generations" in gol_log.read_text()
+    assert stats["skip"].read_text() == stats[None].read_text()
@@ -0,0 +1,107 @@
+"""
+update_world and the dictionary engine against generations of the original implementation.
+
+GOLDEN holds the rows and ages of a world with a block, a blinker and a glider after 6 and 14
+generations, as made by the update_world of the first version of gol.py. The block becomes elders
+and prime elders and the glider runs into the rim, so every state and transition is covered.
+"""
+
+import world
+import gol
+
+GOLDEN_SIZE = (12, 10)
+GOLDEN_SEED = ((1, 1), (1, 2), (2, 1), (2, 2), (2, 6), (2, 7), (2, 8), (5, 2), (6, 3), (7, 1), (7, 2), (7, 3))
+GOLDEN = {
+    6: (["############",
+         "#EE--------#",
+         "#EE---XEX--#",
+         "#----------#",
+         "#----------#",
+         "#----------#",
+         "#----------#",
+         "#---X------#",
+         "#--XX------#",
+         "############"],
+        [[0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0],
+         [0, 6, 6, 0, 0, 0, 0, 0, 0, 0, 0, 0],
+         [0, 6, 6, 0, 0, 0, 1, 6, 1, 0, 0, 0],
+         [0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0],
+         [0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0],
+         [0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0],
+         [0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0],
+         [0, 0, 0, 0, 4, 0, 0, 0, 0, 0, 0, 0],
+         [0, 0, 0, 5, 3, 0, 0, 0, 0, 0, 0, 0],
+         [0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0]]),
+    14: (["############",
+          "#PP--------#",
+          "#PP---XPX--#",
+          "#----------#",
+          "#----------#",
+          "#----------#",
+          "#----------#",
+          "#--EP------#",
+          "#--PP------#",
+          "############"],
+         [[0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0],
+          [0, 14, 14, 0, 0, 0, 0, 0, 0, 0, 0, 0],
+          [0, 14, 14, 0, 0, 0, 1, 14, 1, 0, 0, 0],
+          [0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0],
+          [0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0],
+          [0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0],
+          [0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0],
+          [0, 0, 0, 8, 12, 0, 0, 0, 0, 0, 0, 0],
+          [0, 0, 0, 13, 11, 0, 0, 0, 0, 0, 0, 0],
+          [0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0]])
+}
+
+
+def golden_world() -> world.PlanePopulation:
+    width = GOLDEN_SIZE[0]
+    states, ages = world.empty_planes(GOLDEN_SIZE)
+    for y, x in GOLDEN_SEED:
+        states[y * width + x] = world.CODE_ALIVE
+    return world.PlanePopulation(states, ages, GOLDEN_SIZE)
+
+
+def as_rows(_states, _ages) -> tuple:
+    """ The planes as rows of state characters and rows of ages, the format of GOLDEN. """
+    width, height = GOLDEN_SIZE
+    text = bytes(_states).translate(world.PRINT_TABLE).decode()
+    return ([text[y * width:(y + 1) * width] for y in range(height)],
+            [list(_ages[y * width:(y + 1) * width]) for y in range(height)])
+
+
+def test_update_world_matches_the_original_implementation():
+    cells = world.to_cell_population(golden_world())
+    for generation in range(1, max(GOLDEN) + 1):
+        cells = gol.update_world(cells, GOLDEN_SIZE, False)
+        if generation in GOLDEN:
+            assert as_rows(*world.population_to_planes(cells, GOLDEN_SIZE)) == GOLDEN[generation], generation
+
+
+def test_dict_engine_matches_the_original_implementation():
+    engine = gol.DictEngine(golden_world(), GOLDEN_SIZE)
+    for generation in range(1, max(GOLDEN) + 1):
+        engine.step()
+        if generation in GOLDEN:
+            assert as_rows(*engine.to_planes()) == GOLDEN[generation], generation
+            assert engine.counts() == engine.count_states(), generation
+
+
+def test_run_simulation_runs_a_population(gol_log):
+    world_size = (20, 10)
+    gol.run_simulation(3, gol.populate_world(world_size, "pulsar"), world_size, headless=True)
+    gol.run_simulation(3, world.to_cell_population(gol.populate_world(world_size, "pulsar")), world_size,
+                       headless=True)
+    assert gol_log.read_text().count("GENERATION 2") == 2
+
+
+def test_buffered_engine_matches_the_original_implementation():
+    engine = gol.BufferedDictEngine(golden_world(), GOLDEN_SIZE)
+    engine.track_hash()
+    for generation in range(1, max(GOLDEN) + 1):
+        engine.step()
+        if generation in GOLDEN:
+            assert as_rows(*engine.to_planes()) == GOLDEN[generation], generation
+            assert engine.counts() == engine.count_states(), generation
+            assert engine.live_hash == world.plane_hash(engine.to_planes()[0]), generation
@@ -0,0 +1,48 @@
+"""
+The hashlife engine against update_world, with and without age tracking.
+"""
+
+import pytest
+import rules
+import reference
+
+
+@pytest.mark.parametrize("seed", reference.SEEDS)
+def test_matches_update_world(seed):
+    reference.run_against_reference("hashlife", reference.seed_world(seed))
+
+
+@pytest.mark.parametrize("seed", reference.SEEDS)
+@pytest.mark.parametrize("generations", (1, 4, 64))
+def test_live_cells_without_ages_match_update_world(seed, generations):
+    population = reference.seed_world(seed)
+    expected = reference.reference_planes(population, reference.WORLD_SIZE, rules.CONWAY,
+                                          reference.GENERATIONS)
+    engine = reference.create("hashlife", population, _track_ages=False)
+    while engine.generation < reference.GENERATIONS:
+        engine.advance(min(generations, reference.GENERATIONS - engine.generation))
+        states, ages = engine.to_planes()
+        expected_states = expected[engine.generation][0]
+        assert reference.live_cells(states) == reference.live_cells(expected_states), engine.generation
+        assert not any(ages)
+        assert engine.counts() == reference.plane_counts(states), engine.generation
+
+
+def test_jumps_away_from_the_rim_and_steps_near_it():
+    size = (128, 128)
+    population = reference.seed_world("pulsar", size)
+    engine = reference.create("hashlife", population, size, _track_ages=False)
+    assert engine.advance(64) > 1
+    assert engine.stepper is None
+
+    engine = reference.create("hashlife", reference.seed_world(None, size), size, _track_ages=False)
+    assert engine.advance(64) == 1
+    assert engine.stepper is not None
+    assert engine.summary()["single steps"] == 1
+
+
+def test_tracks_ages_with_single_steps():
+    engine = reference.create("hashlife", reference.seed_world("pulsar"))
+    for _ in range(5):
+        assert engine.advance(64) == 1
+    assert engine.summary()["single steps"] == 5
@@ -0,0 +1,53 @@
+"""
+Batched file handler and the queue and listener thread in front of it.
+"""
+
+import logging
+import log_queue
+
+
+def record(_message: str) -> logging.LogRecord:
+    """ An INFO record with the given message. """
+    return logging.LogRecord("test", logging.INFO, __file__, 0, _message, None, None)
+
+
+def test_batch_file_handler_writes_full_batches(tmp_path, monkeypatch):
+    monkeypatch.setattr(log_queue, "BATCH_SIZE", 3)
+    path = tmp_path / "batch.log"
+    handler = log_queue.BatchFileHandler(path, "w", "header", _delay=True)
+    handler.emit(record("one"))
+    assert not path.exists()
+    handler.emit(record("two"))
+    assert path.read_text() == "header\none\ntwo\n"
+    handler.emit(record("three"))
+    assert path.read_text() == "header\none\ntwo\n"
+    handler.flush()
+    assert path.read_text() == "header\none\ntwo\nthree\n"
+    handler.close()
+
+
+def test_pipeline_keeps_the_order_and_flush_waits_for_the_records(tmp_path):
+    path = tmp_path / "pipeline.log"
+    pipeline = log_queue.LogPipeline(log_queue.BatchFileHandler(path, "w"))
+    logger = logging.getLogger("test_pipeline")
+    logger.setLevel(logging.INFO)
+    logger.propagate = False
+    logger.addHandler(pipeline.handler)
+    try:
+        for generation in range(1000):
+            logger.info("GENERATION %d", generation)
+        pipeline.flush()
+        assert path.read_text().splitlines() == ["GENERATION {}".format(g) for g in range(1000)]
+        logger.info("GENERATION %d", 1000)
+    finally:
+        logger.removeHandler(pipeline.handler)
+        pipeline.stop()
+    assert path.read_text().splitlines()[-1] == "GENERATION 1000"
+
+
+def test_stats_logger_writes_csv(tmp_path):
+    path = tmp_path / "stats.csv"
+    logger, pipeline = log_queue.stats_logger(path)
+    logger.info("", 0, 5, 1, 0, 94)
+    pipeline.stop()
+    assert path.read_text() == ",".join(log_queue.STATS_FIELDS) + "\n0,5,1,0,94\n"
@@ -0,0 +1,11 @@
+"""
+The NumPy engine against update_world.
+"""
+
+import pytest
+import reference
+
+
+@pytest.mark.parametrize("seed", reference.SEEDS)
+def test_matches_update_world(seed):
+    reference.run_against_reference("numpy", reference.seed_world(seed))
@@ -0,0 +1,52 @@
+"""
+Round trips through the RLE and plaintext pattern formats.
+"""
+
+import random
+import pytest
+import world
+import gol
+import patterns
+
+WORLD_SIZE = (37, 23)
+
+
+def run_engine(_generations: int) -> world.Engine:
+    """ An engine on a random world with a fixed seed, advanced by _generations. """
+    engine = gol.create_engine("bitpack", gol.populate_world(WORLD_SIZE, None, random.Random(3)), WORLD_SIZE)
+    for _ in range(_generations):
+        engine.step()
+    return engine
+
+
+def live_positions(_states, _world_size: tuple) -> list:
+    """ (y, x) of the live cells of a state plane, relative to the top left corner of their bounding box. """
+    width = _world_size[0]
+    live = [divmod(index, width) for index, code in enumerate(_states) if code in world.LIVE_CODES]
+    top = min(y for y, _ in live)
+    left = min(x for _, x in live)
+    return sorted((y - top, x - left) for y, x in live)
+
+
+@pytest.mark.parametrize("notation", ("B3/S23", "B36/S23"))
+def test_rle_round_trip(notation):
+    states = run_engine(8).to_planes()[0]
+    text = patterns.to_rle(states, WORLD_SIZE, notation)
+    width, height, live, rule = patterns.parse_rle(text)
+    assert rule == notation
+    assert sorted(live) == live_positions(states, WORLD_SIZE)
+    assert all(len(line) <= patterns.RLE_LINE_LENGTH for line in text.splitlines())
+
+
+def test_cells_round_trip():
+    states = run_engine(8).to_planes()[0]
+    width, height, live, rule = patterns.parse_cells(patterns.to_cells(states, WORLD_SIZE))
+    assert rule is None
+    assert sorted(live) == live_positions(states, WORLD_SIZE)
+
+
+def test_placed_pattern_keeps_its_cells():
+    width, height, live, _ = patterns.parse_rle("#N glider\nx = 3, y = 3, rule = B3/S23\nbob$2bo$3o!\n")
+    population = patterns.place_pattern(live, (10, 10), (2, 3))
+    assert (width, height) == (3, 3)
+    assert live_positions(population.states, (10, 10)) == sorted(live)
@@ -0,0 +1,73 @@
+"""
+The profiler of the simulation loop: the phases it adds up, its summary and its log records.
+"""
+
+import logging
+import profiling
+import gol
+import reference
+
+
+class Records(logging.Handler):
+    """ Handler keeping the formatted messages of the records. """
+
+    def __init__(self):
+        super().__init__()
+        self.messages = []
+
+    def emit(self, _record: logging.LogRecord):
+        self.messages.append(_record.getMessage())
+
+
+def test_laps_are_added_to_their_phase(monkeypatch):
+    clock = iter([0.0, 1.0, 3.0, 3.5, 4.0, 10.0, 11.0, 14.0, 15.0])
+    monkeypatch.setattr(profiling, "perf_counter", lambda: next(clock))
+    profiler = profiling.Profiler()
+    profiler.begin(0)
+    profiler.lap(profiling.STEP)
+    profiler.lap(profiling.RENDERING)
+    profiler.lap(profiling.STEP)
+    profiler.end()
+    profiler.begin(1)
+    profiler.lap(profiling.STEP)
+    profiler.end()
+    assert profiler.generations == 2
+    assert profiler.totals[profiling.STEP] == 5.5
+    assert profiler.totals[profiling.RENDERING] == 0.5
+    assert profiler.totals[profiling.OTHER] == 7.0
+    summary = profiler.summary()
+    assert summary["profile step"] == "5.500 s, 2750.000 ms/generation, 42.3%"
+    assert "profile neighbours" not in summary
+
+
+def test_end_without_begin_does_nothing():
+    profiler = profiling.Profiler()
+    profiler.end()
+    assert profiler.generations == 0 and profiler.summary() == {}
+
+
+def test_generations_are_logged():
+    logger = logging.getLogger("test_profiling")
+    logger.setLevel(logging.INFO)
+    logger.propagate = False
+    records = Records()
+    logger.addHandler(records)
+    try:
+        profiler = profiling.Profiler(logger)
+        profiler.begin(4)
+        profiler.lap(profiling.STEP)
+        profiler.end()
+    finally:
+        logger.removeHandler(records)
+    lines = records.messages[0].splitlines()
+    assert lines[0] == "PROFILE 4"
+    assert [line.split(":")[0] for line in lines[1:]] == ["  Step", "  Other"]
+
+
+def test_run_reports_the_phases_of_the_dict_engine(gol_log):
+    engine = reference.create("dict", reference.seed_world("pulsar"))
+    gol.run_simulation(5, engine, reference.WORLD_SIZE, headless=True, profile="generations")
+    log = gol_log.read_text()
+    assert log.count("PROFILE") == 5
+    for phase in (profiling.NEIGHBOURS, profiling.TRANSITIONS, profiling.STATISTICS, profiling.LOGGING):
+        assert "Profile {}: ".format(phase) in log
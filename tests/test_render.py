@@ -0,0 +1,51 @@
+"""
+The frame-buffered renderer: the spans that are redrawn and the frames that are written.
+"""
+
+import io
+import re
+import render
+import reference
+
+ESCAPE = re.compile('\033\\[[0-9;]*[A-Za-z]')
+
+
+def test_changed_spans():
+    assert render.changed_spans("#----#", "#----#") == []
+    assert render.changed_spans("#----#", "#-X--#") == [[2, 3]]
+    assert render.changed_spans("#-X---------X-#", "#-----------E-#") == [[2, 3], [12, 13]]
+
+
+def test_changed_spans_closer_than_the_merge_gap_are_merged():
+    old = "-" * 20
+    new = "X" + "-" * (render.MERGE_GAP - 2) + "X" + "-" * (20 - render.MERGE_GAP)
+    assert render.changed_spans(old, new) == [[0, render.MERGE_GAP]]
+
+
+def test_first_frame_draws_every_cell():
+    renderer = render.TerminalRenderer(io.StringIO())
+    rows = ["####", "#X-#", "####"]
+    frame = renderer.frame(rows)
+    assert frame.startswith(render.CURSOR_HOME + render.CLEAR_SCREEN)
+    assert ESCAPE.sub("", frame) == "".join(row + "\n" for row in rows)
+
+
+def test_later_frames_only_redraw_the_changed_cells():
+    renderer = render.TerminalRenderer(io.StringIO())
+    renderer.previous = ["#----#", "#----#", "#----#"]
+    assert renderer.frame(renderer.previous) == ""
+    frame = renderer.frame(["#----#", "#--X-#", "#----#"])
+    assert frame.startswith(render.move_cursor(1, 3) + render.COLOURS["X"] + "X")
+    assert ESCAPE.sub("", frame) == "X"
+
+
+def test_draw_writes_the_rows_of_the_engine():
+    stream = io.StringIO()
+    renderer = render.TerminalRenderer(stream)
+    engine = reference.create("dict", reference.seed_world("pulsar"))
+    renderer.draw(engine)
+    engine.step()
+    renderer.draw(engine)
+    renderer.close()
+    assert renderer.previous == list(engine.rows())
+    assert stream.getvalue().count(render.CLEAR_SCREEN) == 1
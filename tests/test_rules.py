@@ -0,0 +1,58 @@
+"""
+The engines against update_world under other rules and ages than Conway's Life.
+"""
+
+import pickle
+import pytest
+import code_base as cb
+import world
+import rules
+import gol
+import reference
+
+RULES = (("B3/S23", 5, 10), ("highlife", 5, 10), ("seeds", 1, 2), ("daynight", 7, 9), ("B34/S08", 3, 4))
+
+
+@pytest.mark.parametrize("notation, elder_age, prime_elder_age", RULES)
+@pytest.mark.parametrize("name", list(gol.ENGINES))
+def test_engine_matches_update_world_with_rule(name, notation, elder_age, prime_elder_age):
+    options = {"_workers": 2} if name == "parallel" else {}
+    reference.run_against_reference(name, reference.seed_world(None),
+                                    _rule=rules.parse_rule(notation, elder_age, prime_elder_age), **options)
+
+
+@pytest.mark.parametrize("notation", [notation for notation, _, _ in RULES])
+@pytest.mark.parametrize("seed", reference.SEEDS)
+def test_hashlife_live_cells_without_ages_match_update_world(seed, notation):
+    rule = rules.parse_rule(notation)
+    population = reference.seed_world(seed)
+    expected = reference.reference_planes(population, reference.WORLD_SIZE, rule, reference.GENERATIONS)
+    engine = reference.create("hashlife", population, _rule=rule, _track_ages=False)
+    for generation, (states, _) in enumerate(expected):
+        assert reference.live_cells(engine.to_planes()[0]) == reference.live_cells(states), generation
+        assert sum(engine.counts().values()) == sum(reference.plane_counts(states).values()), generation
+        engine.step()
+
+
+def test_parse_rule():
+    assert rules.parse_rule("highlife").notation == "B36/S23"
+    assert rules.parse_rule("b3/s23") == rules.CONWAY
+    assert rules.parse_rule("B3/S23", 2, 4) != rules.CONWAY
+    with pytest.raises(ValueError):
+        rules.parse_rule("B9/S23")
+
+
+def test_next_state_of_the_dictionary_world_follows_the_table():
+    rule = rules.parse_rule("highlife", 3, 7)
+    for state, code in world.STATE_CODES.items():
+        for age in range(10):
+            for live_neighbours in range(rules.NEIGHBOUR_COUNTS):
+                next_code, next_age = rule.next_state_code(code, age, live_neighbours)
+                assert rule.next_state(state, age, live_neighbours) == (world.CODE_STATES[next_code], next_age)
+
+
+def test_rule_survives_pickling():
+    rule = rules.parse_rule("daynight", 7, 9)
+    copy = pickle.loads(pickle.dumps(rule))
+    assert copy == rule and copy.table == rule.table
+    assert copy.next_state(cb.STATE_ALIVE, 7, 3) == (cb.STATE_ELDER, 8)
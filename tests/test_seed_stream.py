@@ -0,0 +1,35 @@
+"""
+The streaming seed loader against seed files written by snapshot.write_json.
+"""
+
+import io
+import random
+import pytest
+import world
+import gol
+import seed_stream
+import snapshot
+
+WORLD_SIZE = (37, 23)
+
+
+@pytest.mark.parametrize("chunk_size", (7, seed_stream.CHUNK_SIZE))
+def test_seed_round_trip(tmp_path, chunk_size):
+    population = gol.populate_world(WORLD_SIZE, None, random.Random(5))
+    path = tmp_path / "seed.json"
+    snapshot.write_json(path, population, WORLD_SIZE)
+    with open(path, "r") as file:
+        loaded, world_size = seed_stream.load_seed(file, True, chunk_size)
+    assert world_size == WORLD_SIZE
+    assert world.population_to_planes(loaded, world_size)[0] == population.states
+
+
+@pytest.mark.parametrize("text", (
+    '{"world_size": [3, 3], "population": {}} trailing',
+    '{"world_size": [3, 3], "population": {"(5, 1)": null}}',
+    '{"world_size": [3], "population": {}}',
+    '{"population": {}}',
+))
+def test_invalid_seed_is_rejected(text):
+    with pytest.raises(seed_stream.SeedFileError):
+        seed_stream.load_seed(io.StringIO(text))
@@ -0,0 +1,59 @@
+"""
+Round trips through the binary snapshot format.
+"""
+
+import random
+import world
+import gol
+import snapshot
+
+WORLD_SIZE = (37, 23)
+
+
+def run_engine(_name: str, _generations: int, **_options) -> world.Engine:
+    """ An engine on a random world with a fixed seed, advanced by _generations,
+    so the cells have different ages. """
+    population = gol.populate_world(WORLD_SIZE, None, random.Random(3))
+    engine = gol.create_engine(_name, population, WORLD_SIZE, **_options)
+    for _ in range(_generations):
+        engine.step()
+    return engine
+
+
+def test_snapshot_round_trip(tmp_path):
+    engine = run_engine("dict", 12)
+    path = tmp_path / "world.snap"
+    snapshot.write_planes(path, *engine.to_planes(), engine.world_size, engine.generation, {"engine": engine.name})
+    population = snapshot.load_snapshot(path)
+    states, ages = engine.to_planes()
+    assert population.world_size == WORLD_SIZE
+    assert population.generation == 12
+    assert bytes(population.states) == bytes(states)
+    assert list(population.ages) == list(ages)
+    assert snapshot.load_metadata(path) == {"engine": "dict"}
+
+
+def test_snapshot_continues_with_every_engine(tmp_path):
+    engine = run_engine("dict", 12)
+    path = tmp_path / "world.snap"
+    snapshot.save_snapshot(path, engine)
+    engine.step()
+    for name in ("dict", "bitpack", "flat", "sparse"):
+        resumed = gol.create_engine(name, snapshot.load_snapshot(path), WORLD_SIZE)
+        resumed.step()
+        assert resumed.generation == engine.generation, name
+        assert bytes(resumed.to_planes()[0]) == bytes(engine.to_planes()[0]), name
+        assert list(resumed.to_planes()[1]) == list(engine.to_planes()[1]), name
+
+
+def test_torus_snapshot_gets_a_rim_in_a_bounded_engine(tmp_path):
+    torus = run_engine("bitpack", 5, _topology=world.TOPOLOGY_TORUS)
+    path = tmp_path / "torus.snap"
+    snapshot.save_snapshot(path, torus)
+    population = snapshot.load_snapshot(path)
+    assert bytes(population.states) == bytes(torus.to_planes()[0])
+    expected = bytearray(population.states)
+    world.set_rim(expected, WORLD_SIZE)
+    assert world.population_to_planes(population, WORLD_SIZE)[0] == expected
+    bounded = gol.create_engine("bitpack", population, WORLD_SIZE)
+    assert bounded.to_planes()[0] == expected